@@ -0,0 +1,184 @@
+"""Shared helpers for the benchmark scripts.
+
+The benchmarks are plain scripts run from the repository root, e.g.
+``python benchmarks/bench_encoder_memory.py``. Both sub-projects are put on the
+path, so ``src.*`` (column_transformer_TP_talk) and ``modules.*`` (cli_example)
+can be imported side by side.
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Union
+
+import numpy as np
+import pandas as pd
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TP_TALK_DIR = os.path.join(ROOT, "column_transformer_TP_talk")
+CLI_DIR = os.path.join(ROOT, "cli_example")
+
+for path in (TP_TALK_DIR, CLI_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+def load_cli_config() -> dict:
+    """Loads `cli_example/config.yml`, which defines the Lending Club schema."""
+    with open(os.path.join(CLI_DIR, "config.yml"), "r", encoding="utf-8") as stream:
+        return yaml.safe_load(stream)
+
+
+def lending_club_null_rates() -> Dict[str, float]:
+    """Fraction of nulls per column close to the ones of the Lending Club data.
+
+    Most columns are almost complete. The "mths_since_*" columns are null when the
+    event never happened, and the columns added to the data in 2015 (utilization,
+    "open_*", "inq_fi", ...) are null for the older loans.
+    """
+    columns_by_type = load_cli_config()["train_columns_by_type"]
+    columns_added_in_2015 = (
+        "all_util",
+        "il_util",
+        "inq_fi",
+        "inq_last_12m",
+        "max_bal_bc",
+        "mths_since_rcnt_il",
+        "open_acc_6m",
+        "open_act_il",
+        "open_il_12m",
+        "open_il_24m",
+        "open_rv_12m",
+        "open_rv_24m",
+        "total_bal_il",
+        "total_cu_tl",
+    )
+    null_rates = {}
+    for column in columns_by_type["numerical_columns"]:
+        if column in ("mths_since_last_delinq", "mths_since_recent_revol_delinq"):
+            null_rates[column] = 0.6
+        elif column in columns_added_in_2015:
+            null_rates[column] = 0.4
+        elif column.startswith("mths_since"):
+            null_rates[column] = 0.1
+        else:
+            null_rates[column] = 0.02
+    for column in columns_by_type["categorical_columns"]:
+        null_rates[column] = 0.06 if column == "emp_length" else 0.0
+    null_rates.update({"emp_title": 0.07, "title": 0.01})
+    return null_rates
+
+
+def make_lending_club_frame(
+    n_rows: int,
+    null_rate: Union[float, Dict[str, float]] = 0.1,
+    seed: int = 0,
+    date_columns: Iterable[str] = (),
+) -> pd.DataFrame:
+    """Builds a synthetic DataFrame following the `cli_example/config.yml` schema.
+
+    Args:
+        n_rows (int): Number of rows.
+        null_rate (Union[float, Dict[str, float]], optional): Fraction of nulls per
+            column, the same for every column or by column name, e.g.
+            `lending_club_null_rates()`. Defaults to 0.1.
+        seed (int, optional): Seed used by the random number generator.
+            Defaults to 0.
+        date_columns (Iterable[str], optional): Extra month columns formatted as
+            Lending Club dates, e.g. "Dec-2015". Defaults to none.
+
+    Returns:
+        pd.DataFrame: numerical, categorical and high cardinality text columns plus
+            the target column.
+    """
+    config = load_cli_config()
+    columns_by_type = config["train_columns_by_type"]
+    rng = np.random.default_rng(seed)
+
+    data = {}
+    for column in columns_by_type["numerical_columns"]:
+        data[column] = rng.lognormal(mean=3.0, sigma=1.0, size=n_rows)
+    for i, column in enumerate(columns_by_type["categorical_columns"]):
+        n_categories = 5 + 5 * i
+        categories = np.array([f"{column}_{j}" for j in range(n_categories)])
+        data[column] = categories[rng.integers(0, n_categories, size=n_rows)]
+    for column in columns_by_type["text_columns"]:
+        # vocabularies grow with the data, as job titles do in Lending Club.
+        n_categories = max(n_rows // 5, 1)
+        codes = rng.zipf(1.3, size=n_rows) % n_categories
+        data[column] = np.char.add(f"{column}_", codes.astype(str)).astype(object)
+
+    months = pd.date_range("2007-01-01", "2018-12-01", freq="MS").strftime("%b-%Y")
+    for column in date_columns:
+        data[column] = months[rng.integers(0, len(months), n_rows)].to_numpy(object)
+
+    df = pd.DataFrame(data)
+    for column in df.columns:
+        column_null_rate = (
+            null_rate.get(column, 0.0) if isinstance(null_rate, dict) else null_rate
+        )
+        if column_null_rate > 0:
+            df.loc[rng.random(n_rows) < column_null_rate, column] = np.nan
+
+    df[config["target_column"]] = np.where(
+        rng.random(n_rows) < 0.2, config["positive_label_value"], "Fully Paid"
+    )
+    return df
+
+
+def peak_rss_mb() -> float:
+    """Returns the peak resident set size of the current process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timeit(func: Callable, repeat: int = 3) -> float:
+    """Returns the best wall time in seconds of `repeat` calls to `func`."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _run_child(target: Callable, args: tuple, queue) -> None:
+    queue.put(target(*args))
+
+
+def run_isolated(target: Callable, *args) -> Dict:
+    """Runs `target(*args)` in a fresh process and returns its result.
+
+    Peak RSS can only grow within a process, so memory measurements must not
+    share a process with each other.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_child, args=(target, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def print_table(rows: List[Dict]) -> None:
+    """Prints a list of flat dicts as an aligned table."""
+    if not rows:
+        return
+    headers = list(rows[0])
+    widths = {
+        header: max(len(header), *(len(_format(row[header])) for row in rows))
+        for header in headers
+    }
+    print("  ".join(header.ljust(widths[header]) for header in headers))
+    for row in rows:
+        print(
+            "  ".join(_format(row[header]).ljust(widths[header]) for header in headers)
+        )
+
+
+def _format(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.4g}"
+    return str(value)
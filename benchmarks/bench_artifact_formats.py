@@ -0,0 +1,53 @@
+"""Load time and file size of a train split stored as CSV, Parquet and Arrow.
+
+Writes a synthetic split following `cli_example/config.yml` (categorical and
+text columns as "category") with `write_artifact` and reads it back with
+`read_artifact`, the way `run.py` loads the splits. CSV is read with the default
+C parser and with the pyarrow one.
+
+Usage:
+    python benchmarks/bench_artifact_formats.py [n_rows]
+"""
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from _common import load_cli_config, make_lending_club_frame, print_table, timeit
+from modules.artifacts import read_artifact, write_artifact
+
+
+def main(n_rows: int) -> None:
+    columns_by_type = load_cli_config()["train_columns_by_type"]
+    df = make_lending_club_frame(n_rows)
+    categorical_columns = (
+        columns_by_type["categorical_columns"] + columns_by_type["text_columns"]
+    )
+    df[categorical_columns] = df[categorical_columns].astype("category")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for name, extension, read in [
+            ("csv (c engine)", ".csv", lambda path: pd.read_csv(path)),
+            ("csv (pyarrow)", ".csv", read_artifact),
+            ("parquet", ".parquet", read_artifact),
+            ("arrow ipc", ".feather", read_artifact),
+        ]:
+            path = os.path.join(directory, f"train{extension}")
+            if not os.path.exists(path):
+                write_artifact(df, path)
+            rows.append(
+                {
+                    "format": name,
+                    "n_rows": n_rows,
+                    "size_mb": os.path.getsize(path) / 2**20,
+                    "load_seconds": timeit(lambda: read(path)),
+                    "keeps_dtypes": bool((read(path).dtypes == df.dtypes).all()),
+                }
+            )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
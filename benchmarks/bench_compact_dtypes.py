@@ -0,0 +1,62 @@
+"""Memory of the preprocessed training frame of `cli_example/run.py`, by dtypes.
+
+Compares the imputed frame (the input of the column transformer) and the
+preprocessed features with the default dtypes (float64 and object columns) and
+with compact_dtypes (`DtypeDowncaster` after the imputer and a float32 scaler),
+measured with `memory_usage(deep=True)`. Checks that the features match within
+float32 precision and fails if the imputed frame isn't at least 2x smaller.
+
+Usage:
+    python benchmarks/bench_compact_dtypes.py [n_rows]
+"""
+import sys
+
+import numpy as np
+
+from _common import load_cli_config, make_lending_club_frame, print_table
+from run import make_preprocessor
+
+
+def _frame_mb(df) -> float:
+    return df.memory_usage(index=False, deep=True).sum() / 2**20
+
+
+def main(n_rows: int) -> None:
+    config = load_cli_config()
+    columns_by_type = config["train_columns_by_type"]
+    categorical_columns = (
+        columns_by_type["categorical_columns"] + columns_by_type["text_columns"]
+    )
+    X = make_lending_club_frame(n_rows)[
+        categorical_columns + columns_by_type["numerical_columns"]
+    ]
+
+    rows, features = [], {}
+    for compact in (False, True):
+        preprocessor = make_preprocessor({**config, "compact_dtypes": compact})
+        # the imputer and the downcaster give the input of the column transformer.
+        X_imputed = preprocessor[:-1].fit_transform(X)
+        features[compact] = preprocessor[-1].fit_transform(X_imputed)
+        rows.append(
+            {
+                "dtypes": "compact" if compact else "default",
+                "n_rows": n_rows,
+                "imputed_mb": _frame_mb(X_imputed),
+                "features_mb": _frame_mb(features[compact]),
+            }
+        )
+    for row in rows:
+        row["imputed_reduction"] = rows[0]["imputed_mb"] / row["imputed_mb"]
+        row["features_reduction"] = rows[0]["features_mb"] / row["features_mb"]
+    print_table(rows)
+
+    assert np.allclose(
+        features[True].to_numpy(dtype=float),
+        features[False].to_numpy(dtype=float),
+        atol=1e-4,
+    ), "compact dtypes changed the features."
+    assert rows[1]["imputed_reduction"] >= 2, "less than 2x memory reduction."
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,104 @@
+"""Peak allocations of the transformers that replace columns, by copy policy.
+
+Measures with tracemalloc the peak memory allocated by `transform` of the cli
+`Imputer`, `Replacer` and `DateCoercion`, with the default policy (the input is
+not modified, untouched columns are shared) and with inplace=True. Checks that
+the default policy leaves the input unchanged and that both give the same
+output, and fails if a step allocates more than the columns it replaces.
+
+Usage:
+    python benchmarks/bench_copy_policy.py [n_rows]
+"""
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from _common import load_cli_config, make_lending_club_frame, print_table
+from modules.imputer import Imputer
+from src.date_coercion import DateCoercion
+from src.replacer import Replacer
+
+
+def _peak_mb(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def _frame_mb(df: pd.DataFrame) -> float:
+    return df.memory_usage(index=False, deep=False).sum() / 2**20
+
+
+def main(n_rows: int) -> None:
+    config = load_cli_config()
+    columns_by_type = config["train_columns_by_type"]
+    df = make_lending_club_frame(n_rows).drop(columns=[config["target_column"]])
+    rng = np.random.default_rng(0)
+    months = pd.date_range("2007-01-01", "2018-12-01", freq="MS").strftime("%b-%Y")
+    df["issue_d"] = months[rng.integers(0, len(months), n_rows)].to_numpy(object)
+
+    imputer_kwargs = dict(
+        categorical_columns=columns_by_type["categorical_columns"],
+        numerical_columns=columns_by_type["numerical_columns"],
+        text_columns=columns_by_type["text_columns"],
+        **config["imputer"],
+    )
+    replaced_columns = columns_by_type["categorical_columns"][:2]
+    mapper = {
+        column: {value: f"{value}_new" for value in df[column].dropna().unique()}
+        for column in replaced_columns
+    }
+    steps = [
+        (
+            "Imputer",
+            lambda inplace: Imputer(**imputer_kwargs, inplace=inplace),
+            columns_by_type["categorical_columns"]
+            + columns_by_type["numerical_columns"]
+            + columns_by_type["text_columns"],
+        ),
+        (
+            "Replacer",
+            lambda inplace: Replacer(mapper, inplace=inplace),
+            replaced_columns,
+        ),
+        (
+            "DateCoercion",
+            lambda inplace: DateCoercion(["issue_d"], inplace=inplace),
+            ["issue_d"],
+        ),
+    ]
+
+    rows = []
+    for name, make_step, changed_columns in steps:
+        step = make_step(False).fit(df)
+        original = df.copy()
+        expected = step.transform(df)
+        assert df.equals(original), f"{name} modified its input."
+        default_mb = _peak_mb(lambda: step.transform(df))
+
+        inplace_df = df.copy()
+        inplace_step = make_step(True).fit(inplace_df)
+        inplace_mb = _peak_mb(lambda: inplace_step.transform(inplace_df))
+        assert inplace_df.equals(expected), f"{name} inplace gives another output."
+
+        # replaced columns may change dtype, e.g. to datetime64 or object.
+        budget_mb = 2 * _frame_mb(expected[changed_columns]) + 1
+        assert default_mb <= budget_mb, f"{name} allocates {default_mb:.1f} MB."
+        rows.append(
+            {
+                "step": name,
+                "frame_mb": _frame_mb(df),
+                "replaced_mb": _frame_mb(expected[changed_columns]),
+                "default_peak_mb": default_mb,
+                "inplace_peak_mb": inplace_mb,
+            }
+        )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
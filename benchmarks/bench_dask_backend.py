@@ -0,0 +1,143 @@
+"""Peak RSS and time of a src pipeline on a CSV, pandas vs `src.dask_backend`.
+
+Writes a synthetic Lending Club CSV, then fits and transforms a pipeline
+(DateCoercion, ColumnSelector and a ColumnDataFrameTransformer with imputers,
+scaler and one-hot encoder) with pandas on the whole file, and with Dask on
+`blocksize` partitions through `fit_dask` / `transform_dask`. Both write their
+features to Parquet. Every case runs in its own process, and the features of
+both paths are checked to match.
+
+Usage:
+    python benchmarks/bench_dask_backend.py [n_rows] [blocksize] [scheduler]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import _common
+from _common import make_lending_club_frame, peak_rss_mb, print_table, run_isolated
+
+DATE_COLUMNS = ["issue_d"]
+
+
+def _make_pipeline():
+    from sklearn.pipeline import Pipeline
+
+    from src.column_data_frame_transformer import ColumnDataFrameTransformer
+    from src.column_selector import ColumnSelector
+    from src.date_coercion import DateCoercion
+    from src.encoder import OneHotDataFrameEncoder
+    from src.imputer import SimpleDataFrameImputer
+    from src.scaler import StandardDataFrameScaler
+
+    columns_by_type = _common.load_cli_config()["train_columns_by_type"]
+    numerical_columns = columns_by_type["numerical_columns"]
+    categorical_columns = columns_by_type["categorical_columns"]
+    return Pipeline(
+        [
+            ("dates", DateCoercion(DATE_COLUMNS)),
+            ("selector", ColumnSelector(numerical_columns + categorical_columns)),
+            (
+                "column_transformer",
+                ColumnDataFrameTransformer(
+                    [
+                        (
+                            "numerical",
+                            Pipeline(
+                                [
+                                    ("imputer", SimpleDataFrameImputer()),
+                                    ("scaler", StandardDataFrameScaler()),
+                                ]
+                            ),
+                            numerical_columns,
+                        ),
+                        (
+                            "categorical",
+                            Pipeline(
+                                [
+                                    (
+                                        "imputer",
+                                        SimpleDataFrameImputer(
+                                            strategy="most_frequent"
+                                        ),
+                                    ),
+                                    (
+                                        "encoder",
+                                        OneHotDataFrameEncoder(handle_unknown="ignore"),
+                                    ),
+                                ]
+                            ),
+                            categorical_columns,
+                        ),
+                    ]
+                ),
+            ),
+        ]
+    )
+
+
+def _run_pandas(csv_path: str, output_path: str) -> dict:
+    start = time.perf_counter()
+    X = pd.read_csv(csv_path)
+    _make_pipeline().fit_transform(X).to_parquet(output_path)
+    return {
+        "backend": "pandas",
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _run_dask(csv_path: str, output_path: str, blocksize: str, scheduler: str):
+    import dask
+    import dask.dataframe as dd
+
+    from src.dask_backend import fit_dask, transform_dask
+
+    start = time.perf_counter()
+    ddf = dd.read_csv(csv_path, blocksize=blocksize)
+    pipeline = fit_dask(_make_pipeline(), ddf, scheduler=scheduler)
+    with dask.config.set(scheduler=scheduler):
+        transform_dask(pipeline, ddf).to_parquet(output_path)
+    return {
+        "backend": f"dask, {scheduler}, blocksize={blocksize}",
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(n_rows: int, blocksize: str, scheduler: str) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "loans.csv")
+        make_lending_club_frame(n_rows, date_columns=DATE_COLUMNS).to_csv(
+            csv_path, index=False
+        )
+        pandas_path = os.path.join(directory, "pandas.parquet")
+        dask_path = os.path.join(directory, "dask_parquet")
+
+        rows = [
+            run_isolated(_run_pandas, csv_path, pandas_path),
+            run_isolated(_run_dask, csv_path, dask_path, blocksize, scheduler),
+        ]
+        for row in rows:
+            row["n_rows"] = n_rows
+            row["csv_mb"] = os.path.getsize(csv_path) / 2**20
+        print_table(rows)
+
+        expected = pd.read_parquet(pandas_path)
+        features = pd.read_parquet(dask_path).reset_index(drop=True)
+    assert list(features.columns) == list(expected.columns), "columns differ."
+    assert np.allclose(
+        features.to_numpy(dtype=float), expected.to_numpy(dtype=float)
+    ), "dask features differ from the pandas ones."
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        sys.argv[2] if len(sys.argv) > 2 else "64MB",
+        sys.argv[3] if len(sys.argv) > 3 else "threads",
+    )
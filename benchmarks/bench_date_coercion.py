@@ -0,0 +1,57 @@
+"""`DateCoercion.transform` against format-inferring `pd.to_datetime` calls.
+
+Casts Lending Club style month dates ("Dec-2015") for `issue_d` and
+`earliest_cr_line`.
+
+Usage:
+    python benchmarks/bench_date_coercion.py [n_rows]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from _common import print_table, timeit
+from src.date_coercion import DateCoercion
+
+
+def _previous_caster(date_columns: list, df: pd.DataFrame) -> pd.DataFrame:
+    """DateCoercion._caster before the learned formats."""
+    df = df.copy()
+    for column in date_columns:
+        df[column] = pd.to_datetime(df.loc[:, column])
+    return df
+
+
+def main(n_rows: int) -> None:
+    rng = np.random.default_rng(0)
+    months = pd.date_range("1960-01-01", "2018-12-01", freq="MS").strftime("%b-%Y")
+    date_columns = ["issue_d", "earliest_cr_line"]
+    df = pd.DataFrame(
+        {
+            column: months.to_numpy()[rng.integers(0, len(months), n_rows)]
+            for column in date_columns
+        }
+    )
+    df.loc[rng.random(n_rows) < 0.05, "earliest_cr_line"] = np.nan
+
+    coercion = DateCoercion(date_columns).fit(df)
+    assert coercion.transform(df).equals(_previous_caster(date_columns, df))
+
+    previous = timeit(lambda: _previous_caster(date_columns, df), repeat=1)
+    learned = timeit(lambda: coercion.transform(df))
+    print_table(
+        [
+            {
+                "n_rows": n_rows,
+                "formats": coercion.date_formats,
+                "previous_seconds": previous,
+                "learned_format_seconds": learned,
+                "speedup": previous / learned,
+            }
+        ]
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
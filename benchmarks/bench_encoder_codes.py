@@ -0,0 +1,61 @@
+"""Fit/transform time of the cli `OneHotDataFrameEncoder`, object vs categorical.
+
+"sklearn" is the previous implementation, `OneHotEncoder.fit/transform` on the
+values. The encoder is run on the 9 categorical and 2 text columns of
+`cli_example/config.yml`, as object columns and as `pd.Categorical` columns,
+and its output is checked against sklearn's.
+
+Usage:
+    python benchmarks/bench_encoder_codes.py [n_rows]
+"""
+import sys
+
+import numpy as np
+from sklearn.preprocessing import OneHotEncoder
+
+from _common import load_cli_config, make_lending_club_frame, print_table, timeit
+from modules.enconder import OneHotDataFrameEncoder
+
+
+def main(n_rows: int) -> None:
+    columns_by_type = load_cli_config()["train_columns_by_type"]
+    columns = columns_by_type["categorical_columns"] + columns_by_type["text_columns"]
+    X = make_lending_club_frame(n_rows)[columns].fillna("undefined")
+    X_categorical = X.astype("category")
+
+    sklearn_encoder = OneHotEncoder(handle_unknown="ignore")
+    sklearn_fit = timeit(lambda: sklearn_encoder.fit(X), repeat=1)
+    sklearn_transform = timeit(lambda: sklearn_encoder.transform(X))
+    expected = sklearn_encoder.transform(X).astype(np.int8)
+
+    rows = [
+        {
+            "encoder": "sklearn",
+            "input": "object",
+            "n_rows": n_rows,
+            "fit_seconds": sklearn_fit,
+            "transform_seconds": sklearn_transform,
+            "transform_speedup": 1.0,
+            "matches_sklearn": True,
+        }
+    ]
+    for name, X_input in (("object", X), ("categorical", X_categorical)):
+        encoder = OneHotDataFrameEncoder(handle_unknown="ignore", output_format="csr")
+        fit_seconds = timeit(lambda: encoder.fit(X_input), repeat=1)
+        transform_seconds = timeit(lambda: encoder.transform(X_input))
+        rows.append(
+            {
+                "encoder": "OneHotDataFrameEncoder",
+                "input": name,
+                "n_rows": n_rows,
+                "fit_seconds": fit_seconds,
+                "transform_seconds": transform_seconds,
+                "transform_speedup": sklearn_transform / transform_seconds,
+                "matches_sklearn": (encoder.transform(X_input) != expected).nnz == 0,
+            }
+        )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
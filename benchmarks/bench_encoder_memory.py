@@ -0,0 +1,76 @@
+"""Peak RSS of `OneHotDataFrameEncoder.transform` per output format.
+
+"baseline" reproduces the previous implementation, which densified the encoder
+output with ``toarray().astype("int8")``. Every case runs in its own process.
+
+Usage:
+    python benchmarks/bench_encoder_memory.py [n_rows]
+"""
+import sys
+
+import _common
+from _common import make_lending_club_frame, peak_rss_mb, print_table, run_isolated
+
+
+def _encode(output_format: str, n_rows: int) -> dict:
+    import pandas as pd
+    from src.column_data_frame_transformer import ColumnDataFrameTransformer
+    from src.encoder import OneHotDataFrameEncoder
+
+    config = _common.load_cli_config()["train_columns_by_type"]
+    columns = config["categorical_columns"] + config["text_columns"]
+    X = make_lending_club_frame(n_rows)[columns].fillna("undefined")
+
+    if output_format == "baseline":
+        encoder = OneHotDataFrameEncoder(handle_unknown="ignore").fit(X)
+        rss_before = peak_rss_mb()
+        X_encoded = super(OneHotDataFrameEncoder, encoder).transform(X)
+        X_out = pd.DataFrame(
+            X_encoded.toarray().astype("int8"), columns=encoder.feature_names
+        )
+    elif output_format == "column_transformer":
+        transformer = ColumnDataFrameTransformer(
+            [
+                (
+                    "encoder",
+                    OneHotDataFrameEncoder(
+                        handle_unknown="ignore", output_format="sparse_frame"
+                    ),
+                    columns,
+                )
+            ]
+        ).fit(X)
+        rss_before = peak_rss_mb()
+        X_out = transformer.transform(X)
+    else:
+        encoder = OneHotDataFrameEncoder(
+            handle_unknown="ignore", output_format=output_format
+        ).fit(X)
+        rss_before = peak_rss_mb()
+        X_out = encoder.transform(X)
+
+    return {
+        "output_format": output_format,
+        "n_rows": n_rows,
+        "n_features": X_out.shape[1],
+        "peak_rss_delta_mb": peak_rss_mb() - rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main(n_rows: int) -> None:
+    rows = [
+        run_isolated(_encode, output_format, n_rows)
+        for output_format in (
+            "baseline",
+            "dense",
+            "sparse_frame",
+            "csr",
+            "column_transformer",
+        )
+    ]
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
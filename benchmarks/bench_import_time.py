@@ -0,0 +1,105 @@
+"""Startup time of the `cli_example/run.py` entry point, with a budget check.
+
+Runs ``python -X importtime -c "import run"`` from cli_example and reads the
+cumulative import time of `run`, lists its slowest imports, and times
+``python run.py --help``. Fails if importing `run` takes longer than
+`budget_ms`, or imports any of HEAVY_MODULES, which must only be imported when
+`train` runs, so startup regressions are caught.
+
+Usage:
+    python benchmarks/bench_import_time.py [budget_ms] [repeat]
+"""
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from _common import CLI_DIR, print_table
+
+HEAVY_MODULES = ("mlflow", "lightgbm", "sklearn", "pandas", "pyarrow", "modules")
+N_SLOWEST = 10
+
+
+def _import_times() -> List[Tuple[str, int, int]]:
+    """Returns the (module, depth, cumulative microseconds) of `import run`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import run"],
+        cwd=CLI_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append((name.strip(), depth, int(cumulative)))
+    return imports
+
+
+def _help_seconds() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "run.py", "--help"],
+        cwd=CLI_DIR,
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main(budget_ms: float, repeat: int) -> None:
+    runs = [_import_times() for _ in range(repeat)]
+    run_ms: Dict[int, float] = {
+        i: next(us for name, depth, us in imports if name == "run" and depth == 0)
+        / 1000
+        for i, imports in enumerate(runs)
+    }
+    best = min(run_ms, key=run_ms.get)
+    imports = runs[best]
+
+    # the direct imports of `run` are one level below it.
+    top_depth = min(depth for _, depth, _ in imports) + 1
+    slowest = sorted(
+        (
+            (name, us)
+            for name, depth, us in imports
+            if depth == top_depth and name != "run"
+        ),
+        key=lambda item: -item[1],
+    )[:N_SLOWEST]
+    print_table(
+        [{"module": name, "cumulative_ms": us / 1000} for name, us in slowest]
+    )
+
+    imported = {name for name, _, _ in imports}
+    heavy = sorted(
+        name
+        for name in imported
+        if any(name == m or name.startswith(f"{m}.") for m in HEAVY_MODULES)
+    )
+    help_seconds = min(_help_seconds() for _ in range(repeat))
+    print_table(
+        [
+            {
+                "import_run_ms": run_ms[best],
+                "budget_ms": budget_ms,
+                "help_seconds": help_seconds,
+                "heavy_modules": len(heavy),
+            }
+        ]
+    )
+
+    assert not heavy, f"`import run` imports heavy modules: {heavy}"
+    assert run_ms[best] <= budget_ms, (
+        f"`import run` took {run_ms[best]:.1f}ms, over the {budget_ms}ms budget."
+    )
+
+
+if __name__ == "__main__":
+    main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 300.0,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
@@ -0,0 +1,116 @@
+"""Load time and RSS of the `cli_example/run.py` model, pickle vs model directory.
+
+Fits the run.py model (preprocessor and an `LGBMClassifier` with n_estimators
+trees) on synthetic data and saves it with `save_model` as a joblib pickle and
+as a model directory (memory mapped arrays and the native LightGBM model). Each
+format is loaded in its own process, after importing the modules, and measured
+at load and after predicting a batch. Checks that both give the same
+probabilities.
+
+Usage:
+    python benchmarks/bench_model_store.py [n_rows] [n_estimators]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from _common import (
+    load_cli_config,
+    make_lending_club_frame,
+    peak_rss_mb,
+    print_table,
+    run_isolated,
+)
+from run import make_preprocessor
+
+N_PREDICT_ROWS = 1_000
+
+
+def _predict_frame():
+    target_column = load_cli_config()["target_column"]
+    return make_lending_club_frame(N_PREDICT_ROWS, seed=1).drop(
+        columns=[target_column]
+    )
+
+
+def _load(format_name: str, path: str) -> dict:
+    import lightgbm  # noqa: F401, imported before the timing as run.py does.
+    import sklearn.pipeline  # noqa: F401
+
+    from modules.model_store import load_model
+
+    X = _predict_frame()
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    model = load_model(path)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = peak_rss_mb()
+    start = time.perf_counter()
+    model.predict_proba(X)
+    return {
+        "format": format_name,
+        "load_seconds": load_seconds,
+        "first_predict_seconds": time.perf_counter() - start,
+        "load_rss_delta_mb": rss_loaded - rss_before,
+        "predict_rss_delta_mb": peak_rss_mb() - rss_loaded,
+    }
+
+
+def _size_mb(path: str) -> float:
+    if not os.path.isdir(path):
+        return os.path.getsize(path) / 2**20
+    return (
+        sum(
+            os.path.getsize(os.path.join(path, name)) for name in os.listdir(path)
+        )
+        / 2**20
+    )
+
+
+def main(n_rows: int, n_estimators: int) -> None:
+    from lightgbm import LGBMClassifier
+    from sklearn.pipeline import Pipeline
+
+    from modules.model_store import load_model, save_model
+
+    config = load_cli_config()
+    df = make_lending_club_frame(n_rows)
+    X = df.drop(columns=[config["target_column"]])
+    y = df[config["target_column"]]
+    model = Pipeline(
+        [
+            ("preprocessor", make_preprocessor(config)),
+            (
+                "classifier",
+                LGBMClassifier(n_estimators=n_estimators, learning_rate=0.06),
+            ),
+        ]
+    ).fit(X, y)
+
+    X_predict = _predict_frame()
+    expected = model.predict_proba(X_predict)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for format_name, file_name in (
+            ("pickle", "model.pkl"),
+            ("model directory", "model"),
+        ):
+            path = os.path.join(directory, file_name)
+            save_model(model, path)
+            row = run_isolated(_load, format_name, path)
+            row["size_mb"] = _size_mb(path)
+            row["same_probabilities"] = bool(
+                np.allclose(load_model(path).predict_proba(X_predict), expected)
+            )
+            rows.append(row)
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000,
+    )
@@ -0,0 +1,87 @@
+"""Fit/transform time of the cli ColumnDataFrameTransformer by execution mode.
+
+Runs the `cli_example/run.py` column transformer (scaler on the 57 numerical
+columns, one-hot encoder on the 11 categorical and text columns) on imputed
+data with:
+
+- n_jobs=1, the serial baseline.
+- backend="processes", the ColumnTransformer behaviour: every branch pickled to
+  a loky worker.
+- backend="auto": the numeric branch in a thread, the encoder in a process.
+- backend="auto" with max_branch_columns, splitting the wide branches.
+
+and checks that every mode returns the same features as the baseline.
+
+Usage:
+    python benchmarks/bench_parallel_branches.py [n_rows] [max_branch_columns]
+"""
+import os
+import sys
+
+from _common import (
+    load_cli_config,
+    make_lending_club_frame,
+    print_table,
+    timeit,
+)
+from run import make_preprocessor
+
+
+def main(n_rows: int, max_branch_columns: int) -> None:
+    config = load_cli_config()
+    columns_by_type = config["train_columns_by_type"]
+    preprocessor = make_preprocessor(config)
+    column_transformer = preprocessor.named_steps["column_transformer"]
+
+    df = make_lending_club_frame(n_rows)
+    X = preprocessor[:-1].fit_transform(
+        df[
+            columns_by_type["categorical_columns"]
+            + columns_by_type["numerical_columns"]
+            + columns_by_type["text_columns"]
+        ]
+    )
+
+    n_jobs = os.cpu_count() or 1
+    modes = [
+        ("serial", dict(n_jobs=1)),
+        ("processes", dict(n_jobs=n_jobs, backend="processes")),
+        ("auto", dict(n_jobs=n_jobs, backend="auto")),
+        (
+            f"auto, max_branch_columns={max_branch_columns}",
+            dict(
+                n_jobs=n_jobs,
+                backend="auto",
+                max_branch_columns=max_branch_columns,
+            ),
+        ),
+    ]
+
+    rows, reference, baseline = [], None, None
+    for name, params in modes:
+        transformer = column_transformer.set_params(**params)
+        fit_seconds = timeit(lambda: transformer.fit(X), repeat=1)
+        transform_seconds = timeit(lambda: transformer.transform(X))
+        X_transformed = transformer.transform(X)
+        if reference is None:
+            reference = X_transformed
+            baseline = fit_seconds + transform_seconds
+        rows.append(
+            {
+                "mode": name,
+                "n_rows": n_rows,
+                "fit_seconds": fit_seconds,
+                "transform_seconds": transform_seconds,
+                "speedup": baseline / (fit_seconds + transform_seconds),
+                "matches_serial": bool(X_transformed.equals(reference)),
+            }
+        )
+    print(f"cores: {n_jobs}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3,
+    )
@@ -0,0 +1,52 @@
+"""Speedup of the sharded `StandardDataFrameScaler.fit` against core count.
+
+Fits the 57 numerical columns of `cli_example/config.yml` with n_jobs=1 (plain
+`StandardScaler.fit`) and with 2, 4, ... up to the number of cores, and checks
+that the sharded fit matches the single-process one.
+
+Usage:
+    python benchmarks/bench_scaler_sharded.py [n_rows]
+"""
+import os
+import sys
+
+import numpy as np
+
+from _common import load_cli_config, make_lending_club_frame, print_table, timeit
+from src.scaler import StandardDataFrameScaler
+
+
+def main(n_rows: int) -> None:
+    columns = load_cli_config()["train_columns_by_type"]["numerical_columns"]
+    X = make_lending_club_frame(n_rows)[columns]
+
+    reference = StandardDataFrameScaler().fit(X)
+    baseline = timeit(lambda: StandardDataFrameScaler().fit(X))
+
+    n_cores = os.cpu_count() or 1
+    n_jobs_list = [1] + [2**i for i in range(1, n_cores.bit_length()) if 2**i < n_cores]
+    if n_cores > 1:
+        n_jobs_list.append(n_cores)
+
+    rows = []
+    for n_jobs in n_jobs_list:
+        scaler = StandardDataFrameScaler(n_jobs=n_jobs)
+        seconds = timeit(lambda: scaler.fit(X))
+        rows.append(
+            {
+                "n_jobs": n_jobs,
+                "n_rows": n_rows,
+                "fit_seconds": seconds,
+                "speedup": baseline / seconds,
+                "matches_fit": bool(
+                    np.allclose(scaler.mean_, reference.mean_)
+                    and np.allclose(scaler.var_, reference.var_)
+                ),
+            }
+        )
+    print(f"cores: {n_cores}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
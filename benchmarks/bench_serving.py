@@ -0,0 +1,119 @@
+"""Throughput of the micro-batching server against per-request prediction.
+
+Trains the `cli_example/run.py` model on a synthetic frame with fewer trees,
+saves it, serves it on localhost with `modules.serving` and sends single-record
+requests from concurrent keep-alive clients. max_batch_size=1 predicts every
+request on its own, as the previous endpoint did.
+
+Usage:
+    python benchmarks/bench_serving.py [n_requests] [n_clients]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from lightgbm import LGBMClassifier
+from sklearn.pipeline import Pipeline
+
+from _common import load_cli_config, make_lending_club_frame, print_table
+from modules.serving import MicroBatcher, load_predict_batch, start_server
+from run import make_preprocessor
+
+
+async def _client(port: int, records: list, latencies: list) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for record in records:
+        body = json.dumps(record).encode()
+        start = time.perf_counter()
+        writer.write(
+            b"POST /predict HTTP/1.1\r\nHost: localhost\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+        headers = {}
+        assert (await reader.readline()).startswith(b"HTTP/1.1 200")
+        while True:
+            line = await reader.readline()
+            if line == b"\r\n":
+                break
+            name, value = line.decode().split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+        await reader.readexactly(int(headers["content-length"]))
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+
+
+async def _load(predict_batch, records, n_clients, max_batch_size, max_wait_ms):
+    batcher = MicroBatcher(
+        predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+    )
+    server = await start_server(batcher, port=0)
+    port = server.sockets[0].getsockname()[1]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            _client(port, records[i::n_clients], latencies)
+            for i in range(n_clients)
+        )
+    )
+    seconds = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+    await batcher.stop()
+    return seconds, np.array(latencies) * 1000, np.mean(batcher.batch_sizes)
+
+
+def main(n_requests: int, n_clients: int) -> None:
+    config = load_cli_config()
+    df = make_lending_club_frame(50_000)
+    X = df.drop(columns=[config["target_column"]])
+    y = df[config["target_column"]]
+    model = Pipeline(
+        [
+            ("preprocessor", make_preprocessor(config)),
+            ("classifier", LGBMClassifier(n_estimators=100, random_state=0)),
+        ]
+    ).fit(X, y)
+    records = json.loads(
+        X.sample(n_requests, replace=True, random_state=0).to_json(orient="records")
+    )
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path_model = os.path.join(directory, "model.pkl")
+        joblib.dump(model, path_model)
+        for compiled in (False, True):
+            predict_batch = load_predict_batch(path_model, compiled=compiled)
+            for max_batch_size, max_wait_ms in [(1, 0.0), (16, 2.0), (64, 5.0)]:
+                seconds, latencies, mean_batch_size = asyncio.run(
+                    _load(
+                        predict_batch, records, n_clients, max_batch_size, max_wait_ms
+                    )
+                )
+                rows.append(
+                    {
+                        "compiled": compiled,
+                        "max_batch_size": max_batch_size,
+                        "max_wait_ms": max_wait_ms,
+                        "mean_batch_size": mean_batch_size,
+                        "requests_per_second": n_requests / seconds,
+                        "p50_ms": np.percentile(latencies, 50),
+                        "p99_ms": np.percentile(latencies, 99),
+                    }
+                )
+    print(f"requests: {n_requests}, clients: {n_clients}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 64,
+    )
@@ -0,0 +1,59 @@
+"""Single-record latency of `CompiledPreprocessor` against the fitted Pipeline.
+
+Fits the `cli_example/run.py` preprocessor on a synthetic frame and transforms
+records one at a time, as online scoring does: the Pipeline path builds a 1-row
+DataFrame per record, the compiled path takes the record dict. Reports p50/p99
+latencies and checks that both paths give the same features.
+
+Usage:
+    python benchmarks/bench_single_record.py [n_records]
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from _common import load_cli_config, make_lending_club_frame, print_table
+from modules.compiled import CompiledPreprocessor
+from run import make_preprocessor
+
+
+def _latencies_us(transform, records) -> np.ndarray:
+    latencies = []
+    for record in records:
+        start = time.perf_counter()
+        transform(record)
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1e6
+
+
+def main(n_records: int) -> None:
+    config = load_cli_config()
+    df = make_lending_club_frame(100_000).drop(columns=[config["target_column"]])
+    preprocessor = make_preprocessor(config).fit(df.copy())
+    compiled = CompiledPreprocessor(preprocessor)
+
+    records = df.sample(n_records, random_state=0).to_dict(orient="records")
+    expected = preprocessor.transform(pd.DataFrame(records)).to_numpy(dtype=float)
+    assert np.array_equal(compiled.transform_records(records), expected)
+
+    rows = []
+    for name, transform in [
+        ("pipeline", lambda record: preprocessor.transform(pd.DataFrame([record]))),
+        ("compiled", compiled.transform_record),
+    ]:
+        latencies = _latencies_us(transform, records)
+        rows.append(
+            {
+                "path": name,
+                "n_records": n_records,
+                "p50_us": np.percentile(latencies, 50),
+                "p99_us": np.percentile(latencies, 99),
+            }
+        )
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
@@ -0,0 +1,298 @@
+"""Fit/transform time and peak memory of every transformer at Lending Club scale.
+
+Builds synthetic frames with the `cli_example/config.yml` schema (57 numerical,
+9 categorical and 2 high cardinality text columns) and realistic null rates, and
+measures every case in its own process. The times are measured without tracing;
+the peak memory allocated by `fit` and by `transform` is measured with
+tracemalloc in a second, traced call, so it does not include the frame built
+beforehand.
+
+The results are saved as JSON in benchmarks/results/<commit>.json, and
+--compare prints the time and memory ratios against the results of another
+commit, flagging the regressions above --threshold (and, for memory, above
+MIN_MEMORY_MB).
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 10000 100000 1000000 5000000]
+        [--cases Replacer ...] [--compare benchmarks/results/<commit>.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+import _common
+from _common import (
+    ROOT,
+    lending_club_null_rates,
+    make_lending_club_frame,
+    print_table,
+    run_isolated,
+)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DATE_COLUMNS = ("issue_d", "earliest_cr_line")
+# smaller peak memory differences are not flagged as regressions.
+MIN_MEMORY_MB = 1.0
+TIME_METRICS = ("fit_seconds", "transform_seconds")
+MEMORY_METRICS = ("fit_peak_mb", "transform_peak_mb")
+
+
+def _columns() -> Dict[str, List[str]]:
+    columns_by_type = _common.load_cli_config()["train_columns_by_type"]
+    return {
+        "numerical": columns_by_type["numerical_columns"],
+        "categorical": columns_by_type["categorical_columns"],
+        "text": columns_by_type["text_columns"],
+    }
+
+
+def _replacer(X):
+    from src.replacer import Replacer
+
+    mapper = {
+        column: {
+            value: f"{value}_grouped"
+            for value in X[column].dropna().unique()[: 1 + i * 5]
+        }
+        for i, column in enumerate(_columns()["categorical"])
+    }
+    return Replacer(mapper), X
+
+
+def _date_coercion(X):
+    from src.date_coercion import DateCoercion
+
+    return DateCoercion(list(DATE_COLUMNS)), X
+
+
+def _nan_dropper(X):
+    from src.nan_dropper import NaNColumnsDropper
+
+    return NaNColumnsDropper(threshold=0.5), X
+
+
+def _high_cardinality_dropper(X):
+    from src.high_cardinality_dropper import HighCardinalityDroppper
+
+    return HighCardinalityDroppper(threshold=0.1), X
+
+
+def _imputer(X):
+    from src.imputer import SimpleDataFrameImputer
+
+    return SimpleDataFrameImputer(strategy="median"), X[_columns()["numerical"]]
+
+
+def _scaler(X):
+    from src.scaler import StandardDataFrameScaler
+
+    return StandardDataFrameScaler(), X[_columns()["numerical"]].fillna(0)
+
+
+def _encoder(X):
+    from src.encoder import OneHotDataFrameEncoder
+
+    columns = _columns()
+    X = X[columns["categorical"] + columns["text"]].fillna("undefined")
+    return OneHotDataFrameEncoder(handle_unknown="ignore"), X
+
+
+def _column_transformer(X):
+    from src.column_data_frame_transformer import ColumnDataFrameTransformer
+    from src.encoder import OneHotDataFrameEncoder
+    from src.scaler import StandardDataFrameScaler
+
+    columns = _columns()
+    one_hot_columns = columns["categorical"] + columns["text"]
+    X = X[columns["numerical"] + one_hot_columns].copy()
+    X[columns["numerical"]] = X[columns["numerical"]].fillna(0)
+    X[one_hot_columns] = X[one_hot_columns].fillna("undefined")
+    transformer = ColumnDataFrameTransformer(
+        [
+            ("numeric scaler", StandardDataFrameScaler(), columns["numerical"]),
+            (
+                "cat_and_txt encoder",
+                OneHotDataFrameEncoder(handle_unknown="ignore"),
+                one_hot_columns,
+            ),
+        ]
+    )
+    return transformer, X
+
+
+def _cli_preprocessor(X):
+    from run import make_preprocessor
+
+    config = _common.load_cli_config()
+    columns = _columns()
+    X = X[columns["categorical"] + columns["numerical"] + columns["text"]]
+    return make_preprocessor(config), X
+
+
+CASES: Dict[str, Callable] = {
+    "Replacer": _replacer,
+    "DateCoercion": _date_coercion,
+    "NaNColumnsDropper": _nan_dropper,
+    "HighCardinalityDroppper": _high_cardinality_dropper,
+    "SimpleDataFrameImputer": _imputer,
+    "StandardDataFrameScaler": _scaler,
+    "OneHotDataFrameEncoder": _encoder,
+    "ColumnDataFrameTransformer": _column_transformer,
+    "run.py preprocessor": _cli_preprocessor,
+}
+
+
+def _run_case(case: str, n_rows: int) -> Dict:
+    X = make_lending_club_frame(
+        n_rows, null_rate=lending_club_null_rates(), date_columns=DATE_COLUMNS
+    )
+    transformer, X = CASES[case](X)
+
+    start = time.perf_counter()
+    transformer.fit(X)
+    fit_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    transformer.transform(X)
+    transform_seconds = time.perf_counter() - start
+    return {
+        "case": case,
+        "n_rows": n_rows,
+        "fit_seconds": fit_seconds,
+        "transform_seconds": transform_seconds,
+        "fit_peak_mb": _peak_mb(lambda: transformer.fit(X)),
+        "transform_peak_mb": _peak_mb(lambda: transformer.transform(X)),
+    }
+
+
+def _peak_mb(func) -> float:
+    """Peak memory allocated by a call, above the memory allocated before it."""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 2**20
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _metadata() -> Dict:
+    import numpy as np
+    import pandas as pd
+    import sklearn
+
+    return {
+        "commit": _git_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _compare(
+    results: List[Dict], previous: List[Dict], threshold: float
+) -> Tuple[List[Dict], int]:
+    previous_by_key = {(row["case"], row["n_rows"]): row for row in previous}
+    rows, n_regressions = [], 0
+    for row in results:
+        before = previous_by_key.get((row["case"], row["n_rows"]))
+        if before is None:
+            continue
+        # results of older commits may miss a metric.
+        ratios = {
+            metric: row[metric] / before[metric]
+            if before.get(metric, 0) > 0
+            else None
+            for metric in TIME_METRICS + MEMORY_METRICS
+        }
+        regressed = any(
+            ratios[metric] is not None and ratios[metric] > threshold
+            for metric in TIME_METRICS
+        ) or any(
+            ratios[metric] is not None
+            and ratios[metric] > threshold
+            and row[metric] - before[metric] > MIN_MEMORY_MB
+            for metric in MEMORY_METRICS
+        )
+        n_regressions += regressed
+        rows.append(
+            {
+                "case": row["case"],
+                "n_rows": row["n_rows"],
+                **{f"{metric}_ratio": ratio for metric, ratio in ratios.items()},
+                "regression": regressed,
+            }
+        )
+    return rows, n_regressions
+
+
+def main(
+    sizes: List[int],
+    cases: List[str],
+    output: Optional[str],
+    compare: Optional[str],
+    threshold: float,
+) -> int:
+    results = []
+    for n_rows in sizes:
+        for case in cases:
+            results.append(run_isolated(_run_case, case, n_rows))
+            print_table(results[-1:])
+    print()
+    print_table(results)
+
+    metadata = _metadata()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = output or os.path.join(RESULTS_DIR, f"{metadata['commit']}.json")
+    with open(output, "w", encoding="utf-8") as stream:
+        json.dump({"metadata": metadata, "results": results}, stream, indent=2)
+    print(f"results saved to {output}")
+
+    if compare is None:
+        return 0
+    with open(compare, "r", encoding="utf-8") as stream:
+        previous = json.load(stream)
+    rows, n_regressions = _compare(results, previous["results"], threshold)
+    print(f"\ncompared with {previous['metadata']['commit']}:")
+    print_table(rows)
+    return 1 if n_regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES)
+    parser.add_argument("--output", help="results file, default by commit")
+    parser.add_argument("--compare", help="results file of another commit")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="time or memory ratio above which a case is flagged as a regression",
+    )
+    args = parser.parse_args()
+    raise SystemExit(
+        main(args.sizes, args.cases, args.output, args.compare, args.threshold)
+    )
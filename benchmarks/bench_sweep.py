@@ -0,0 +1,100 @@
+"""Throughput of classifier sweeps, relaunching the pipeline vs `modules.sweep`.
+
+"per trial" refits the run.py preprocessor and the classifier for every config,
+as relaunching `run.py` per trial does (without the I/O). "sweep" preprocesses
+once, writes the features with `write_features` and runs the trials with
+`run_trials`, with 1 worker and with one worker per core. Checks that every mode
+gives the same validation f1 scores.
+
+Usage:
+    python benchmarks/bench_sweep.py [n_rows] [n_trials] [n_estimators]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.metrics import f1_score
+
+from _common import load_cli_config, make_lending_club_frame, print_table
+from modules.sweep import encode_features, run_trials, sweep_configs, write_features
+from run import make_preprocessor
+
+
+def main(n_rows: int, n_trials: int, n_estimators: int) -> None:
+    from lightgbm import LGBMClassifier
+
+    config = load_cli_config()
+    target_column = config["target_column"]
+    df_train = make_lending_club_frame(n_rows, seed=0)
+    df_val = make_lending_club_frame(n_rows // 4, seed=1)
+    X_train, y_train = df_train.drop(columns=[target_column]), df_train[target_column]
+    X_val, y_val = df_val.drop(columns=[target_column]), df_val[target_column]
+
+    base_params = {**config["classifier"], "n_estimators": n_estimators}
+    configs = sweep_configs(config["sweep"]["grid"], n_iter=n_trials, random_state=0)
+    classes = np.unique(y_train)
+    pos_label = int(np.searchsorted(classes, config["positive_label_value"]))
+
+    start = time.perf_counter()
+    expected = []
+    for params in configs:
+        preprocessor = make_preprocessor(config)
+        classifier = LGBMClassifier(**{**base_params, **params})
+        X_features = encode_features(preprocessor.fit_transform(X_train, y_train))
+        classifier.fit(X_features, np.searchsorted(classes, y_train))
+        y_pred = classifier.predict(
+            encode_features(preprocessor.transform(X_val))
+        )
+        expected.append(
+            f1_score(np.searchsorted(classes, y_val), y_pred, pos_label=pos_label)
+        )
+    per_trial_seconds = time.perf_counter() - start
+    rows = [
+        {
+            "mode": "per trial",
+            "n_trials": len(configs),
+            "seconds": per_trial_seconds,
+            "trials_per_second": len(configs) / per_trial_seconds,
+            "speedup": 1.0,
+            "same_f1": True,
+        }
+    ]
+
+    n_cores = os.cpu_count() or 1
+    for n_jobs in sorted({1, n_cores}):
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            preprocessor = make_preprocessor(config)
+            paths = write_features(
+                directory,
+                X_train=encode_features(preprocessor.fit_transform(X_train, y_train)),
+                y_train=np.searchsorted(classes, y_train),
+                X_val=encode_features(preprocessor.transform(X_val)),
+                y_val=np.searchsorted(classes, y_val),
+            )
+            results = run_trials(configs, paths, base_params, pos_label, n_jobs=n_jobs)
+            seconds = time.perf_counter() - start
+        rows.append(
+            {
+                "mode": f"sweep, n_jobs={n_jobs}",
+                "n_trials": len(configs),
+                "seconds": seconds,
+                "trials_per_second": len(configs) / seconds,
+                "speedup": per_trial_seconds / seconds,
+                "same_f1": bool(
+                    np.allclose([r["f1_validation"] for r in results], expected)
+                ),
+            }
+        )
+    print(f"cores: {n_cores}")
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 200,
+    )
@@ -0,0 +1,83 @@
+"""Module to write and read the data artifacts handed between pipeline stages."""
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+from pyarrow import feather
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+FEATHER_EXTENSIONS = (".feather", ".arrow")
+
+
+def write_artifact(
+    df: pd.DataFrame, path: str, row_group_size: int = 100_000
+) -> None:
+    """Writes a DataFrame in the format given by the extension of path.
+
+    Parquet and Arrow IPC (feather) keep the dtypes, e.g. categoricals and the
+    datetimes created by `DateCoercion`, so the next stage does not parse text.
+    Parquet files are written with min/max statistics per row group, which let
+    readers skip row groups when filtering.
+
+    Args:
+        df (pd.DataFrame): Data to write.
+        path (str): Path of the artifact, ".parquet", ".feather"/".arrow" or ".csv".
+        row_group_size (int, optional): Rows per Parquet row group. Defaults to
+            100_000.
+    """
+    extension = _extension(path)
+    if extension in PARQUET_EXTENSIONS:
+        df.to_parquet(
+            path,
+            engine="pyarrow",
+            index=False,
+            row_group_size=row_group_size,
+            write_statistics=True,
+        )
+    elif extension in FEATHER_EXTENSIONS:
+        # uncompressed, so the file can be memory mapped when it is read.
+        df.reset_index(drop=True).to_feather(path, compression="uncompressed")
+    else:
+        df.to_csv(path, index=False)
+
+
+def read_artifact(
+    path: str,
+    columns: Optional[List[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    """Reads an artifact written by `write_artifact`, or any CSV file.
+
+    Only the given columns are read from Parquet and Arrow files. Arrow files are
+    memory mapped, so they are read without an intermediate buffer, but
+    `to_pandas` still copies the columns into the DataFrame.
+
+    Args:
+        path (str): Path of the artifact.
+        columns (List[str], optional): Columns to read. Defaults to all.
+        dtypes (Dict[str, str], optional): Dtype per column. Columns stored with
+            another dtype are cast after reading. Defaults to None.
+
+    Returns:
+        pd.DataFrame: Data of the artifact.
+    """
+    extension = _extension(path)
+    if extension in PARQUET_EXTENSIONS:
+        df = pd.read_parquet(path, engine="pyarrow", columns=columns)
+    elif extension in FEATHER_EXTENSIONS:
+        df = feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+    else:
+        return pd.read_csv(path, usecols=columns, dtype=dtypes, engine="pyarrow")
+
+    if dtypes:
+        dtypes = {
+            column: dtype
+            for column, dtype in dtypes.items()
+            if column in df.columns and df[column].dtype != dtype
+        }
+        df = df.astype(dtypes, copy=False)
+    return df
+
+
+def _extension(path: str) -> str:
+    return os.path.splitext(path)[1].lower()
@@ -0,0 +1,273 @@
+"""Module to reuse fitted transformers across runs when data and params are equal."""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+from typing import Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, clone
+
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+
+class FittedTransformerCache:
+    """Disk cache of fitted transformers, and optionally of their outputs.
+
+    Entries are keyed by the fingerprint of the input data and the unfitted
+    transformer (its class, `get_params()`, the source code of the classes involved
+    and of the `modules` package), so a changed config, dataset or transformer code
+    misses the cache.
+    The least recently used entries are evicted when the cache grows above
+    `max_size_mb`.
+    """
+
+    def __init__(
+        self,
+        directory: str = ".transformer_cache",
+        max_size_mb: float = 2048,
+        store_outputs: bool = False,
+    ) -> None:
+        """Initializes the cache.
+
+        Args:
+            directory (str, optional): Directory of the entries. Defaults to
+                ".transformer_cache".
+            max_size_mb (float, optional): Largest size of the cache. Defaults to
+                2048.
+            store_outputs (bool, optional): If True, `fit_transform` also stores
+                the transformed data, so a hit skips the transform too. Defaults to
+                False.
+        """
+        self.directory = directory
+        self.max_size_mb = max_size_mb
+        self.store_outputs = store_outputs
+
+    def key(self, transformer, X, y=None, fingerprint: Optional[str] = None) -> str:
+        """Computes the cache key of fitting a transformer on X.
+
+        Args:
+            transformer: Unfitted, or fitted, transformer.
+            X: Input data.
+            y (optional): Target. Defaults to None.
+            fingerprint (str, optional): Fingerprint of X computed by the caller,
+                e.g. `file_fingerprint` of the file X was read from, which avoids
+                hashing the data. The columns and dtypes of X are still part of
+                the key. Defaults to None.
+
+        Returns:
+            str: Key of the entry.
+        """
+        if fingerprint is None:
+            fingerprint = data_fingerprint(X)
+        elif isinstance(X, pd.DataFrame):
+            fingerprint += str(list(zip(X.columns, X.dtypes.astype(str))))
+        return _hash(
+            fingerprint,
+            data_fingerprint(y) if y is not None else "",
+            estimator_fingerprint(transformer),
+        )
+
+    def fit(self, transformer, X, y=None, fingerprint: Optional[str] = None):
+        """Returns the transformer fitted on X, loaded from the cache if possible.
+
+        Args:
+            transformer: Transformer to fit.
+            X: Input data.
+            y (optional): Target. Defaults to None.
+            fingerprint (str, optional): Fingerprint of X, see `key`. Defaults to
+                None.
+
+        Returns:
+            Fitted transformer.
+        """
+        path = self._entry_path(self.key(transformer, X, y, fingerprint))
+        fitted = self._load(path, "transformer.joblib")
+        if fitted is None:
+            fitted = transformer.fit(X, y)
+            self._store(path, {"transformer.joblib": fitted})
+        return fitted
+
+    def fit_transform(
+        self, transformer, X, y=None, fingerprint: Optional[str] = None
+    ) -> Tuple:
+        """Returns the transformer fitted on X and X transformed.
+
+        With `store_outputs`, both come from the cache on a hit. Otherwise the
+        fitted transformer is loaded and X is transformed again.
+
+        Args:
+            transformer: Transformer to fit.
+            X: Input data.
+            y (optional): Target. Defaults to None.
+            fingerprint (str, optional): Fingerprint of X, see `key`. Defaults to
+                None.
+
+        Returns:
+            Tuple: Fitted transformer and transformed data.
+        """
+        path = self._entry_path(self.key(transformer, X, y, fingerprint))
+        fitted = self._load(path, "transformer.joblib")
+        if fitted is not None:
+            X_transformed = (
+                self._load(path, "output.joblib") if self.store_outputs else None
+            )
+            if X_transformed is None:
+                X_transformed = fitted.transform(X)
+            return fitted, X_transformed
+
+        X_transformed = transformer.fit_transform(X, y)
+        files = {"transformer.joblib": transformer}
+        if self.store_outputs:
+            files["output.joblib"] = X_transformed
+        self._store(path, files)
+        return transformer, X_transformed
+
+    def clear(self) -> None:
+        """Removes every entry of the cache."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _load(self, path: str, name: str):
+        # a concurrent run may evict the entry at any point, which is a miss.
+        try:
+            # the access time drives the LRU eviction.
+            os.utime(path)
+            return joblib.load(os.path.join(path, name))
+        except FileNotFoundError:
+            return None
+
+    def _store(self, path: str, files: dict) -> None:
+        # files are written to a temporary directory first, so concurrent runs
+        # never read a half written entry.
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name, value in files.items():
+            joblib.dump(value, os.path.join(tmp_path, name))
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if ".tmp" in name or not os.path.isdir(path):
+                continue
+            size = sum(
+                os.path.getsize(os.path.join(path, file_name))
+                for file_name in os.listdir(path)
+            )
+            entries.append((os.path.getmtime(path), size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_mb * 2**20:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+
+def data_fingerprint(X) -> str:
+    """Hashes data column by column, including names and dtypes.
+
+    Args:
+        X: DataFrame, Series or array.
+
+    Returns:
+        str: Fingerprint of the data.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(X, pd.Series):
+        X = X.to_frame()
+    if isinstance(X, pd.DataFrame):
+        digest.update(str(X.shape).encode())
+        for column, values in X.items():
+            digest.update(f"{column}:{values.dtype}".encode())
+            digest.update(
+                pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes()
+            )
+    else:
+        X = np.ascontiguousarray(X)
+        digest.update(f"{X.shape}:{X.dtype}".encode())
+        digest.update(X.tobytes() if X.dtype != object else joblib.hash(X).encode())
+    return digest.hexdigest()
+
+
+def file_fingerprint(path: str) -> str:
+    """Fingerprints a data file without reading its data.
+
+    Parquet files are fingerprinted by their footer: schema, row groups and their
+    column statistics. Other files by their size and modification time.
+
+    Args:
+        path (str): Path of the file.
+
+    Returns:
+        str: Fingerprint of the file.
+    """
+    if os.path.splitext(path)[1].lower() in PARQUET_EXTENSIONS:
+        from pyarrow import parquet
+
+        metadata = parquet.ParquetFile(path).metadata.to_dict()
+        metadata.pop("created_by", None)
+        return _hash(json.dumps(metadata, sort_keys=True, default=str))
+    stat = os.stat(path)
+    return _hash(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def estimator_fingerprint(estimator) -> str:
+    """Hashes an unfitted copy of an estimator with the source code of its classes
+    and of every module of the `modules` package, which they import.
+
+    Args:
+        estimator: Estimator, fitted or not.
+
+    Returns:
+        str: Fingerprint of the estimator.
+    """
+    estimators = [estimator] + [
+        value
+        for value in estimator.get_params(deep=True).values()
+        if isinstance(value, BaseEstimator)
+    ]
+    sources = {
+        inspect.getsourcefile(type(estimator)) or type(estimator).__module__
+        for estimator in estimators
+    }
+    package_sources = _package_sources()
+    sources = sorted(
+        {source for source in sources if os.path.abspath(source) not in package_sources}
+    ) + sorted(package_sources)
+    source_hashes = [
+        _hash(_read_bytes(source)) if os.path.exists(source) else source
+        for source in sources
+    ]
+    return _hash(joblib.hash(clone(estimator)), *source_hashes)
+
+
+def _package_sources() -> set:
+    """Paths of the python files of the `modules` package."""
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return {
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith(".py")
+    }
+
+
+def _read_bytes(path: str) -> bytes:
+    with open(path, "rb") as stream:
+        return stream.read()
+
+
+def _hash(*parts) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+    return digest.hexdigest()
@@ -0,0 +1,253 @@
+"""Module to score single records with a fitted preprocessor without DataFrames."""
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+import numpy as np
+from sklearn.pipeline import Pipeline
+
+from modules.column_transformer import ColumnDataFrameTransformer
+from modules.downcaster import DtypeDowncaster
+from modules.enconder import OneHotDataFrameEncoder
+from modules.imputer import Imputer
+from modules.scaler import StandardDataFrameScaler
+
+
+class CompiledPreprocessor:
+    """Flat NumPy version of a fitted `Imputer` -> `ColumnDataFrameTransformer`
+    pipeline, for online scoring.
+
+    The fitted fillers, means, scales and categories are copied into arrays and
+    dicts, so a record is transformed without building any DataFrame, checking
+    columns or dispatching through the ColumnTransformer. The features have the
+    same values and order as `preprocessor.transform`, including the rounding of
+    `DtypeDowncaster` steps and of scalers with a `dtype`.
+
+    The ColumnDataFrameTransformer may only contain `StandardDataFrameScaler` and
+    `OneHotDataFrameEncoder` transformers (with handle_unknown="ignore" or
+    max_categories), without transformer weights.
+    """
+
+    def __init__(self, preprocessor: Pipeline) -> None:
+        """Compiles a fitted preprocessor.
+
+        Args:
+            preprocessor (Pipeline): Fitted pipeline with an optional `Imputer`
+                step followed by a `ColumnDataFrameTransformer`, and optionally
+                `DtypeDowncaster` steps.
+        """
+        steps = [
+            step for _, step in preprocessor.steps if step not in (None, "passthrough")
+        ]
+        # the downcasters round the numerical values, replayed by `_downcast`.
+        downcasters = [step for step in steps if isinstance(step, DtypeDowncaster)]
+        steps = [step for step in steps if not isinstance(step, DtypeDowncaster)]
+        imputer = steps.pop(0) if isinstance(steps[0], Imputer) else None
+        if len(steps) != 1 or not isinstance(steps[0], ColumnDataFrameTransformer):
+            raise ValueError(
+                "The preprocessor should be an optional Imputer followed by a "
+                "ColumnDataFrameTransformer."
+            )
+        column_transformer = steps[0]
+        if column_transformer.transformer_weights is not None:
+            raise ValueError("transformer_weights are not supported.")
+
+        fillers = self._fillers(imputer)
+        # text columns imputed with text_mode="fill" are encoded as categoricals.
+        self.text_columns = (
+            set(imputer.text_columns)
+            if imputer and imputer.text_mode == "indicator"
+            else set()
+        )
+        self.feature_names = list(column_transformer.get_feature_names_out())
+
+        self._numerical_columns: List[str] = []
+        numerical_fillers, means, scales, numerical_positions = [], [], [], []
+        scaler_dtypes = []
+        self._categorical_columns: List[str] = []
+        self._categorical_fillers: List = []
+        self._category_positions: List[Dict] = []
+        self._other_positions: List = []
+
+        position = 0
+        for name, transformer, columns in column_transformer.transformers_:
+            if transformer == "drop" or name == "remainder":
+                continue
+            if isinstance(transformer, StandardDataFrameScaler):
+                scaler = transformer.std_scaler
+                n_columns = len(transformer.column_names)
+                self._numerical_columns += list(transformer.column_names)
+                numerical_fillers += [
+                    fillers.get(column, np.nan) for column in transformer.column_names
+                ]
+                means.append(
+                    scaler.mean_ if scaler.with_mean else np.zeros(n_columns)
+                )
+                scales.append(scaler.scale_ if scaler.with_std else np.ones(n_columns))
+                numerical_positions.append(np.arange(position, position + n_columns))
+                scaler_dtypes += [transformer.dtype] * n_columns
+                position += n_columns
+            elif isinstance(transformer, OneHotDataFrameEncoder):
+                if (
+                    transformer.handle_unknown != "ignore"
+                    and transformer.max_categories is None
+                ):
+                    raise ValueError(
+                        f"Encoder {name!r} should use handle_unknown='ignore'."
+                    )
+                for column, categories in zip(
+                    transformer.column_names, transformer.one_hot_encoder.categories_
+                ):
+                    self._categorical_columns.append(column)
+                    self._categorical_fillers.append(fillers.get(column))
+                    self._category_positions.append(
+                        {
+                            category: position + i
+                            for i, category in enumerate(categories)
+                        }
+                    )
+                    position += len(categories)
+                    if transformer.max_categories is None:
+                        self._other_positions.append(None)
+                    else:
+                        self._other_positions.append(position)
+                        position += 1
+            else:
+                raise ValueError(
+                    f"Transformer {name!r} of type {type(transformer).__name__} "
+                    "can't be compiled."
+                )
+
+        self._numerical_fillers = np.asarray(numerical_fillers, dtype=float)
+        self._means = np.concatenate(means) if means else np.empty(0)
+        self._scales = np.concatenate(scales) if scales else np.empty(0)
+        self._numerical_positions = (
+            np.concatenate(numerical_positions)
+            if numerical_positions
+            else np.empty(0, dtype=int)
+        )
+        self.n_features = position
+        self._downcasts = [
+            _column_groups(
+                [downcaster.dtypes_.get(column) for column in self._numerical_columns]
+            )
+            for downcaster in downcasters
+        ]
+        self._downcast_float_dtypes = [
+            np.dtype(downcaster.float_dtype) for downcaster in downcasters
+        ]
+        self._scaler_dtypes = _column_groups(scaler_dtypes)
+
+    def transform_record(self, record: Mapping) -> np.ndarray:
+        """Transforms a single record.
+
+        Args:
+            record (Mapping): Values by column, missing values as None or NaN.
+
+        Returns:
+            np.ndarray: Feature vector, in the order of `feature_names`.
+        """
+        features = np.zeros(self.n_features)
+        self._transform_into(record, features)
+        return features
+
+    def transform_records(self, records: Iterable[Mapping]) -> np.ndarray:
+        """Transforms a batch of records.
+
+        Args:
+            records (Iterable[Mapping]): Records, or a pyarrow RecordBatch/Table.
+
+        Returns:
+            np.ndarray: Feature matrix with one row per record.
+        """
+        if hasattr(records, "to_pylist"):
+            records = records.to_pylist()
+        records = list(records)
+        features = np.zeros((len(records), self.n_features))
+        for record, row in zip(records, features):
+            self._transform_into(record, row)
+        return features
+
+    def _transform_into(self, record: Mapping, features: np.ndarray) -> None:
+        values = np.array(
+            [record.get(column) for column in self._numerical_columns], dtype=float
+        )
+        is_null = np.isnan(values)
+        values[is_null] = self._numerical_fillers[is_null]
+        self._downcast(values)
+        features[self._numerical_positions] = self._scale(values)
+
+        for column, filler, positions, other_position in zip(
+            self._categorical_columns,
+            self._categorical_fillers,
+            self._category_positions,
+            self._other_positions,
+        ):
+            value = record.get(column)
+            if column in self.text_columns:
+                value = "undefined" if _is_null(value) else "defined"
+            elif _is_null(value):
+                value = filler
+            # unknown categories are encoded as zeros, or as "other" with
+            # max_categories, as the encoders do.
+            position = positions.get(value, other_position)
+            if position is not None:
+                features[position] = 1
+
+    def _downcast(self, values: np.ndarray) -> None:
+        """Rounds values in place to the dtypes of the `DtypeDowncaster` steps, as
+        they round a DataFrame of the record alone."""
+        for groups, float_dtype in zip(self._downcasts, self._downcast_float_dtypes):
+            for dtype, indexes in groups:
+                column_values = values[indexes]
+                if dtype.kind == "f":
+                    values[indexes] = column_values.astype(dtype)
+                    continue
+                # values an int dtype can't hold fall back to float_dtype, as
+                # `_to_integer` does.
+                info = np.iinfo(dtype)
+                with np.errstate(invalid="ignore"):
+                    is_integer = (
+                        (column_values == np.trunc(column_values))
+                        & (column_values >= info.min)
+                        & (column_values <= info.max)
+                    )
+                values[indexes] = np.where(
+                    is_integer, column_values, column_values.astype(float_dtype)
+                )
+
+    def _scale(self, values: np.ndarray) -> np.ndarray:
+        """Scales values as `StandardScaler.transform` does, in the dtype of the
+        scalers: the values are cast to it, and every in-place operation rounds
+        its float64 result back to it."""
+        scaled = (values - self._means) / self._scales
+        for dtype, indexes in self._scaler_dtypes:
+            column_values = values[indexes].astype(dtype)
+            centered = (column_values - self._means[indexes]).astype(dtype)
+            scaled[indexes] = (centered / self._scales[indexes]).astype(dtype)
+        return scaled
+
+    @staticmethod
+    def _fillers(imputer: Imputer) -> Dict:
+        if imputer is None:
+            return {}
+        return {
+            **imputer._filler_categorical.to_dict(),
+            **imputer._filler_numerical.to_dict(),
+            **{column: "undefined" for column in imputer.text_columns},
+        }
+
+
+def _column_groups(dtypes: List) -> List[Tuple[np.dtype, np.ndarray]]:
+    """Groups the positions of the numerical columns by dtype, skipping None,
+    float64 and the non numerical dtypes."""
+    groups: Dict[np.dtype, List[int]] = {}
+    for i, dtype in enumerate(dtypes):
+        if dtype is None or dtype == "category":
+            continue
+        dtype = np.dtype(dtype)
+        if dtype.kind in "fiu" and dtype != np.float64:
+            groups.setdefault(dtype, []).append(i)
+    return [(dtype, np.asarray(indexes)) for dtype, indexes in groups.items()]
+
+
+def _is_null(value) -> bool:
+    return value is None or value != value
@@ -0,0 +1,120 @@
+"""Module to convert DataFrame columns to compact dtypes."""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+from sklearn.base import BaseEstimator, TransformerMixin
+
+from modules.profiling import profiled
+
+INTEGER_DTYPES = (np.int8, np.int16, np.int32)
+
+
+class DtypeDowncaster(BaseEstimator, TransformerMixin):
+    """Converts the columns of a DataFrame to compact dtypes.
+
+    Categorical columns become `category`, numerical columns whose values at fit
+    are integers become the smallest int dtype that holds them, and the other
+    numerical columns become `float_dtype`. The dtypes are chosen at fit, so every
+    transform returns the same dtypes, except for integer columns receiving values
+    an int dtype can't hold (nulls, fractions or out of range values), which fall
+    back to `float_dtype` instead of losing them.
+    """
+
+    def __init__(
+        self,
+        categorical_columns: Optional[list] = None,
+        float_dtype: str = "float32",
+        downcast_integers: bool = True,
+        inplace: bool = False,
+    ) -> None:
+        """Initializes the downcaster.
+
+        Args:
+            categorical_columns (list, optional): Columns converted to `category`.
+                Defaults to None, which means every object column.
+            float_dtype (str, optional): Dtype of the numerical columns that are
+                not integers. Defaults to "float32".
+            downcast_integers (bool, optional): If False, every numerical column
+                becomes `float_dtype`. Defaults to True.
+            inplace (bool, optional): If True, the columns of the input DataFrame
+                are replaced in place. If False, the input is never modified.
+                Defaults to False.
+        """
+        self.categorical_columns = categorical_columns
+        self.float_dtype = float_dtype
+        self.downcast_integers = downcast_integers
+        self.inplace = inplace
+
+    @profiled
+    def fit(self, X: pd.DataFrame, y=None):
+        """Chooses the dtype of every column of X.
+
+        Args:
+            X (pd.DataFrame): Input data.
+            y (, optional): Ignored. Defaults to None.
+
+        Returns:
+            DtypeDowncaster: instance fitted.
+        """
+        categorical_columns = self.categorical_columns
+        if categorical_columns is None:
+            categorical_columns = list(X.columns[X.dtypes == object])
+
+        self.dtypes_ = {column: "category" for column in categorical_columns}
+        for column, values in X.items():
+            if column in self.dtypes_:
+                continue
+            if is_numeric_dtype(values) and not is_bool_dtype(values):
+                self.dtypes_[column] = self._numerical_dtype(values)
+        return self
+
+    @profiled
+    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+        """Converts the columns of X to the dtypes chosen at fit.
+
+        Args:
+            X (pd.DataFrame): Input data.
+
+        Returns:
+            pd.DataFrame: Data with compact dtypes.
+        """
+        df = X if self.inplace else X.copy(deep=False)
+        for column, dtype in self.dtypes_.items():
+            values = df[column]
+            if values.dtype == dtype:
+                continue
+            if dtype == "category":
+                df[column] = values.astype("category")
+            elif dtype == self.float_dtype:
+                df[column] = values.astype(dtype)
+            else:
+                df[column] = _to_integer(values, dtype, self.float_dtype)
+        return df
+
+    def _numerical_dtype(self, values: pd.Series):
+        if not self.downcast_integers or values.hasnans:
+            return self.float_dtype
+        array = values.to_numpy()
+        if array.dtype.kind == "f" and not np.array_equal(array, np.trunc(array)):
+            return self.float_dtype
+        if len(array) == 0:
+            return INTEGER_DTYPES[0]
+        low, high = array.min(), array.max()
+        for dtype in INTEGER_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return dtype
+        return self.float_dtype
+
+
+def _to_integer(values: pd.Series, dtype, float_dtype: str) -> np.ndarray:
+    """Casts values to an int dtype, or to float_dtype if it changes them."""
+    array = values.to_numpy()
+    with np.errstate(invalid="ignore"):
+        converted = array.astype(dtype)
+    # nulls, fractions and out of range values don't survive the round trip.
+    if np.array_equal(converted, array):
+        return converted
+    return array.astype(float_dtype)
@@ -1,19 +1,63 @@
 """Modules to encode data."""
+from typing import List, Optional, Union
+
+import numpy as np
 import pandas as pd
+from scipy import sparse as sp
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import OneHotEncoder
 
+from modules.profiling import profiled
+from modules.schema import ColumnSchema
+
+OUTPUT_FORMATS = ("dense", "sparse_frame", "csr")
+
 
 class OneHotDataFrameEncoder(BaseEstimator, TransformerMixin):
-    """Encodes and keeps names of categorical features as a one-hot code structure."""
+    """Encodes and keeps names of categorical features as a one-hot code structure.
+
+    Columns may be object or `pd.Categorical`. Every column is converted once into
+    integer codes of the categories learned at fit, with pandas hash tables, and
+    the one-hot codes are built directly from them as a CSR matrix, instead of
+    comparing the values one by one as `OneHotEncoder.transform` does. Categorical
+    columns only look up their categories, not their values.
+    """
 
-    def __init__(self, handle_unknown="ignore") -> None:
-        """Initializes the encoder."""
+    def __init__(
+        self,
+        handle_unknown="ignore",
+        output_format="dense",
+        reorder_columns=False,
+        max_categories: Optional[int] = None,
+    ) -> None:
+        """Initializes the encoder.
+
+        Args:
+            handle_unknown (str, optional): How to handle unknown categories during
+                transform. Defaults to "ignore".
+            output_format (str, optional): Container returned by `transform`:
+                "dense" (int8 DataFrame), "sparse_frame" (DataFrame backed by
+                `pd.SparseDtype` columns) or "csr" (scipy CSR matrix, feature names
+                available through `get_feature_names_out`). The sparse formats never
+                build a dense copy. Defaults to "dense".
+            reorder_columns (bool, optional): If True, `transform` selects the
+                columns seen at fit time by name, instead of failing when they come
+                in another order. Defaults to False.
+            max_categories (int, optional): If set, only the max_categories most
+                frequent values of every column at fit time get their own feature,
+                and the others, as well as the unknown values at transform, share
+                an "<column>_other" feature, e.g. for high cardinality text columns.
+                handle_unknown is then ignored. Defaults to None.
+        """
         self.handle_unknown = handle_unknown
+        self.output_format = output_format
+        self.reorder_columns = reorder_columns
+        self.max_categories = max_categories
         self.one_hot_encoder = OneHotEncoder(handle_unknown=handle_unknown)
         self.column_names = []
         self.feature_names = []
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the one hot encoder based on X.
 
@@ -24,29 +68,252 @@ class OneHotDataFrameEncoder(BaseEstimator, TransformerMixin):
         Returns:
             OneHotDataFrameEncoder: instance fitted.
         """
-        self.one_hot_encoder.fit(X)
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"output_format should be one of {OUTPUT_FORMATS}, "
+                f"got {self.output_format!r}."
+            )
+        self.one_hot_encoder.fit(_unique_values_frame(X, self.max_categories))
+        self._category_indexes = [
+            pd.Index(categories) for categories in self.one_hot_encoder.categories_
+        ]
         self.column_names = X.columns
+        self.schema_ = ColumnSchema.from_frame(X)
         self.feature_names = self.one_hot_encoder.get_feature_names_out()
+        if self.max_categories is not None:
+            names_by_column = np.split(
+                self.feature_names,
+                np.cumsum([len(index) for index in self._category_indexes])[:-1],
+            )
+            self.feature_names = np.concatenate(
+                [
+                    np.append(names, f"{column}_other")
+                    for column, names in zip(X.columns, names_by_column)
+                ]
+            ).astype(object)
         return self
 
-    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
-        """Scales X and adds column names.
+    @profiled
+    def transform(self, X: pd.DataFrame) -> Union[pd.DataFrame, sp.csr_matrix]:
+        """Encodes X and adds column names.
 
         Args:
             X (pd.DataFrame): Input data.
 
         Returns:
-            pd.DataFrame: scaled data.
+            Union[pd.DataFrame, sp.csr_matrix]: encoded data in the container selected
+                by `output_format`.
         """
-        assert str(X.columns) == str(
-            self.column_names
-        ), f"Columns don't have same order/elements. Valid order: {self.column_names}"
+        X = self.schema_.validate(X, reorder=self.reorder_columns)
+        return _one_hot_output(
+            self._encode(X),
+            self._category_sizes(),
+            self.feature_names,
+            self.output_format,
+        )
+
+    def _category_sizes(self) -> List[int]:
+        """Number of features of every column."""
+        n_other = 0 if self.max_categories is None else 1
+        return [len(index) + n_other for index in self._category_indexes]
 
-        X_encoded = self.one_hot_encoder.transform(X)
+    def _encode(self, X: pd.DataFrame) -> np.ndarray:
+        """Codes of the fitted categories of every value of X, -1 if unknown, or
+        the code of the "other" feature with max_categories.
+
+        Raises:
+            ValueError: if a value is unknown and handle_unknown is "error".
+        """
+        codes = np.empty(X.shape, dtype=np.int64)
+        for i, index in enumerate(self._category_indexes):
+            column = X.iloc[:, i]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                # the categories of the column are looked up once; -1, the code
+                # of missing values, selects the appended code of a fitted NaN
+                # category, as get_indexer matches NaN on object columns.
+                lookup = np.append(
+                    index.get_indexer(column.cat.categories),
+                    index.get_indexer([np.nan])[0],
+                )
+                codes[:, i] = lookup[column.cat.codes.to_numpy()]
+            else:
+                codes[:, i] = index.get_indexer(column)
+
+            if self.max_categories is not None:
+                codes[codes[:, i] < 0, i] = len(index)
+            elif self.handle_unknown == "error" and (codes[:, i] < 0).any():
+                unknown = pd.unique(column[codes[:, i] < 0])
+                raise ValueError(
+                    f"Found unknown categories {list(unknown)} in column {i} during "
+                    "transform"
+                )
+        return codes
+
+    def get_feature_names_out(self, input_features=None):
+        return self.feature_names
+
+    def _more_tags(self):
+        # every column is fitted on its own, so wide branches can be split.
+        return {"column_separable": True}
+
+
+class HashingDataFrameEncoder(BaseEstimator, TransformerMixin):
+    """Encodes every column into a fixed number of hashed one-hot features.
+
+    Each value sets the feature `hash(value) % n_features` of its column, with the
+    stable hash of `pd.util.hash_pandas_object`, so the width and memory of the
+    output do not grow with the vocabulary and no vocabulary is stored, e.g. for
+    high cardinality text columns. Distinct values may share a feature. Categorical
+    columns only hash their categories.
+    """
+
+    def __init__(
+        self,
+        n_features: int = 64,
+        output_format: str = "dense",
+        reorder_columns: bool = False,
+    ) -> None:
+        """Initializes the encoder.
+
+        Args:
+            n_features (int, optional): Number of features of every column.
+                Defaults to 64.
+            output_format (str, optional): Container returned by `transform`, see
+                `OneHotDataFrameEncoder`. Defaults to "dense".
+            reorder_columns (bool, optional): If True, `transform` selects the
+                columns seen at fit time by name, instead of failing when they come
+                in another order. Defaults to False.
+        """
+        self.n_features = n_features
+        self.output_format = output_format
+        self.reorder_columns = reorder_columns
+        self.column_names = []
+        self.feature_names = []
+
+    @profiled
+    def fit(self, X: pd.DataFrame, y=None):
+        """Records the columns of X, nothing else is learned.
 
-        return pd.DataFrame(
-            X_encoded.toarray().astype("int8"), columns=self.feature_names
+        Args:
+            X (pd.DataFrame): Input data.
+            y (, optional): Ignored. Defaults to None.
+
+        Returns:
+            HashingDataFrameEncoder: instance fitted.
+        """
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"output_format should be one of {OUTPUT_FORMATS}, "
+                f"got {self.output_format!r}."
+            )
+        self.column_names = X.columns
+        self.schema_ = ColumnSchema.from_frame(X)
+        self.feature_names = np.array(
+            [
+                f"{column}_hash{i}"
+                for column in X.columns
+                for i in range(self.n_features)
+            ],
+            dtype=object,
+        )
+        return self
+
+    @profiled
+    def transform(self, X: pd.DataFrame) -> Union[pd.DataFrame, sp.csr_matrix]:
+        """Encodes X and adds column names.
+
+        Args:
+            X (pd.DataFrame): Input data.
+
+        Returns:
+            Union[pd.DataFrame, sp.csr_matrix]: encoded data in the container selected
+                by `output_format`.
+        """
+        X = self.schema_.validate(X, reorder=self.reorder_columns)
+        codes = np.empty(X.shape, dtype=np.int64)
+        for i in range(X.shape[1]):
+            hashes = pd.util.hash_pandas_object(X.iloc[:, i], index=False)
+            codes[:, i] = hashes.to_numpy() % np.uint64(self.n_features)
+        return _one_hot_output(
+            codes,
+            [self.n_features] * X.shape[1],
+            self.feature_names,
+            self.output_format,
         )
 
     def get_feature_names_out(self, input_features=None):
         return self.feature_names
+
+    def _more_tags(self):
+        # every column is hashed on its own, so wide branches can be split.
+        return {"column_separable": True}
+
+
+def _unique_values_frame(
+    X: pd.DataFrame, max_categories: Optional[int] = None
+) -> pd.DataFrame:
+    """Frame with the unique values of every column of X, repeated to equal length.
+
+    The encoder only needs each value once, and `pd.unique` finds them with a hash
+    table, so fitting on this frame gives the same categories as fitting on X
+    without sorting every value. With max_categories, only the most frequent
+    values are kept.
+    """
+    if max_categories is None:
+        values = [np.asarray(pd.unique(X[column])) for column in X.columns]
+    else:
+        values = []
+        for column in X.columns:
+            counts = X[column].value_counts(dropna=False)
+            counts = counts[counts > 0]
+            values.append(np.asarray(counts.index[:max_categories]))
+    n_rows = max((len(column_values) for column_values in values), default=0)
+    return pd.DataFrame(
+        {
+            column: np.resize(column_values, n_rows)
+            for column, column_values in zip(X.columns, values)
+        },
+        columns=X.columns,
+    )
+
+
+def _one_hot_output(
+    codes: np.ndarray, sizes: List[int], feature_names, output_format: str
+) -> Union[pd.DataFrame, sp.csr_matrix]:
+    """Builds the int8 one-hot codes of integer codes in the requested container.
+
+    The codes are written straight into the container, so the dense format never
+    builds a sparse matrix and the sparse formats never allocate a dense one.
+
+    Args:
+        codes (np.ndarray): Code of every value by column, -1 for no feature.
+        sizes (List[int]): Number of features of every column.
+        feature_names: Names of the features.
+        output_format (str): See `OUTPUT_FORMATS`.
+
+    Returns:
+        Union[pd.DataFrame, sp.csr_matrix]: One-hot codes.
+    """
+    n_rows = codes.shape[0]
+    offsets = np.cumsum([0] + list(sizes))
+    known = codes >= 0
+    indices = codes + offsets[:-1]
+    if output_format == "dense":
+        X_encoded = np.zeros((n_rows, offsets[-1]), dtype=np.int8)
+        rows = np.broadcast_to(np.arange(n_rows)[:, None], codes.shape)
+        X_encoded[rows[known], indices[known]] = 1
+        return pd.DataFrame(X_encoded, columns=feature_names)
+
+    if known.all():
+        indptr = np.arange(0, codes.size + 1, codes.shape[1])
+        indices = indices.ravel()
+    else:
+        indptr = np.concatenate([[0], np.cumsum(known.sum(axis=1))])
+        indices = indices[known]
+    X_encoded = sp.csr_matrix(
+        (np.ones(len(indices), dtype=np.int8), indices, indptr),
+        shape=(n_rows, offsets[-1]),
+    )
+    if output_format == "csr":
+        return X_encoded
+    return pd.DataFrame.sparse.from_spmatrix(X_encoded, columns=feature_names)
@@ -1,11 +1,13 @@
 """Module to impute null values in the input data."""
-import logging
-
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_categorical_dtype
 from sklearn.base import BaseEstimator, TransformerMixin
 
-logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
-logger = logging.getLogger()
+from modules.profiling import profiled
+from modules.sketches import KLLSketch, ValueCounter
+
+TEXT_FLAGS = ["defined", "undefined"]
 
 
 class Imputer(BaseEstimator, TransformerMixin):
@@ -18,6 +20,10 @@ class Imputer(BaseEstimator, TransformerMixin):
         text_columns: list,
         categorical_mode: str,
         numerical_mode: str,
+        fit_mode: str = "exact",
+        sketch_size: int = 200,
+        inplace: bool = False,
+        text_mode: str = "indicator",
     ) -> None:
         """Initializes the columns by category.
 
@@ -25,17 +31,39 @@ class Imputer(BaseEstimator, TransformerMixin):
             categorical_columns (list): Categorical columns.
             numerical_columns (list): Numerical columns.
             text_columns (list): Text columns.
+            fit_mode (str, optional): Summary kept by `partial_fit`. "exact" keeps the
+                value counts of every column and gives the same fillers as `fit`.
+                "sketch" approximates the medians with KLL sketches, with bounded
+                memory. Modes always use exact counters. Defaults to "exact".
+            sketch_size (int, optional): Size of the KLL sketches. The median rank
+                error is close to 1.7 / sketch_size. Defaults to 200.
+            inplace (bool, optional): If True, `transform` fills the nulls of the
+                input DataFrame in place, without allocating new columns, except
+                for the text columns, which change dtype. If False, the input is
+                never modified and only the imputed columns are new. Defaults to
+                False.
+            text_mode (str, optional): How text columns are imputed. "indicator"
+                replaces them by "defined"/"undefined" categoricals. "fill" keeps
+                their values and fills the nulls with "undefined", to encode them
+                with a bounded width encoder, e.g. `OneHotDataFrameEncoder` with
+                max_categories or `HashingDataFrameEncoder`. Defaults to
+                "indicator".
         """
         self.categorical_columns = categorical_columns
         self.numerical_columns = numerical_columns
         self.text_columns = text_columns
         self.categorical_mode = categorical_mode
         self.numerical_mode = numerical_mode
+        self.fit_mode = fit_mode
+        self.sketch_size = sketch_size
+        self.inplace = inplace
+        self.text_mode = text_mode
 
         self.filler_categorical = [None]
         self.filler_numerical = [None]
         self.filler_text = [None]
 
+    @profiled
     def fit(self, df: pd.DataFrame, y=None):
         """Fits the values to replace by using 'transform' method.
 
@@ -44,8 +72,90 @@ class Imputer(BaseEstimator, TransformerMixin):
         """
         self._fit_categorical(df)
         self._fit_numerical(df)
+        self._summaries = None
+        return self
+
+    @profiled
+    def partial_fit(self, df: pd.DataFrame, y=None):
+        """Updates the values to replace with a chunk of the input data.
+
+        Args:
+            df (pd.DataFrame): Chunk of input data.
+        """
+        if getattr(self, "_summaries", None) is None:
+            self._summaries = {
+                **{
+                    column: self._new_summary(self.categorical_mode)
+                    for column in self.categorical_columns
+                },
+                **{
+                    column: self._new_summary(self.numerical_mode)
+                    for column in self.numerical_columns
+                },
+            }
+
+        for column, summary in self._summaries.items():
+            summary.update(df[column].dropna())
+
+        self._fit_from_summaries()
+        return self
+
+    def merge(self, other: "Imputer"):
+        """Merges the fillers of an imputer fitted on another shard of the data.
+
+        Both imputers must be fitted with `partial_fit`, e.g. in separate processes.
+
+        Args:
+            other (Imputer): Imputer fitted on another shard.
+
+        Returns:
+            Imputer: Instance with merged fillers.
+        """
+        if (
+            getattr(self, "_summaries", None) is None
+            or getattr(other, "_summaries", None) is None
+        ):
+            raise ValueError("Only imputers fitted by partial_fit can merge.")
+
+        for column, summary in self._summaries.items():
+            summary.merge(other._summaries[column])
+
+        self._fit_from_summaries()
         return self
 
+    def _new_summary(self, strategy_key: str):
+        if strategy_key == "median" and self.fit_mode == "sketch":
+            return KLLSketch(k=self.sketch_size)
+        return ValueCounter()
+
+    def _fit_from_summaries(self) -> None:
+        self._filler_categorical = self._general_summary_fitter(
+            self.categorical_columns, self.categorical_mode
+        )
+        self._filler_numerical = self._general_summary_fitter(
+            self.numerical_columns, self.numerical_mode
+        )
+
+    def _general_summary_fitter(self, cols: list, strategy_key: str) -> pd.Series:
+        """Creates a filler parameter for each column from its summary.
+
+        Args:
+            cols (list): Columns to be imputed.
+            strategy_key (str): strategy to generate the filler. Options: 'mode',
+                'median'.
+
+        Returns:
+            pd.Series: values to be replaced in each column.
+        """
+        return pd.Series(
+            {
+                column: getattr(self._summaries[column], strategy_key)()
+                for column in cols
+            },
+            dtype=None if strategy_key == "mode" else float,
+        )
+
+    @profiled
     def transform(self, df: pd.DataFrame, y=None) -> pd.DataFrame:
         """Executes the methods to transform each type of column.
 
@@ -55,6 +165,10 @@ class Imputer(BaseEstimator, TransformerMixin):
         Returns:
             pd.DataFrame: Dataframe with imputed values.
         """
+        if not self.inplace:
+            # imputed columns are replaced, never written into, so the other
+            # columns are shared with the input.
+            df = df.copy(deep=False)
         df = self._impute_categorical(df)
         df = self._impute_numerical(df)
         df = self._impute_text(df)
@@ -98,11 +212,20 @@ class Imputer(BaseEstimator, TransformerMixin):
         return self._general_impute(df, self.numerical_columns, self._filler_numerical)
 
     def _impute_text(self, df: pd.DataFrame):
-        df[self.text_columns] = (
-            df[self.text_columns]
-            .isnull()
-            .replace({True: "undefined", False: "defined"})
-        )
+        if self.text_mode == "fill":
+            filler = pd.Series("undefined", index=self.text_columns, dtype=object)
+            return self._general_impute(df, self.text_columns, filler)
+        if self.text_mode != "indicator":
+            raise ValueError(
+                f"text_mode should be 'indicator' or 'fill', got {self.text_mode!r}."
+            )
+        # the flags are categoricals with int8 codes, 1 byte per row instead of an
+        # object pointer, with the same "defined"/"undefined" values.
+        for column in self.text_columns:
+            df[column] = pd.Categorical.from_codes(
+                df[column].isna().to_numpy().astype(np.int8),
+                categories=TEXT_FLAGS,
+            )
         return df
 
     def _general_impute(
@@ -118,5 +241,22 @@ class Imputer(BaseEstimator, TransformerMixin):
         Returns:
             pd.DataFrame: DataFrame with nulls imputed.
         """
-        df[cols] = df[cols].fillna(filler)
+        fillers = {}
+        for column in cols:
+            values = df[column]
+            if not values.hasnans:
+                continue
+            value = filler[column]
+            # e.g. columns read by `read_csv_for_pipeline`, whose categories may
+            # not include the filler learned in fit.
+            if is_categorical_dtype(values) and pd.notna(value):
+                if value not in values.cat.categories:
+                    df[column] = values.cat.add_categories([value])
+            fillers[column] = value
+
+        if self.inplace:
+            df.fillna(fillers, inplace=True)
+        else:
+            for column, value in fillers.items():
+                df[column] = df[column].fillna(value)
         return df
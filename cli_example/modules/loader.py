@@ -0,0 +1,182 @@
+"""Module to load only the columns a fitted pipeline needs, with compact dtypes."""
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from modules.artifacts import read_artifact
+from modules.enconder import OneHotDataFrameEncoder
+from modules.imputer import Imputer
+from modules.scaler import StandardDataFrameScaler
+
+CATEGORICAL_DTYPE = "category"
+NUMERICAL_DTYPE = "float32"
+
+
+def pipeline_input_schema(pipeline) -> Tuple[List[str], Dict[str, str]]:
+    """Derives the input columns and their dtypes from a fitted pipeline.
+
+    The steps are walked in order until one of them keeps only some of its input
+    columns (e.g. `ColumnSelector`, `NaNColumnsDropper` or a ColumnTransformer
+    dropping the remainder), since the following steps never see the other
+    columns. Steps before it that use named columns, such as `Imputer`, add their
+    columns too.
+
+    Encoded and text columns are read as "category" and scaled columns as
+    "float32".
+
+    Args:
+        pipeline: Fitted Pipeline, ColumnTransformer or transformer.
+
+    Returns:
+        Tuple[List[str], Dict[str, str]]: Columns to read and dtype per column.
+            The columns are None if no step restricts them.
+    """
+    dtypes = {}
+    steps = pipeline.steps if isinstance(pipeline, Pipeline) else [(None, pipeline)]
+    for _, step in steps:
+        if step is None or step == "passthrough":
+            continue
+        columns = _step_schema(step, dtypes)
+        if columns is not None:
+            return _unique(list(dtypes) + columns), dtypes
+    return None, dtypes
+
+
+def read_csv_for_pipeline(
+    path: str,
+    pipeline,
+    extra_columns: Optional[List[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    engine: str = "pyarrow",
+    **read_csv_kwargs,
+) -> pd.DataFrame:
+    """Reads a CSV file keeping only the columns used by a fitted pipeline.
+
+    Args:
+        path (str): Path of the CSV file.
+        pipeline: Fitted Pipeline, ColumnTransformer or transformer.
+        extra_columns (List[str], optional): Other columns to read, e.g. the
+            target column. Defaults to None.
+        dtypes (Dict[str, str], optional): Dtypes overriding the derived ones, e.g.
+            {"acc_now_delinq": "Int8"}. Defaults to None.
+        engine (str, optional): Parser engine of `pd.read_csv`. Defaults to
+            "pyarrow".
+        read_csv_kwargs: Other arguments passed to `pd.read_csv`.
+
+    Returns:
+        pd.DataFrame: Data with the columns needed by the pipeline.
+    """
+    usecols, pipeline_dtypes = pipeline_input_schema(pipeline)
+    if usecols is not None:
+        usecols = _unique(usecols + list(extra_columns or []))
+    return pd.read_csv(
+        path,
+        usecols=usecols,
+        dtype={**pipeline_dtypes, **(dtypes or {})},
+        engine=engine,
+        **read_csv_kwargs,
+    )
+
+
+def read_artifact_for_pipeline(
+    path: str,
+    pipeline,
+    extra_columns: Optional[List[str]] = None,
+    dtypes: Optional[Dict[str, str]] = None,
+    cast: bool = True,
+) -> pd.DataFrame:
+    """Reads a stage artifact keeping only the columns used by a fitted pipeline.
+
+    Args:
+        path (str): Path of the Parquet, Arrow or CSV artifact.
+        pipeline: Fitted Pipeline, ColumnTransformer or transformer.
+        extra_columns (List[str], optional): Other columns to read, e.g. the
+            target column. Defaults to None.
+        dtypes (Dict[str, str], optional): Dtypes overriding the derived ones.
+            Defaults to None.
+        cast (bool, optional): If False, the columns keep their stored dtypes,
+            as `read_artifact` reads them, e.g. to give the pipeline the dtypes
+            it was fitted on. Defaults to True.
+
+    Returns:
+        pd.DataFrame: Data with the columns needed by the pipeline.
+    """
+    usecols, pipeline_dtypes = pipeline_input_schema(pipeline)
+    if usecols is not None:
+        usecols = _unique(usecols + list(extra_columns or []))
+    if not cast:
+        pipeline_dtypes = {}
+    return read_artifact(
+        path, columns=usecols, dtypes={**pipeline_dtypes, **(dtypes or {})}
+    )
+
+
+def _step_schema(step, dtypes: Dict[str, str]) -> Optional[List[str]]:
+    """Adds the dtypes used by a step and returns the columns it keeps, or None
+    if it keeps every input column."""
+    if isinstance(step, Pipeline):
+        columns, step_dtypes = pipeline_input_schema(step)
+        dtypes.update(step_dtypes)
+        return columns
+    if isinstance(step, ColumnTransformer):
+        return _column_transformer_schema(step, dtypes)
+    if isinstance(step, Imputer):
+        for column in step.categorical_columns + step.text_columns:
+            dtypes[column] = CATEGORICAL_DTYPE
+        for column in step.numerical_columns:
+            dtypes[column] = NUMERICAL_DTYPE
+        return None
+    if hasattr(step, "selected_columns"):
+        # ColumnSelector and the column droppers.
+        return list(step.selected_columns)
+    if hasattr(step, "feature_names_in_"):
+        return list(step.feature_names_in_)
+    return None
+
+
+def _column_transformer_schema(
+    column_transformer: ColumnTransformer, dtypes: Dict[str, str]
+) -> Optional[List[str]]:
+    columns = []
+    for name, transformer, transformer_columns in column_transformer.transformers_:
+        transformer_columns = _column_names(column_transformer, transformer_columns)
+        if transformer == "drop" or not transformer_columns:
+            continue
+        if name == "remainder":
+            # a kept remainder means no input column is dropped.
+            return None
+
+        dtype = _transformer_dtype(transformer)
+        if dtype is not None:
+            for column in transformer_columns:
+                dtypes.setdefault(column, dtype)
+        columns += transformer_columns
+    return columns
+
+
+def _column_names(column_transformer: ColumnTransformer, columns) -> List[str]:
+    """Converts the column specification of a transformer to column names."""
+    if isinstance(columns, str):
+        return [columns]
+    if isinstance(columns, slice) or not all(
+        isinstance(column, str) for column in columns
+    ):
+        columns = pd.Index(column_transformer.feature_names_in_)[columns]
+    return list(columns)
+
+
+def _transformer_dtype(transformer) -> Optional[str]:
+    if isinstance(transformer, Pipeline):
+        transformer = transformer.steps[0][1]
+    if isinstance(transformer, (OneHotDataFrameEncoder, OneHotEncoder)):
+        return CATEGORICAL_DTYPE
+    if isinstance(transformer, (StandardDataFrameScaler, StandardScaler)):
+        return NUMERICAL_DTYPE
+    return None
+
+
+def _unique(columns: List[str]) -> List[str]:
+    return list(dict.fromkeys(columns))
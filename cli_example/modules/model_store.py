@@ -0,0 +1,203 @@
+"""Module to save fitted model pipelines as memory-mappable model directories."""
+import json
+import os
+import pickle
+import platform
+import shutil
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pyarrow as pa
+from pyarrow import feather
+
+PICKLE_EXTENSIONS = (".pkl", ".pickle", ".joblib")
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+SKELETON_FILE = "skeleton.pkl"
+
+
+def save_model(model, path: str, min_mmap_bytes: int = 64) -> None:
+    """Saves a fitted model in the format given by the extension of path.
+
+    Paths ending in ".pkl", ".pickle" or ".joblib" are pickled with joblib. Any
+    other path is written as a model directory: every NumPy array of the model,
+    e.g. scaler means and scales, imputer fillers or encoder categories, is
+    stored as an `.npy` file, or an Arrow file for arrays of strings, and every
+    LightGBM booster as its native text model. Their list is kept in a JSON
+    manifest, next to a small pickle with the structure of the model and the
+    arrays below `min_mmap_bytes`.
+
+    Args:
+        model: Fitted estimator or Pipeline.
+        path (str): Path of the model file or directory.
+        min_mmap_bytes (int, optional): Smaller arrays are kept in the pickle, as
+            a separate file would take longer to open than to unpickle them.
+            Defaults to 64, so only scalars and tiny arrays are kept.
+    """
+    if _extension(path) in PICKLE_EXTENSIONS:
+        joblib.dump(model, path)
+        return
+
+    # the directory is written aside first, so a model being loaded is never
+    # half written.
+    tmp_path = f"{path.rstrip(os.sep)}.tmp{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    with open(os.path.join(tmp_path, SKELETON_FILE), "wb") as stream:
+        pickler = _ModelPickler(stream, tmp_path, min_mmap_bytes)
+        pickler.dump(model)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "skeleton": SKELETON_FILE,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "entries": pickler.entries,
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # the previous model is renamed aside rather than deleted before the swap, so
+    # path only ever holds a complete model; open memory maps of the old files
+    # stay valid after they are deleted.
+    old_path = f"{path.rstrip(os.sep)}.old{os.getpid()}"
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.isdir(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_model(path: str, mmap_mode: Optional[str] = "r"):
+    """Loads a model saved by `save_model`.
+
+    The `.npy` arrays of a model directory are memory mapped: no array is read
+    nor copied at load, and its pages are read from the OS page cache, shared by
+    every process serving the same model, the first time they are used.
+
+    Args:
+        path (str): Path of the model file or directory.
+        mmap_mode (str, optional): Mode of the memory mapped arrays. "r" maps them
+            read-only, "c" copy-on-write, for models whose arrays are modified in
+            place, and None reads them in memory. Defaults to "r".
+
+    Returns:
+        The fitted model.
+    """
+    if not os.path.isdir(path):
+        return joblib.load(path)
+
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["format_version"] > FORMAT_VERSION:
+        raise ValueError(
+            f"{path} has format version {manifest['format_version']}, only "
+            f"versions up to {FORMAT_VERSION} can be loaded."
+        )
+    with open(os.path.join(path, manifest["skeleton"]), "rb") as stream:
+        return _ModelUnpickler(stream, path, manifest["entries"], mmap_mode).load()
+
+
+class _ModelPickler(pickle.Pickler):
+    """Pickler writing arrays and boosters to their own files."""
+
+    def __init__(self, file, directory: str, min_mmap_bytes: int) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.min_mmap_bytes = min_mmap_bytes
+        self.entries: List[Dict] = []
+        # the objects are kept alive, so their ids are not reused while pickling.
+        self._saved: Dict[int, tuple] = {}
+
+    def persistent_id(self, obj) -> Optional[int]:
+        if id(obj) in self._saved:
+            return self._saved[id(obj)][0]
+
+        if isinstance(obj, np.ndarray):
+            kind = self._array_kind(obj)
+        elif _is_booster(obj):
+            kind = "booster"
+        else:
+            return None
+        if kind is None:
+            return None
+
+        entry_id = len(self.entries)
+        entry = self._write(obj, kind, entry_id)
+        self.entries.append(entry)
+        self._saved[id(obj)] = (entry_id, obj)
+        return entry_id
+
+    def _array_kind(self, array: np.ndarray) -> Optional[str]:
+        if array.nbytes < self.min_mmap_bytes:
+            return None
+        if not array.dtype.hasobject:
+            return "npy"
+        if array.ndim == 1 and all(isinstance(value, str) for value in array):
+            return "arrow"
+        return None
+
+    def _write(self, obj, kind: str, entry_id: int) -> Dict:
+        if kind == "npy":
+            file_name = f"array_{entry_id}.npy"
+            np.save(os.path.join(self.directory, file_name), obj)
+            return {
+                "file": file_name,
+                "kind": kind,
+                "dtype": obj.dtype.str,
+                "shape": list(obj.shape),
+            }
+        if kind == "arrow":
+            file_name = f"array_{entry_id}.arrow"
+            # uncompressed, so the file can be memory mapped when it is read.
+            feather.write_feather(
+                pa.table({"values": pa.array(obj, type=pa.string())}),
+                os.path.join(self.directory, file_name),
+                compression="uncompressed",
+            )
+            return {"file": file_name, "kind": kind, "shape": list(obj.shape)}
+
+        file_name = f"booster_{entry_id}.txt"
+        # every iteration is kept, as pickling a booster does.
+        obj.save_model(os.path.join(self.directory, file_name), num_iteration=-1)
+        return {"file": file_name, "kind": kind}
+
+
+class _ModelUnpickler(pickle.Unpickler):
+    """Unpickler reading the arrays and boosters written by `_ModelPickler`."""
+
+    def __init__(
+        self, file, directory: str, entries: List[Dict], mmap_mode: Optional[str]
+    ) -> None:
+        super().__init__(file)
+        self.directory = directory
+        self.entries = entries
+        self.mmap_mode = mmap_mode
+
+    def persistent_load(self, pid: int):
+        entry = self.entries[pid]
+        path = os.path.join(self.directory, entry["file"])
+        if entry["kind"] == "npy":
+            array = np.load(path, mmap_mode=self.mmap_mode)
+            # a plain ndarray view, so pandas and sklearn don't see a memmap
+            # subclass; the view keeps the mapping open.
+            return array.view(np.ndarray)
+        if entry["kind"] == "arrow":
+            values = feather.read_table(path, memory_map=True).column("values")
+            return values.to_numpy(zero_copy_only=False)
+        if entry["kind"] == "booster":
+            import lightgbm
+
+            return lightgbm.Booster(model_file=path)
+        raise pickle.UnpicklingError(f"Unknown entry kind {entry['kind']!r}.")
+
+
+def _is_booster(obj) -> bool:
+    # checked by name, so lightgbm is only imported by models that use it.
+    cls = type(obj)
+    return cls.__name__ == "Booster" and cls.__module__.startswith("lightgbm")
+
+
+def _extension(path: str) -> str:
+    return os.path.splitext(path)[1].lower()
@@ -1,17 +1,48 @@
 """Modules to scale data."""
+from typing import Iterable, List, Optional, Union
+
+from joblib import Parallel, delayed, effective_n_jobs
+import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.preprocessing import StandardScaler
+from sklearn.preprocessing._data import _handle_zeros_in_scale, _is_constant_feature
+
+from modules.profiling import profiled
+from modules.schema import ColumnSchema
+from modules.sketches import Moments
 
 
 class StandardDataFrameScaler(BaseEstimator, TransformerMixin):
     """Scales and keeps column names from input DataFrame using StandardScaler."""
 
-    def __init__(self) -> None:
-        """Initializes the scaler."""
+    def __init__(
+        self,
+        n_jobs: Optional[int] = None,
+        reorder_columns: bool = False,
+        dtype: Optional[str] = None,
+    ) -> None:
+        """Initializes the scaler.
+
+        Args:
+            n_jobs (int, optional): Number of processes used by `fit` and
+                `fit_shards`. With more than one job, the rows are split in shards
+                whose count, mean and M2 are computed in parallel and merged.
+                Defaults to None, which means 1.
+            reorder_columns (bool, optional): If True, `transform` selects the
+                columns seen at fit time by name, instead of failing when they come
+                in another order. Defaults to False.
+            dtype (str, optional): Dtype the data is scaled in and returned with,
+                e.g. "float32" to keep compact inputs compact. Defaults to None,
+                which returns float32 for float32 inputs and float64 otherwise.
+        """
+        self.n_jobs = n_jobs
+        self.reorder_columns = reorder_columns
+        self.dtype = dtype
         self.std_scaler = StandardScaler()
         self.column_names = []
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the scaler based on X.
 
@@ -22,10 +53,53 @@ class StandardDataFrameScaler(BaseEstimator, TransformerMixin):
         Returns:
             StandardDataFrameScaler: instance fitted.
         """
+        n_shards = effective_n_jobs(self.n_jobs)
+        if n_shards > 1 and X.shape[0] >= n_shards:
+            bounds = np.linspace(0, X.shape[0], n_shards + 1).astype(int)
+            return self.fit_shards(
+                X.iloc[start:stop] for start, stop in zip(bounds, bounds[1:])
+            )
+
         self.std_scaler.fit(X)
         self.column_names = X.columns
+        self.schema_ = ColumnSchema.from_frame(X)
         return self
 
+    def fit_shards(
+        self,
+        shards: Iterable[Union[pd.DataFrame, str]],
+        columns: Optional[List[str]] = None,
+    ):
+        """Fits the scaler on shards of the data, computed in parallel.
+
+        Args:
+            shards (Iterable[Union[pd.DataFrame, str]]): DataFrames, or paths to
+                CSV/Parquet files, with the same columns.
+            columns (List[str], optional): Columns to scale. Defaults to all the
+                columns of the shards.
+
+        Returns:
+            StandardDataFrameScaler: instance fitted.
+        """
+        results = Parallel(n_jobs=self.n_jobs)(
+            delayed(_shard_moments)(shard, columns) for shard in shards
+        )
+        column_names, moments = results[0]
+        schema = ColumnSchema(column_names)
+        for shard_column_names, shard_moments in results[1:]:
+            if ColumnSchema(shard_column_names) != schema:
+                raise ValueError(
+                    "Columns don't have same order/elements. "
+                    f"Valid order: {list(column_names)}"
+                )
+            moments.merge(shard_moments)
+
+        _set_state_from_moments(self.std_scaler, column_names, moments)
+        self.column_names = column_names
+        self.schema_ = schema
+        return self
+
+    @profiled
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Scales X and adds column names.
 
@@ -35,12 +109,57 @@ class StandardDataFrameScaler(BaseEstimator, TransformerMixin):
         Returns:
             pd.DataFrame: scaled data.
         """
-        assert str(X.columns) == str(
-            self.column_names
-        ), f"Columns don't have same order/elements. Valid order: {self.column_names}"
-
+        X = self.schema_.validate(X, reorder=self.reorder_columns)
+        if self.dtype is not None:
+            X = X.astype(self.dtype, copy=False)
         X_scaled = self.std_scaler.transform(X)
         return pd.DataFrame(X_scaled, columns=self.column_names)
 
     def get_feature_names_out(self, input_features=None):
         return self.column_names
+
+    def _more_tags(self):
+        # every column is fitted on its own, so wide branches can be split.
+        return {"column_separable": True}
+
+
+def _set_state_from_moments(
+    scaler: StandardScaler, column_names: pd.Index, moments: Moments
+) -> None:
+    """Sets the fitted attributes of a StandardScaler as `fit` does."""
+    scaler._reset()
+    scaler.n_features_in_ = len(column_names)
+    scaler.feature_names_in_ = np.asarray(column_names, dtype=object)
+
+    n_samples_seen = moments.n_values
+    if np.all(n_samples_seen == n_samples_seen[0]):
+        n_samples_seen = int(n_samples_seen[0])
+    scaler.n_samples_seen_ = n_samples_seen
+
+    if not scaler.with_mean and not scaler.with_std:
+        scaler.mean_ = None
+        scaler.var_ = None
+    else:
+        scaler.mean_ = moments.mean
+        scaler.var_ = moments.var
+    if scaler.with_std:
+        constant_mask = _is_constant_feature(
+            scaler.var_, scaler.mean_, moments.n_values
+        )
+        scaler.scale_ = _handle_zeros_in_scale(
+            np.sqrt(scaler.var_), copy=False, constant_mask=constant_mask
+        )
+    else:
+        scaler.var_ = None
+        scaler.scale_ = None
+
+
+def _shard_moments(shard: Union[pd.DataFrame, str], columns: Optional[List]):
+    if isinstance(shard, str):
+        if shard.endswith(".parquet"):
+            shard = pd.read_parquet(shard, columns=columns)
+        else:
+            shard = pd.read_csv(shard, usecols=columns)
+    if columns is not None:
+        shard = shard[columns]
+    return shard.columns, Moments.from_frame(shard)
@@ -0,0 +1,104 @@
+"""Module to validate the columns of the DataFrames given to the transformers."""
+from typing import Iterable, Optional
+
+import pandas as pd
+
+
+class ColumnSchema:
+    """Column names, in order, and dtypes seen by a transformer at fit time.
+
+    `validate` accepts the same Index object seen in a previous call without
+    comparing the names again, which is the common case when the same
+    DataFrame, or DataFrames built by the same previous step, are transformed
+    repeatedly. Other indexes are compared by their hash and names, without
+    building strings.
+
+    Attributes:
+        columns (tuple): Column names in the order seen at fit time.
+        dtypes (pd.Series, optional): Dtype per column.
+    """
+
+    def __init__(self, columns: Iterable, dtypes: Optional[pd.Series] = None) -> None:
+        self.columns = tuple(columns)
+        self.dtypes = dtypes
+        self._hash = hash(self.columns)
+        self._validated_index = None
+
+    @classmethod
+    def from_frame(cls, X: pd.DataFrame) -> "ColumnSchema":
+        """Creates the schema of X.
+
+        Args:
+            X (pd.DataFrame): Input data.
+
+        Returns:
+            ColumnSchema: Schema with the columns and dtypes of X.
+        """
+        return cls(X.columns, X.dtypes)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ColumnSchema):
+            return NotImplemented
+        return self._hash == other._hash and self.columns == other.columns
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __getstate__(self) -> dict:
+        return {**self.__dict__, "_validated_index": None}
+
+    def validate(
+        self,
+        X: pd.DataFrame,
+        reorder: bool = False,
+        check_dtypes: bool = False,
+    ) -> pd.DataFrame:
+        """Checks that X has the columns of the schema, in the same order.
+
+        Args:
+            X (pd.DataFrame): Input data.
+            reorder (bool, optional): If True, X may have the columns in another
+                order, or extra columns, and the schema columns are selected by
+                name instead of failing. Defaults to False.
+            check_dtypes (bool, optional): If True, the dtypes must match too.
+                Defaults to False.
+
+        Returns:
+            pd.DataFrame: X, or its schema columns in order when reordered.
+
+        Raises:
+            ValueError: If the columns, or the dtypes, don't match.
+        """
+        if not self._matches(X.columns):
+            missing = [column for column in self.columns if column not in X.columns]
+            if not reorder or missing:
+                raise ValueError(
+                    "Columns don't have same order/elements. "
+                    f"Missing: {missing}. Valid order: {list(self.columns)}"
+                )
+            X = X[list(self.columns)]
+
+        if check_dtypes and self.dtypes is not None:
+            mismatched = [
+                column
+                for column, dtype in zip(self.columns, X.dtypes)
+                if dtype != self.dtypes[column]
+            ]
+            if mismatched:
+                raise ValueError(f"Columns with different dtypes: {mismatched}")
+        return X
+
+    def _matches(self, columns: pd.Index) -> bool:
+        # pandas indexes are immutable, so an index already validated matches.
+        if columns is self._validated_index:
+            return True
+        if len(columns) != len(self.columns):
+            return False
+        names = tuple(columns)
+        if hash(names) != self._hash or names != self.columns:
+            return False
+        self._validated_index = columns
+        return True
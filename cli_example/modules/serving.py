@@ -0,0 +1,286 @@
+"""Module to serve a model over HTTP, coalescing concurrent requests in batches."""
+import asyncio
+import json
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.compiled import CompiledPreprocessor
+from modules.model_store import load_model
+
+logger = logging.getLogger()
+
+PredictBatch = Callable[[List[Dict]], List[Dict]]
+
+
+class MicroBatcher:
+    """Coalesces concurrent predictions into micro-batches.
+
+    Records are queued by `predict` and a batch is run when `max_batch_size`
+    records are waiting or `max_wait_ms` passed since the first one arrived. Each
+    batch runs in a worker thread, so the event loop keeps accepting requests. A
+    failed batch is run again one record at a time, so a bad record only fails
+    its own request.
+    """
+
+    def __init__(
+        self,
+        predict_batch: PredictBatch,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """Initializes the batcher.
+
+        Args:
+            predict_batch (PredictBatch): Function returning one result per record.
+            max_batch_size (int, optional): Largest batch. Defaults to 64.
+            max_wait_ms (float, optional): Longest time a record waits for others
+                to join its batch. Defaults to 5.0.
+            executor (Executor, optional): Executor running the batches. Defaults
+                to a single worker thread.
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.batch_sizes: List[int] = []
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> "MicroBatcher":
+        """Starts the batching loop in the running event loop."""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    async def stop(self) -> None:
+        """Stops the batching loop."""
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def predict(self, record: Dict) -> Dict:
+        """Predicts a record within the next batch.
+
+        Args:
+            record (Dict): Values by column.
+
+        Returns:
+            Dict: Result of `predict_batch` for the record.
+        """
+        future = asyncio.get_event_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_ms / 1000
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._run_batch(loop, batch)
+
+    async def _run_batch(
+        self, loop: asyncio.AbstractEventLoop, batch: List[Tuple]
+    ) -> None:
+        records = [record for record, _ in batch]
+        self.batch_sizes.append(len(records))
+        try:
+            results = await loop.run_in_executor(
+                self.executor, self.predict_batch, records
+            )
+        except Exception as error:  # noqa: B902, the requests get the error.
+            if len(records) == 1:
+                results = [error]
+            else:
+                results = await loop.run_in_executor(
+                    self.executor, self._predict_one_by_one, records
+                )
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _predict_one_by_one(self, records: List[Dict]) -> List:
+        """Results of every record on its own, or the error it raised."""
+        results = []
+        for record in records:
+            try:
+                results.extend(self.predict_batch([record]))
+            except Exception as error:  # noqa: B902, the request gets the error.
+                results.append(error)
+        return results
+
+
+def load_predict_batch(path_model: str, compiled: bool = False) -> PredictBatch:
+    """Loads a model Pipeline and returns its batch prediction function.
+
+    Args:
+        path_model (str): Path of the pipeline saved by `run.py`, pickled or as a
+            model directory, with the "preprocessor" and "classifier" steps.
+        compiled (bool, optional): If True, the preprocessor is replaced by a
+            `CompiledPreprocessor`, which avoids building DataFrames. Defaults to
+            False.
+
+    Returns:
+        PredictBatch: Function mapping records to their predicted label and class
+            probabilities.
+    """
+    model = load_model(path_model)
+    classifier = model.named_steps["classifier"]
+    classes = classifier.classes_.tolist()
+
+    if compiled:
+        preprocessor = CompiledPreprocessor(model.named_steps["preprocessor"])
+
+        def predict_proba(records: List[Dict]) -> np.ndarray:
+            return classifier.predict_proba(preprocessor.transform_records(records))
+
+    else:
+
+        def predict_proba(records: List[Dict]) -> np.ndarray:
+            return model.predict_proba(pd.DataFrame(records))
+
+    def predict_batch(records: List[Dict]) -> List[Dict]:
+        probabilities = predict_proba(records)
+        return [
+            {
+                "prediction": classes[row.argmax()],
+                "probabilities": dict(zip(classes, row.tolist())),
+            }
+            for row in probabilities
+        ]
+
+    return predict_batch
+
+
+async def handle_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, batcher: MicroBatcher
+) -> None:
+    """Answers the HTTP/1.1 requests of a connection.
+
+    `POST /predict` takes a JSON record, or a list of records, and returns the
+    result of each one. `GET /health` answers when the server is up.
+    """
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except ValueError as error:
+                # the rest of the stream can't be parsed after a malformed request.
+                _write_response(writer, 400, {"error": str(error)})
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            status, payload = await _dispatch(method, path, body, batcher)
+            _write_response(writer, status, payload)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(
+    batcher: MicroBatcher, host: str = "127.0.0.1", port: int = 8080
+) -> asyncio.AbstractServer:
+    """Starts the batcher and the HTTP server.
+
+    Args:
+        batcher (MicroBatcher): Batcher running the predictions.
+        host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on, 0 picks a free one. Defaults to
+            8080.
+
+    Returns:
+        asyncio.AbstractServer: Server accepting connections.
+    """
+    await batcher.start()
+    return await asyncio.start_server(
+        lambda reader, writer: handle_connection(reader, writer, batcher), host, port
+    )
+
+
+async def _dispatch(
+    method: str, path: str, body: bytes, batcher: MicroBatcher
+) -> Tuple[int, object]:
+    if method == "GET" and path == "/health":
+        return 200, {"status": "ok"}
+    if method != "POST" or path != "/predict":
+        return 404, {"error": f"{method} {path} not found"}
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return 400, {"error": "The body should be a JSON record or list of records."}
+
+    records = payload if isinstance(payload, list) else [payload]
+    if not all(isinstance(record, dict) for record in records):
+        return 400, {"error": "Every record should be a JSON object."}
+    try:
+        results = await asyncio.gather(*(batcher.predict(record) for record in records))
+    except Exception as error:  # noqa: B902, reported to the client.
+        logger.exception("Prediction failed")
+        return 500, {"error": str(error)}
+    return 200, results if isinstance(payload, list) else results[0]
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple]:
+    """Reads a request, None at the end of the stream.
+
+    Raises:
+        ValueError: if the request line, a header or the content length is
+            malformed.
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise ValueError(f"Malformed request line {request_line!r}.")
+    method, path, _ = parts
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        if b":" not in line:
+            raise ValueError(f"Malformed header {line!r}.")
+        name, value = line.decode("latin-1").split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    content_length = headers.get("content-length", "0")
+    if not content_length.isdigit():
+        raise ValueError(f"Malformed content length {content_length!r}.")
+    body = await reader.readexactly(int(content_length))
+    return method, path, headers, body
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, payload) -> None:
+    reasons = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Error"}
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"HTTP/1.1 {status} {reasons[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n".encode()
+        + body
+    )
@@ -0,0 +1,126 @@
+"""Module to evaluate classifier configs on features preprocessed once."""
+import os
+import time
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy import sparse as sp
+
+
+def sweep_configs(
+    grid: Dict[str, list], n_iter: Optional[int] = None, random_state=None
+) -> List[Dict]:
+    """Lists the configs of a parameter grid.
+
+    Args:
+        grid (Dict[str, list]): Values of every parameter.
+        n_iter (int, optional): Number of random configs drawn from the grid.
+            Defaults to None, every combination of the grid.
+        random_state (optional): Seed of the random configs. Defaults to None.
+
+    Returns:
+        List[Dict]: Parameters of every config.
+    """
+    from sklearn.model_selection import ParameterGrid, ParameterSampler
+
+    if n_iter is None:
+        return list(ParameterGrid(grid))
+    return list(ParameterSampler(grid, n_iter=n_iter, random_state=random_state))
+
+
+def write_features(directory: str, **arrays: np.ndarray) -> Dict[str, str]:
+    """Saves arrays as `.npy` files, to be memory mapped by the trial workers.
+
+    Args:
+        directory (str): Directory of the files.
+        arrays (np.ndarray): Arrays by name, e.g. X_train=..., y_train=....
+
+    Returns:
+        Dict[str, str]: Path of every array by name.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, array in arrays.items():
+        paths[name] = os.path.join(directory, f"{name}.npy")
+        np.save(paths[name], array)
+    return paths
+
+
+def encode_features(X: Union[pd.DataFrame, sp.spmatrix]) -> np.ndarray:
+    """Converts the preprocessed features to a dense matrix for the trials, which
+    `np.save` can write and the workers memory map.
+
+    The matrix keeps the common dtype of the features, the values LightGBM bins
+    when it is fitted on the preprocessor output, so a trial learns the same
+    model as the best config refitted on the DataFrame.
+    """
+    if sp.issparse(X):
+        return X.toarray()
+    return X.to_numpy()
+
+
+def run_trials(
+    configs: List[Dict],
+    paths: Dict[str, str],
+    base_params: Dict,
+    pos_label: int,
+    n_jobs: Optional[int] = None,
+) -> List[Dict]:
+    """Fits and evaluates a classifier per config in parallel worker processes.
+
+    Every worker memory maps the arrays of `paths` read-only, so the features
+    are shared through the OS page cache instead of copied per trial. The cores
+    are split between the workers and the LightGBM threads of each trial.
+
+    Args:
+        configs (List[Dict]): Classifier params of every trial, over
+            `base_params`.
+        paths (Dict[str, str]): Paths of the X_train, y_train, X_val and y_val
+            arrays written by `write_features`. Labels are class indices.
+        base_params (Dict): Params of the LGBMClassifier shared by every trial.
+        pos_label (int): Index of the positive class, for the f1 scores.
+        n_jobs (int, optional): Number of worker processes. None means 1 and -1
+            means one per core. Defaults to None.
+
+    Returns:
+        List[Dict]: "params", "f1_train", "f1_validation" and "fit_seconds" of
+            every trial, in the order of `configs`.
+    """
+    n_workers = min(effective_n_jobs(n_jobs), len(configs)) or 1
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    return Parallel(n_jobs=n_workers)(
+        delayed(_run_trial)(
+            {**base_params, **params, "n_jobs": n_threads},
+            params,
+            paths,
+            pos_label,
+        )
+        for params in configs
+    )
+
+
+def _run_trial(
+    classifier_params: Dict, params: Dict, paths: Dict[str, str], pos_label: int
+) -> Dict:
+    from lightgbm import LGBMClassifier
+    from sklearn.metrics import f1_score
+
+    arrays = {name: np.load(path, mmap_mode="r") for name, path in paths.items()}
+    classifier = LGBMClassifier(**classifier_params)
+    start = time.perf_counter()
+    classifier.fit(arrays["X_train"], arrays["y_train"])
+    fit_seconds = time.perf_counter() - start
+    return {
+        "params": params,
+        "f1_train": f1_score(
+            arrays["y_train"],
+            classifier.predict(arrays["X_train"]),
+            pos_label=pos_label,
+        ),
+        "f1_validation": f1_score(
+            arrays["y_val"], classifier.predict(arrays["X_val"]), pos_label=pos_label
+        ),
+        "fit_seconds": fit_seconds,
+    }
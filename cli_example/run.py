@@ -1,21 +1,12 @@
+import contextlib
 import logging
+import os
 
-import mlflow.lightgbm
-import pandas as pd
 import typer
-import yaml
-from lightgbm import LGBMClassifier
-from sklearn.metrics import f1_score
-from sklearn.pipeline import Pipeline
 
+# the transformers, sklearn, lightgbm and mlflow are imported by the functions
+# using them, so `--help` doesn't pay for them.
 
-from modules.imputer import Imputer
-from modules.scaler import StandardDataFrameScaler
-from modules.enconder import OneHotDataFrameEncoder
-from modules.column_transformer import ColumnDataFrameTransformer
-
-
-logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
 logger = logging.getLogger()
 
 
@@ -23,73 +14,54 @@ def train(
     path_train_test: str = None,
     path_model: str = None,
     random_state: int = None,
+    profile: bool = False,
+    cache_dir: str = None,
+    cache_size_mb: float = 2048,
+    no_mlflow: bool = False,
 ) -> None:
     """Trains a model.
 
     Args:
         path_train_test (str): Path for train/test data.
-        path_model (str): Path to save the trained model.
+        path_model (str): Path to save the trained model. Paths ending in ".pkl"
+            are pickled, any other path is saved as a model directory with
+            memory-mappable arrays and the native LightGBM model.
         random_state (int):  Seed used by the random number generator.
+        profile (bool): Whether to profile every fit/transform call and log the
+            timings to MLflow, or to the console with no_mlflow.
+        cache_dir (str): Directory to cache the fitted preprocessor and the
+            training features in. Runs with the same training data and
+            preprocessing config reuse them and only fit the classifier.
+        cache_size_mb (float): Largest size of the cache directory.
+        no_mlflow (bool): Whether to skip MLflow, which is then neither imported
+            nor used to track the run.
     """
+    from lightgbm import LGBMClassifier
+    from sklearn.metrics import f1_score
+    from sklearn.pipeline import Pipeline
+
+    from modules.artifacts import read_artifact
+    from modules.cache import FittedTransformerCache, file_fingerprint
+    from modules.loader import read_artifact_for_pipeline
+    from modules.model_store import save_model
+    from modules.profiling import PipelineProfiler
+
     logger.debug("Input paths")
-    with open("config.yml", "r", encoding="utf-8") as stream:
-        config = yaml.safe_load(stream)
+    config = load_config()
 
     logger.info("Reading input data")
-    input_columns = (
-        config["train_columns_by_type"]["categorical_columns"]
-        + config["train_columns_by_type"]["numerical_columns"]
-        + config["train_columns_by_type"]["text_columns"]
-        + [config["target_column"]]
-    )
     path_train = path_train_test.replace("{split}", "train")
     path_val = path_train_test.replace("{split}", "val")
 
-    df_train = pd.read_csv(path_train, usecols=input_columns)
-    df_val = pd.read_csv(path_val, usecols=input_columns)
+    df_train = read_artifact(path_train, columns=input_columns(config))
 
-    logger.info("Creating column imputation step")
-    imputer = Imputer(
-        categorical_columns=config["train_columns_by_type"]["categorical_columns"],
-        numerical_columns=config["train_columns_by_type"]["numerical_columns"],
-        text_columns=config["train_columns_by_type"]["text_columns"],
-        **config["imputer"],
-    )
-
-    logger.info("Creating column transformation step")
-    numeric_transformer = StandardDataFrameScaler()
-    one_hot_transformer = OneHotDataFrameEncoder(handle_unknown="ignore")
-
-    numeric_columns = config["train_columns_by_type"]["numerical_columns"]
-    one_hot_columns = (
-        config["train_columns_by_type"]["categorical_columns"]
-        + config["train_columns_by_type"]["text_columns"]
-    )
-
-    column_transformer = ColumnDataFrameTransformer(
-        transformers=[
-            ("numeric scaler", numeric_transformer, numeric_columns),
-            ("cat_and_txt encoder", one_hot_transformer, one_hot_columns),
-        ]
-    )
+    logger.info("Creating preprocessing steps")
+    preprocessor = make_preprocessor(config)
 
     logger.info("Creating classifier step")
-    classifier = LGBMClassifier(
-        class_weight="balanced",
-        random_state=0,
-        learning_rate=0.06,
-        n_estimators=2000,
-        reg_lambda=0.19,
-        reg_alpha=0.19,
-    )
+    classifier = LGBMClassifier(**config["classifier"])
 
     logger.info("Creating model pipeline")
-    preprocessor = Pipeline(
-        [
-            ("column_imputer", imputer),
-            ("column_transformer", column_transformer),
-        ]
-    )
     model = Pipeline(
         [
             ("preprocessor", preprocessor),
@@ -101,35 +73,180 @@ def train(
     X_train = df_train.drop(columns=[config["target_column"]])
     y_train = df_train[config["target_column"]]
 
-    X_val = df_val.drop(columns=[config["target_column"]])
-    y_val = df_val[config["target_column"]]
-
     logger.info("Training the model")
-    mlflow.lightgbm.autolog()
-    with mlflow.start_run() as _:
-        model.fit(X_train, y_train)
-
-        y_pred_train = model.predict(X_train)
-        logger.info("Evaluating the model using training data")
-        f1_train = f1_score(
-            y_true=y_train,
-            y_pred=y_pred_train,
-            pos_label=config["positive_label_value"],
-        )
-        logger.info("Evaluating the model using validation data")
-        y_pred_val = model.predict(X_val)
-        f1_val = f1_score(
-            y_true=y_val, y_pred=y_pred_val, pos_label=config["positive_label_value"]
-        )
-        logger.info("...Logging in mlflow")
-        mlflow.log_metric(key="f1_train", value=f1_train)
-        mlflow.log_metric(key="f1_validation", value=f1_val)
+    if no_mlflow:
+        mlflow = None
+        run = contextlib.nullcontext()
+    else:
+        import mlflow.lightgbm
+
+        mlflow.lightgbm.autolog()
+        run = mlflow.start_run()
+    profiler = PipelineProfiler() if profile else None
+    with run:
+        with profiler or contextlib.nullcontext():
+            if cache_dir:
+                cache = FittedTransformerCache(
+                    cache_dir, max_size_mb=cache_size_mb, store_outputs=True
+                )
+                preprocessor, X_train_features = cache.fit_transform(
+                    preprocessor,
+                    X_train,
+                    y_train,
+                    fingerprint=file_fingerprint(path_train),
+                )
+                model.steps[0] = ("preprocessor", preprocessor)
+                classifier.fit(X_train_features, y_train)
+                y_pred_train = classifier.predict(X_train_features)
+            else:
+                model.fit(X_train, y_train)
+                y_pred_train = model.predict(X_train)
+
+            logger.info("Evaluating the model using training data")
+            f1_train = f1_score(
+                y_true=y_train,
+                y_pred=y_pred_train,
+                pos_label=config["positive_label_value"],
+            )
+            logger.info("Reading validation data used by the fitted preprocessor")
+            # with the dtypes of the training data, which the preprocessor was
+            # fitted on and the served records have.
+            df_val = read_artifact_for_pipeline(
+                path_val,
+                preprocessor,
+                extra_columns=[config["target_column"]],
+                cast=False,
+            )
+            X_val = df_val.drop(columns=[config["target_column"]])
+            y_val = df_val[config["target_column"]]
+
+            logger.info("Evaluating the model using validation data")
+            y_pred_val = model.predict(X_val)
+            f1_val = f1_score(
+                y_true=y_val,
+                y_pred=y_pred_val,
+                pos_label=config["positive_label_value"],
+            )
+
+        if mlflow is None:
+            if profiler is not None:
+                logger.info(f"Step profile:\n{profiler.summary().to_string()}")
+        else:
+            if profiler is not None:
+                logger.info("...Logging the step profile in mlflow")
+                profiler.log_mlflow()
+            logger.info("...Logging in mlflow")
+            mlflow.log_metric(key="f1_train", value=f1_train)
+            mlflow.log_metric(key="f1_validation", value=f1_val)
 
     logger.info(f"...Training f1 score: {f1_train:.5f}")
     logger.info(f"...Validation f1 score: {f1_val:.5f}")
 
+    if path_model:
+        logger.info("Saving the model")
+        os.makedirs(os.path.dirname(path_model) or ".", exist_ok=True)
+        save_model(model, path_model)
+
     logger.info("4_train finished")
 
 
+def load_config(path: str = "config.yml") -> dict:
+    """Loads the training config."""
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as stream:
+        return yaml.safe_load(stream)
+
+
+def input_columns(config: dict) -> list:
+    """Lists the columns read from the splits: the features and the target."""
+    columns_by_type = config["train_columns_by_type"]
+    return (
+        columns_by_type["categorical_columns"]
+        + columns_by_type["numerical_columns"]
+        + columns_by_type["text_columns"]
+        + [config["target_column"]]
+    )
+
+
+def make_preprocessor(config: dict):
+    """Creates the unfitted preprocessor Pipeline of the model.
+
+    Args:
+        config (dict): Training config.
+
+    Returns:
+        Pipeline: Imputer, optional dtype downcaster and column transformer.
+    """
+    from sklearn.pipeline import Pipeline
+
+    from modules.column_transformer import ColumnDataFrameTransformer
+    from modules.downcaster import DtypeDowncaster
+    from modules.enconder import OneHotDataFrameEncoder
+    from modules.imputer import Imputer
+    from modules.scaler import StandardDataFrameScaler
+
+    numeric_columns = config["train_columns_by_type"]["numerical_columns"]
+    categorical_columns = config["train_columns_by_type"]["categorical_columns"]
+    text_columns = config["train_columns_by_type"]["text_columns"]
+
+    imputer = Imputer(
+        categorical_columns=categorical_columns,
+        numerical_columns=numeric_columns,
+        text_columns=text_columns,
+        **config["imputer"],
+    )
+
+    compact_dtypes = config.get("compact_dtypes", False)
+    downcaster = DtypeDowncaster(
+        categorical_columns=categorical_columns + text_columns,
+    )
+
+    numeric_transformer = StandardDataFrameScaler(
+        dtype="float32" if compact_dtypes else None
+    )
+    one_hot_transformer = OneHotDataFrameEncoder(handle_unknown="ignore")
+
+    if imputer.text_mode == "fill":
+        # text columns keep their values, encoded with a bounded width.
+        transformers = [
+            ("numeric scaler", numeric_transformer, numeric_columns),
+            ("cat encoder", one_hot_transformer, categorical_columns),
+            ("txt encoder", _text_encoder(config["text_encoder"]), text_columns),
+        ]
+    else:
+        transformers = [
+            ("numeric scaler", numeric_transformer, numeric_columns),
+            (
+                "cat_and_txt encoder",
+                one_hot_transformer,
+                categorical_columns + text_columns,
+            ),
+        ]
+    column_transformer = ColumnDataFrameTransformer(transformers=transformers)
+
+    return Pipeline(
+        [
+            ("column_imputer", imputer),
+            ("dtype_downcaster", downcaster if compact_dtypes else "passthrough"),
+            ("column_transformer", column_transformer),
+        ]
+    )
+
+
+def _text_encoder(params: dict):
+    """Creates the encoder of the text columns from the text_encoder config."""
+    from modules.enconder import HashingDataFrameEncoder, OneHotDataFrameEncoder
+
+    if params["kind"] == "top_k":
+        return OneHotDataFrameEncoder(max_categories=params["max_categories"])
+    if params["kind"] == "hashing":
+        return HashingDataFrameEncoder(n_features=params["n_features"])
+    raise ValueError(
+        f"text_encoder kind should be 'top_k' or 'hashing', got {params['kind']!r}."
+    )
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
     typer.run(train)
@@ -0,0 +1,48 @@
+import asyncio
+import logging
+
+import typer
+
+from modules.serving import MicroBatcher, load_predict_batch, start_server
+
+
+logger = logging.getLogger()
+
+
+def serve(
+    path_model: str = None,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    max_batch_size: int = 64,
+    max_wait_ms: float = 5.0,
+    compiled: bool = False,
+) -> None:
+    """Serves the trained model, coalescing concurrent requests in micro-batches.
+
+    Args:
+        path_model (str): Path of the model saved by `run.py`.
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+        max_batch_size (int): Largest number of records predicted together.
+        max_wait_ms (float): Longest time a record waits for others to join its
+            batch.
+        compiled (bool): Whether to use the compiled preprocessor.
+    """
+    logger.info("Loading the model")
+    predict_batch = load_predict_batch(path_model, compiled=compiled)
+    batcher = MicroBatcher(
+        predict_batch, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms
+    )
+
+    async def run_server() -> None:
+        server = await start_server(batcher, host=host, port=port)
+        logger.info(f"Serving on http://{host}:{port}/predict")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run_server())
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+    typer.run(serve)
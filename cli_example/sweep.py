@@ -0,0 +1,154 @@
+import contextlib
+import logging
+import os
+import tempfile
+
+import typer
+
+from run import input_columns, load_config, make_preprocessor
+
+
+logger = logging.getLogger()
+
+
+def sweep(
+    path_train_test: str = None,
+    path_model: str = None,
+    n_jobs: int = -1,
+    n_iter: int = None,
+    random_state: int = 0,
+    features_dir: str = None,
+    no_mlflow: bool = False,
+) -> None:
+    """Evaluates the classifier configs of the sweep config on features
+    preprocessed once.
+
+    The preprocessor is fitted once, the train and validation features are
+    written once as `.npy` files, and every config is fitted in parallel worker
+    processes which memory map them read-only. Each trial is logged to MLflow
+    as a nested run of the sweep run.
+
+    Args:
+        path_train_test (str): Path for train/test data.
+        path_model (str): Path to save the model with the best validation f1
+            score, refitted on the train features.
+        n_jobs (int): Number of trials run in parallel, -1 means one per core.
+        n_iter (int): Number of random configs drawn from the sweep grid.
+            Defaults to the sweep n_iter config, every combination when null.
+        random_state (int): Seed of the random configs.
+        features_dir (str): Directory to write the features in. Defaults to a
+            temporary directory.
+        no_mlflow (bool): Whether to skip MLflow, which is then neither imported
+            nor used to track the trials.
+    """
+    import numpy as np
+    from lightgbm import LGBMClassifier
+    from sklearn.pipeline import Pipeline
+
+    from modules.artifacts import read_artifact
+    from modules.loader import read_artifact_for_pipeline
+    from modules.model_store import save_model
+    from modules.sweep import (
+        encode_features,
+        run_trials,
+        sweep_configs,
+        write_features,
+    )
+
+    config = load_config()
+    target_column = config["target_column"]
+    path_train = path_train_test.replace("{split}", "train")
+    path_val = path_train_test.replace("{split}", "val")
+
+    logger.info("Reading input data")
+    df_train = read_artifact(path_train, columns=input_columns(config))
+    X_train = df_train.drop(columns=[target_column])
+    y_train = df_train[target_column]
+
+    logger.info("Fitting the preprocessor once for every trial")
+    preprocessor = make_preprocessor(config)
+    X_train_features = encode_features(preprocessor.fit_transform(X_train, y_train))
+    # with the dtypes of the training data, which the preprocessor was fitted on.
+    df_val = read_artifact_for_pipeline(
+        path_val, preprocessor, extra_columns=[target_column], cast=False
+    )
+    X_val_features = encode_features(
+        preprocessor.transform(df_val.drop(columns=[target_column]))
+    )
+
+    # labels are class indices in the order LGBMClassifier encodes them, as the
+    # refitted best model encodes y_train.
+    classes = np.unique(y_train)
+    pos_label = int(np.searchsorted(classes, config["positive_label_value"]))
+    if n_iter is None:
+        n_iter = config["sweep"].get("n_iter")
+    configs = sweep_configs(config["sweep"]["grid"], n_iter, random_state)
+
+    if no_mlflow:
+        mlflow = None
+        run = contextlib.nullcontext()
+    else:
+        import mlflow
+
+        run = mlflow.start_run()
+    if features_dir is None:
+        directory_context = tempfile.TemporaryDirectory()
+    else:
+        directory_context = contextlib.nullcontext(features_dir)
+
+    with run, directory_context as directory:
+        logger.info("Writing the features")
+        paths = write_features(
+            directory,
+            X_train=X_train_features,
+            y_train=np.searchsorted(classes, y_train),
+            X_val=X_val_features,
+            y_val=np.searchsorted(classes, df_val[target_column]),
+        )
+        # the workers read the memory mapped files, not these copies.
+        del X_train_features, X_val_features
+
+        logger.info(f"Running {len(configs)} trials")
+        results = run_trials(
+            configs, paths, config["classifier"], pos_label, n_jobs=n_jobs
+        )
+        best = max(results, key=lambda result: result["f1_validation"])
+        for result in results:
+            logger.info(
+                f"...f1 train {result['f1_train']:.5f}, "
+                f"validation {result['f1_validation']:.5f}: {result['params']}"
+            )
+        logger.info(f"...Best validation f1 score: {best['f1_validation']:.5f}")
+
+        if mlflow is not None:
+            logger.info("...Logging the trials in mlflow")
+            for result in results:
+                with mlflow.start_run(nested=True):
+                    mlflow.log_params(result["params"])
+                    mlflow.log_metrics(
+                        {
+                            key: result[key]
+                            for key in ("f1_train", "f1_validation", "fit_seconds")
+                        }
+                    )
+            mlflow.log_params({f"best_{k}": v for k, v in best["params"].items()})
+            mlflow.log_metric(key="best_f1_validation", value=best["f1_validation"])
+
+        if path_model:
+            logger.info("Saving the best model")
+            classifier = LGBMClassifier(**{**config["classifier"], **best["params"]})
+            # refitted on the preprocessor output, the features the saved Pipeline
+            # predicts from, with the values of the trial features.
+            classifier.fit(preprocessor.transform(X_train), y_train)
+            model = Pipeline(
+                [("preprocessor", preprocessor), ("classifier", classifier)]
+            )
+            os.makedirs(os.path.dirname(path_model) or ".", exist_ok=True)
+            save_model(model, path_model)
+
+    logger.info("sweep finished")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)-15s %(message)s")
+    typer.run(sweep)
@@ -1,11 +1,36 @@
 """Module to combine sklearn transformers."""
-from typing import List, Optional, Tuple
+import functools
+from typing import List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+from joblib import effective_n_jobs
+from scipy import sparse as sp
+from sklearn.base import clone
 from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import FunctionTransformer
+from sklearn.utils import _print_elapsed_time, _safe_indexing
+from sklearn.utils.validation import _check_feature_names_in
 
+from src.parallel import (
+    BACKENDS,
+    ColumnGroups,
+    is_column_separable,
+    join_groups,
+    releases_gil,
+    run_jobs,
+    split_columns,
+)
+from src.profiling import (
+    BranchMessage,
+    active_profiler,
+    profiled,
+    profiled_branch,
+)
+from src.streaming import ChunkedTransformerMixin
 
-class ColumnDataFrameTransformer(ColumnTransformer):
+
+class ColumnDataFrameTransformer(ChunkedTransformerMixin, ColumnTransformer):
     """Applies transformers to DataFrames and returns a DataFrame with feature
     names. This estimator allows different columns or column subsets of the
     input to be transformed separately and the features generated by each
@@ -14,6 +39,17 @@ class ColumnDataFrameTransformer(ColumnTransformer):
      or transformations into a single transformer.
     .. versionadded:: 0.0.1
 
+    When every transformer returns sparse data (a scipy sparse matrix or a
+    DataFrame backed by `pd.SparseDtype` columns) the combined result is kept
+    sparse and returned as a DataFrame with `pd.SparseDtype` columns.
+    Otherwise the outputs are joined with `pd.concat`, so every column keeps
+    its own dtype.
+
+    With `n_jobs` > 1, branches whose input is numeric run in threads, as
+    NumPy releases the GIL, and the others in processes, see `backend`. Wide
+    branches of column separable transformers can also be split in groups of
+    columns fitted and transformed in parallel, see `max_branch_columns`.
+
     Attributes:
             - transformers (List[Tuple[str, ...]]): List of (name, transformer,
             columns) tuples specifying the transformer objects to be applied
@@ -31,6 +67,14 @@ class ColumnDataFrameTransformer(ColumnTransformer):
             `get_feature_names_out` will prefix all feature names with the
             name of the transformer that generated that feature. Defaults to
             True.
+            - backend (str, optional): where the branches run with `n_jobs` >
+            1: "auto" runs branches with numeric inputs in threads and the
+            others in processes, "threads" or "processes" run every branch
+            there. "processes" without `max_branch_columns` is the
+            ColumnTransformer behaviour. Defaults to "auto".
+            - max_branch_columns (int, optional): if set, branches of column
+            separable transformers with more columns are split in groups of
+            at most this many columns, run as separate jobs. Defaults to None.
     """
 
     def __init__(
@@ -41,6 +85,8 @@ class ColumnDataFrameTransformer(ColumnTransformer):
         transformer_weights: Optional[dict] = None,
         verbose: bool = False,
         verbose_feature_names_out: bool = True,
+        backend: str = "auto",
+        max_branch_columns: Optional[int] = None,
     ):
         super().__init__(
             transformers,
@@ -50,7 +96,10 @@ class ColumnDataFrameTransformer(ColumnTransformer):
             verbose=verbose,
             verbose_feature_names_out=verbose_feature_names_out,
         )
+        self.backend = backend
+        self.max_branch_columns = max_branch_columns
 
+    @profiled
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Transforms X, concatenates results & returns a DataFrame with
         feature names.
@@ -61,10 +110,9 @@ class ColumnDataFrameTransformer(ColumnTransformer):
             names.
         """
         X_transformed = super().transform(X)
-        return pd.DataFrame(
-            X_transformed, columns=super().get_feature_names_out()
-        )
+        return self._to_data_frame(X_transformed)
 
+    @profiled
     def fit_transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
         """Fits, transforms, concatenates data & returns a DataFrame with
         feature names.
@@ -76,6 +124,210 @@ class ColumnDataFrameTransformer(ColumnTransformer):
             names.
         """
         X_transformed = super().fit_transform(X, y)
-        return pd.DataFrame(
-            X_transformed, columns=super().get_feature_names_out()
+        self.feature_names_out_ = super().get_feature_names_out()
+        return self._to_data_frame(X_transformed)
+
+    @profiled
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Fits the transformers incrementally with a chunk of X. Every
+        transformer must implement `partial_fit`.
+        Args:
+            - X (pd.DataFrame): chunk of the data to be transformed by subset.
+            - y (, optional): ignored. Defaults to None.
+        Returns:
+            ColumnDataFrameTransformer: instance fitted.
+        """
+        first_call = not hasattr(self, "transformers_")
+        if first_call:
+            self._check_feature_names(X, reset=True)
+            self._check_n_features(X, reset=True)
+            self._validate_transformers()
+            self._validate_column_callables(X)
+            self._validate_remainder(X)
+            self.sparse_output_ = False
+
+        transformers = self._fit_transform(
+            X,
+            y,
+            _partial_fit_one,
+            fitted=not first_call,
+            column_as_strings=not first_call,
+        )
+        self._update_fitted_transformers(transformers)
+        self.feature_names_out_ = super().get_feature_names_out()
+        self._record_fitted_output_indices()
+        return self
+
+    def _record_fitted_output_indices(self) -> None:
+        """Sets `output_indices_` from the output widths of the fitted
+        transformers, as `fit_transform` does from their outputs, for the fit
+        paths that never hold every output (`partial_fit` and `fit_dask`)."""
+        input_features = _check_feature_names_in(self)
+        self.output_indices_ = {}
+        start = 0
+        for name, trans, columns, _ in self._iter(fitted=True):
+            feature_names = self._get_feature_name_out_for_transformer(
+                name, trans, columns, input_features
+            )
+            if feature_names is None:
+                continue
+            self.output_indices_[name] = slice(
+                start, start + len(feature_names)
+            )
+            start += len(feature_names)
+        # dropped and empty transformers have no output.
+        names = [name for name, _, _ in self.transformers]
+        for name in names + ["remainder"]:
+            self.output_indices_.setdefault(name, slice(0, 0))
+
+    def _fit_transform(
+        self, X, y, func, fitted=False, column_as_strings=False
+    ):
+        if self.backend not in BACKENDS:
+            raise ValueError(
+                f"backend should be one of {BACKENDS}, got {self.backend!r}."
+            )
+        func = profiled_branch(func, type(self).__name__)
+        n_jobs = effective_n_jobs(self.n_jobs)
+        if self.max_branch_columns is None and (
+            n_jobs == 1 or self.backend == "processes"
+        ):
+            return super()._fit_transform(
+                X, y, func, fitted=fitted, column_as_strings=column_as_strings
+            )
+
+        transformers = list(
+            self._iter(
+                fitted=fitted,
+                replace_strings=True,
+                column_as_strings=column_as_strings,
+            )
+        )
+        jobs, branches = [], []
+        for idx, (name, trans, column, weight) in enumerate(transformers, 1):
+            X_branch = _safe_indexing(X, column, axis=1)
+            in_process = self.backend == "processes" or (
+                self.backend == "auto" and not releases_gil(X_branch)
+            )
+            parts = self._branch_parts(trans, X_branch, fitted)
+            branches.append((trans, parts))
+            message = self._log_message(name, idx, len(transformers))
+            for part, columns in parts:
+                call = functools.partial(
+                    func,
+                    transformer=part,
+                    X=X_branch if columns is None else X_branch[columns],
+                    y=y,
+                    weight=weight,
+                    message_clsname="ColumnTransformer",
+                    message=message,
+                )
+                jobs.append((call, in_process))
+
+        results = iter(run_jobs(jobs, n_jobs))
+        outputs = []
+        for trans, parts in branches:
+            branch_results = [next(results) for _ in parts]
+            if parts[0][1] is None:
+                outputs.append(branch_results[0])
+            else:
+                groups = [columns for _, columns in parts]
+                outputs.append(join_groups(branch_results, trans, groups))
+        return outputs
+
+    def _branch_parts(self, trans, X_branch, fitted: bool) -> List[Tuple]:
+        """Transformers and column groups run as jobs for a branch. Columns
+        are None when the branch is not split."""
+        if isinstance(trans, ColumnGroups):
+            return list(zip(trans.transformers_, trans.groups))
+        if fitted:
+            return [(trans, None)]
+        groups = [None]
+        if is_column_separable(trans) and isinstance(X_branch, pd.DataFrame):
+            groups = split_columns(X_branch.columns, self.max_branch_columns)
+        if len(groups) == 1:
+            groups = [None]
+        return [(clone(trans), columns) for columns in groups]
+
+    def _log_message(self, name, idx, total):
+        message = super()._log_message(name, idx, total)
+        if active_profiler() is None:
+            return message
+        # lets `profiled_branch` know which branch it runs.
+        return BranchMessage(name, message)
+
+    def _hstack(self, Xs: List) -> Union[np.ndarray, sp.csr_matrix]:
+        """Stacks Xs horizontally, keeping the result sparse when every
+        transformer output is sparse.
+        Args:
+            - Xs (List): outputs of the transformers.
+        Returns:
+            Union[np.ndarray, sp.csr_matrix]: Horizontally stacked results.
+        """
+        if Xs and all(_is_sparse(X) for X in Xs):
+            return sp.hstack([_to_spmatrix(X) for X in Xs], format="csr")
+        if not any(sp.issparse(X) for X in Xs):
+            return _concat_frames(Xs)
+        return super()._hstack(Xs)
+
+    def get_feature_names_out(self, input_features=None):
+        if input_features is None and hasattr(self, "feature_names_out_"):
+            return self.feature_names_out_
+        return super().get_feature_names_out(input_features)
+
+    def _to_data_frame(self, X_transformed) -> pd.DataFrame:
+        feature_names = self.feature_names_out_
+        if isinstance(X_transformed, pd.DataFrame):
+            X_transformed.columns = feature_names
+            return X_transformed
+        if sp.issparse(X_transformed):
+            return pd.DataFrame.sparse.from_spmatrix(
+                X_transformed, columns=feature_names
+            )
+        return pd.DataFrame(X_transformed, columns=feature_names)
+
+
+def _partial_fit_one(
+    transformer, X, y, weight, message_clsname="", message=None
+):
+    with _print_elapsed_time(message_clsname, message):
+        if hasattr(transformer, "partial_fit"):
+            return transformer.partial_fit(X, y)
+        if isinstance(transformer, FunctionTransformer):
+            # "passthrough" columns, nothing to learn.
+            return transformer.fit(X, y)
+        raise TypeError(
+            f"{type(transformer).__name__} does not implement partial_fit."
         )
+
+
+def _is_sparse(X) -> bool:
+    if isinstance(X, pd.DataFrame):
+        return X.shape[1] > 0 and all(
+            isinstance(dtype, pd.SparseDtype) for dtype in X.dtypes
+        )
+    return sp.issparse(X)
+
+
+def _concat_frames(Xs: List) -> pd.DataFrame:
+    """Joins the transformers outputs keeping the dtypes of every column.
+
+    Outputs are aligned on a RangeIndex, as the previous ndarray based stacking
+    did, by replacing the index of shallow copies, so no data is copied.
+    """
+    index = pd.RangeIndex(len(Xs[0]))
+    frames = []
+    for X in Xs:
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X)
+        elif not X.index.equals(index):
+            X = X.copy(deep=False)
+            X.index = index
+        frames.append(X)
+    return pd.concat(frames, axis=1, copy=False)
+
+
+def _to_spmatrix(X) -> sp.spmatrix:
+    if isinstance(X, pd.DataFrame):
+        return X.sparse.to_coo()
+    return X
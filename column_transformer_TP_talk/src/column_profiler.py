@@ -0,0 +1,129 @@
+"""Module to profile the columns of a dataset in a single pass."""
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.sketches import HyperLogLog
+
+
+class ColumnProfiler:
+    """Computes null counts, approximated distinct counts and dtypes of every
+    column in one sweep over the data, which can be read chunk by chunk.
+
+    `NaNColumnsDropper` and `HighCardinalityDroppper` can be fitted from a
+    profile instead of scanning the data again, so the columns to drop are
+    known before the full dataset is loaded.
+
+    Attributes:
+        - precision (int): precision of the HyperLogLog sketches used to
+        count the distinct values.
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        self.precision = precision
+        self.n_rows = 0
+        self.null_counts = pd.Series(dtype=np.int64)
+        self.dtypes = pd.Series(dtype=object)
+        self._distinct_sketches: Dict[str, HyperLogLog] = {}
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable[pd.DataFrame], precision: int = 14
+    ) -> "ColumnProfiler":
+        """Profiles the data chunk by chunk.
+        Args:
+            - chunks (Iterable[pd.DataFrame]): input data split by rows.
+            - precision (int): precision of the HyperLogLog sketches.
+        Returns:
+            ColumnProfiler: profile of the data.
+        """
+        profiler = cls(precision=precision)
+        for chunk in chunks:
+            profiler.update(chunk)
+        return profiler
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str,
+        chunksize: int = 100_000,
+        precision: int = 14,
+        **read_csv_kwargs,
+    ) -> "ColumnProfiler":
+        """Profiles a CSV file without loading it fully in memory.
+        Args:
+            - path (str): path of the CSV file.
+            - chunksize (int): number of rows read at a time.
+            - precision (int): precision of the HyperLogLog sketches.
+            - read_csv_kwargs: other arguments passed to `pd.read_csv`.
+        Returns:
+            ColumnProfiler: profile of the file.
+        """
+        with pd.read_csv(
+            path, chunksize=chunksize, **read_csv_kwargs
+        ) as chunks:
+            return cls.from_chunks(chunks, precision=precision)
+
+    def update(self, chunk: pd.DataFrame) -> "ColumnProfiler":
+        """Adds a chunk of the data to the profile.
+        Args:
+            - chunk (pd.DataFrame): rows of the data.
+        Returns:
+            ColumnProfiler: updated profile.
+        """
+        self.n_rows += chunk.shape[0]
+        self.null_counts = self.null_counts.add(
+            chunk.isna().sum(), fill_value=0
+        ).astype(np.int64)
+        for column, dtype in chunk.dtypes.items():
+            self.dtypes[column] = _common_dtype(self.dtypes.get(column), dtype)
+            if column not in self._distinct_sketches:
+                self._distinct_sketches[column] = HyperLogLog(self.precision)
+            self._distinct_sketches[column].update(chunk[column])
+        return self
+
+    def merge(self, other: "ColumnProfiler") -> "ColumnProfiler":
+        """Adds the profile of another shard of the data.
+        Args:
+            - other (ColumnProfiler): profile of another shard.
+        Returns:
+            ColumnProfiler: merged profile.
+        """
+        self.n_rows += other.n_rows
+        self.null_counts = self.null_counts.add(
+            other.null_counts, fill_value=0
+        ).astype(np.int64)
+        for column, dtype in other.dtypes.items():
+            self.dtypes[column] = _common_dtype(self.dtypes.get(column), dtype)
+            if column not in self._distinct_sketches:
+                self._distinct_sketches[column] = HyperLogLog(self.precision)
+            self._distinct_sketches[column].merge(
+                other._distinct_sketches[column]
+            )
+        return self
+
+    @property
+    def columns(self) -> pd.Index:
+        """Columns profiled, in the order they were found."""
+        return self.dtypes.index
+
+    @property
+    def distinct_counts(self) -> pd.Series:
+        """Approximated number of distinct non-null values per column."""
+        return pd.Series(
+            {
+                column: sketch.count()
+                for column, sketch in self._distinct_sketches.items()
+            },
+            dtype=float,
+        )
+
+
+def _common_dtype(dtype: Optional[np.dtype], other: np.dtype) -> np.dtype:
+    if dtype is None or dtype == other:
+        return other
+    both_numpy = isinstance(dtype, np.dtype) and isinstance(other, np.dtype)
+    if both_numpy and dtype.kind in "biuf" and other.kind in "biuf":
+        return np.result_type(dtype, other)
+    return np.dtype(object)
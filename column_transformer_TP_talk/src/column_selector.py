@@ -3,8 +3,11 @@ from typing import List
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from src.profiling import profiled
+from src.streaming import ChunkedTransformerMixin
 
-class ColumnSelector(BaseEstimator, TransformerMixin):
+
+class ColumnSelector(ChunkedTransformerMixin, BaseEstimator, TransformerMixin):
     """Filters the specified columns.
 
     Attributes:
@@ -18,6 +21,7 @@ class ColumnSelector(BaseEstimator, TransformerMixin):
     def _filter_columns(self, df: pd.DataFrame) -> pd.DataFrame:
         return df[self.selected_columns]
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the values to replace by using 'transform' method.
         Args:
@@ -25,6 +29,16 @@ class ColumnSelector(BaseEstimator, TransformerMixin):
         """
         return self
 
+    @profiled
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Fits the transformer on a chunk of the input data. Nothing is
+        learned from the values, so it is equivalent to `fit`.
+        Args:
+            X (pd.DataFrame): chunk of input data
+        """
+        return self.fit(X)
+
+    @profiled
     def transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
         """Executes the methods to transform each type of column.
         Args:
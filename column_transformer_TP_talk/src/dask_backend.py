@@ -0,0 +1,314 @@
+"""Module to fit and transform Dask DataFrames out of core.
+
+`fit_dask` computes the statistics of a transformer with Dask reductions over
+the partitions, so only a few partitions and the reduced statistics are in
+memory at a time, and `transform_dask` applies the fitted transformer lazily
+with `map_partitions`. A pipeline over a CSV larger than memory, e.g.
+`dd.read_csv("accepted_2007_to_2018Q4.csv", blocksize="64MB")`, is fitted with
+one pass over the data per step, like `pipeline_fit_iter`, and gives the same
+transformers as fitting the pipeline on the pandas DataFrame.
+
+The reductions run on the local scheduler given to `fit_dask`: "threads",
+"processes" or "synchronous".
+"""
+import functools
+from typing import Callable, List, Optional
+
+import dask
+import dask.dataframe as dd
+import numpy as np
+import pandas as pd
+from dask.delayed import Delayed
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import FunctionTransformer
+from sklearn.utils import _safe_indexing
+
+from src.column_data_frame_transformer import ColumnDataFrameTransformer
+from src.column_selector import ColumnSelector
+from src.date_coercion import DateCoercion
+from src.encoder import OneHotDataFrameEncoder
+from src.high_cardinality_dropper import HighCardinalityDroppper
+from src.imputer import SimpleDataFrameImputer
+from src.nan_dropper import NaNColumnsDropper
+from src.replacer import Replacer
+from src.scaler import StandardDataFrameScaler, _shard_moments
+
+SCHEDULERS = ("threads", "processes", "synchronous")
+
+
+def fit_dask(transformer, ddf: dd.DataFrame, scheduler: str = "threads"):
+    """Fits a transformer, or a pipeline of transformers, on a Dask DataFrame.
+
+    Transformers without a Dask reduction are fitted with `partial_fit`, one
+    partition at a time.
+    Args:
+        - transformer: DataFrame transformer, ColumnDataFrameTransformer or
+        Pipeline of them.
+        - ddf (dd.DataFrame): input data.
+        - scheduler (str): local Dask scheduler computing the reductions,
+        one of SCHEDULERS.
+    Returns:
+        transformer: instance fitted.
+    """
+    if scheduler not in SCHEDULERS:
+        raise ValueError(
+            f"scheduler should be one of {SCHEDULERS}, got {scheduler!r}."
+        )
+    _fit(transformer, ddf, scheduler)
+    return transformer
+
+
+def transform_dask(transformer, ddf: dd.DataFrame) -> dd.DataFrame:
+    """Transforms a Dask DataFrame lazily, partition by partition.
+
+    The first rows of `ddf` are transformed to get the output columns and
+    dtypes. Every output partition keeps the index of its input partition, so
+    the divisions of `ddf` are kept.
+    Args:
+        - transformer: fitted transformer, or pipeline, returning DataFrames.
+        - ddf (dd.DataFrame): input data.
+    Returns:
+        dd.DataFrame: transformed data, not computed yet.
+    """
+    sample = ddf.head(1)
+    if sample.empty:
+        raise ValueError("The first partition of the data is empty.")
+    meta = _transform_partition(sample, transformer).iloc[:0]
+    return ddf.map_partitions(_transform_partition, transformer, meta=meta)
+
+
+def _transform_partition(partition: pd.DataFrame, transformer) -> pd.DataFrame:
+    X_transformed = transformer.transform(partition)
+    if not isinstance(X_transformed, pd.DataFrame):
+        raise TypeError(
+            f"{type(transformer).__name__} must return DataFrames, e.g. "
+            'OneHotDataFrameEncoder with output_format="dense" or '
+            '"sparse_frame".'
+        )
+    if not X_transformed.index.equals(partition.index):
+        X_transformed = X_transformed.copy(deep=False)
+        X_transformed.index = partition.index
+    return X_transformed
+
+
+@functools.singledispatch
+def _fit(transformer, ddf: dd.DataFrame, scheduler: str) -> None:
+    if not hasattr(transformer, "partial_fit"):
+        raise TypeError(
+            f"{type(transformer).__name__} can't be fitted on Dask "
+            "DataFrames, as it does not implement partial_fit."
+        )
+    for partition in ddf.to_delayed():
+        chunk = partition.compute(scheduler=scheduler)
+        if not chunk.empty:
+            transformer.partial_fit(chunk)
+
+
+@_fit.register(ColumnSelector)
+@_fit.register(Replacer)
+@_fit.register(FunctionTransformer)
+def _fit_on_meta(transformer, ddf: dd.DataFrame, scheduler: str) -> None:
+    # only the column names are learned, the empty `_meta` frame has them.
+    transformer.fit(ddf._meta)
+
+
+@_fit.register(NaNColumnsDropper)
+def _fit_nan_dropper(
+    transformer: NaNColumnsDropper, ddf: dd.DataFrame, scheduler: str
+) -> None:
+    if transformer.profile is not None:
+        transformer.fit(None)
+        return
+    null_counts, nrows = dask.compute(
+        ddf.isna().sum(), ddf.index.size, scheduler=scheduler
+    )
+    transformer._select_columns(nrows, null_counts, ddf.columns)
+
+
+@_fit.register(HighCardinalityDroppper)
+def _fit_high_cardinality_dropper(
+    transformer: HighCardinalityDroppper, ddf: dd.DataFrame, scheduler: str
+) -> None:
+    if transformer.profile is not None:
+        transformer.fit(None)
+        return
+    *distinct_counts, nrows = dask.compute(
+        *[ddf[column].nunique() for column in ddf.columns],
+        ddf.index.size,
+        scheduler=scheduler,
+    )
+    transformer._select_columns(
+        nrows, pd.Series(distinct_counts, index=ddf.columns), ddf.columns
+    )
+
+
+@_fit.register(DateCoercion)
+def _fit_date_coercion(
+    transformer: DateCoercion, ddf: dd.DataFrame, scheduler: str
+) -> None:
+    # the formats are learned from the first `sample_size` unique values of
+    # every column, which are usually in the first partition.
+    unique_values = {
+        column: pd.Series(dtype=ddf[column].dtype)
+        for column in transformer.date_columns
+    }
+    for partition in ddf[transformer.date_columns].to_delayed():
+        chunk = partition.compute(scheduler=scheduler)
+        for column, values in unique_values.items():
+            unique_values[column] = pd.concat(
+                [values, chunk[column].dropna()], ignore_index=True
+            ).drop_duplicates(ignore_index=True)
+        if all(
+            len(values) >= transformer.sample_size
+            for values in unique_values.values()
+        ):
+            break
+
+    transformer.fit(
+        pd.DataFrame(unique_values).reindex(columns=ddf.columns)
+    )
+
+
+@_fit.register(SimpleDataFrameImputer)
+def _fit_imputer(
+    transformer: SimpleDataFrameImputer, ddf: dd.DataFrame, scheduler: str
+) -> None:
+    partition_imputers = [
+        dask.delayed(_partial_fit_partition)(clone(transformer), partition)
+        for partition in ddf.to_delayed()
+    ]
+    imputer = _tree_reduce(partition_imputers, _merge_imputers).compute(
+        scheduler=scheduler
+    )
+    if imputer is None:
+        raise ValueError("Every partition of the data is empty.")
+    # the merged imputer is a fitted clone of the transformer.
+    transformer.__dict__.update(imputer.__dict__)
+
+
+@_fit.register(StandardDataFrameScaler)
+def _fit_scaler(
+    transformer: StandardDataFrameScaler, ddf: dd.DataFrame, scheduler: str
+) -> None:
+    results = dask.compute(
+        *[
+            dask.delayed(_shard_moments)(partition, None)
+            for partition in ddf.to_delayed()
+        ],
+        scheduler=scheduler,
+    )
+    transformer._fit_shard_moments(list(results))
+
+
+@_fit.register(OneHotDataFrameEncoder)
+def _fit_encoder(
+    transformer: OneHotDataFrameEncoder, ddf: dd.DataFrame, scheduler: str
+) -> None:
+    if (
+        transformer.min_frequency is not None
+        or transformer.max_categories is not None
+    ):
+        raise ValueError(
+            "Dask DataFrames are not supported with infrequent categories."
+        )
+    unique_values = dask.compute(
+        *[ddf[column].unique() for column in ddf.columns], scheduler=scheduler
+    )
+    empty_columns = [
+        column
+        for column, values in zip(ddf.columns, unique_values)
+        if len(values) == 0
+    ]
+    if empty_columns:
+        raise ValueError(
+            "Cannot fit the encoder on columns without values: "
+            f"{empty_columns}."
+        )
+    # as in `partial_fit`, fitting on the unique values gives the same
+    # categories as fitting on the whole data.
+    n_rows = max(len(values) for values in unique_values)
+    transformer.fit(
+        pd.DataFrame(
+            {
+                column: values.iloc[np.arange(n_rows) % len(values)].values
+                for column, values in zip(ddf.columns, unique_values)
+            },
+            columns=ddf.columns,
+        )
+    )
+
+
+@_fit.register(ColumnDataFrameTransformer)
+def _fit_column_transformer(
+    transformer: ColumnDataFrameTransformer,
+    ddf: dd.DataFrame,
+    scheduler: str,
+) -> None:
+    meta = ddf._meta
+    transformer._check_feature_names(meta, reset=True)
+    transformer._check_n_features(meta, reset=True)
+    transformer._validate_transformers()
+    transformer._validate_column_callables(meta)
+    transformer._validate_remainder(meta)
+    transformer.sparse_output_ = False
+
+    fitted_transformers = []
+    for _, branch, columns, _ in transformer._iter(
+        fitted=False, replace_strings=True
+    ):
+        branch_columns = list(_safe_indexing(meta, columns, axis=1).columns)
+        fitted_transformers.append(
+            fit_dask(clone(branch), ddf[branch_columns], scheduler)
+        )
+    transformer._update_fitted_transformers(fitted_transformers)
+    transformer.feature_names_out_ = ColumnTransformer.get_feature_names_out(
+        transformer
+    )
+    transformer._record_fitted_output_indices()
+
+
+@_fit.register(Pipeline)
+def _fit_pipeline(
+    transformer: Pipeline, ddf: dd.DataFrame, scheduler: str
+) -> None:
+    # every step is fitted on the lazily transformed output of the previous
+    # ones, so the data is read again for every step.
+    for _, step in transformer.steps:
+        if step is None or step == "passthrough":
+            continue
+        _fit(step, ddf, scheduler)
+        ddf = transform_dask(step, ddf)
+
+
+def _partial_fit_partition(
+    imputer: SimpleDataFrameImputer, partition: pd.DataFrame
+) -> Optional[SimpleDataFrameImputer]:
+    if partition.empty:
+        return None
+    return imputer.partial_fit(partition)
+
+
+def _merge_imputers(
+    imputer: Optional[SimpleDataFrameImputer],
+    other: Optional[SimpleDataFrameImputer],
+) -> Optional[SimpleDataFrameImputer]:
+    if imputer is None:
+        return other
+    if other is None:
+        return imputer
+    return imputer.merge(other)
+
+
+def _tree_reduce(
+    values: List[Delayed], merge: Callable, split_every: int = 8
+) -> Delayed:
+    """Merges delayed values in a tree, so at most `split_every` partial
+    results are merged at a time, and independent merges run in parallel."""
+    while len(values) > 1:
+        values = [
+            dask.delayed(functools.reduce)(merge, values[i : i + split_every])
+            for i in range(0, len(values), split_every)
+        ]
+    return values[0]
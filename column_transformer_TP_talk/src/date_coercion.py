@@ -1,33 +1,130 @@
 """Module to replace some values in the input data."""
-from typing import List
+from typing import Dict, List, Optional
 
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from src.profiling import profiled
+from src.streaming import ChunkedTransformerMixin
 
-class DateCoercion(BaseEstimator, TransformerMixin):
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.0
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+CANDIDATE_FORMATS = (
+    "%b-%Y",
+    "%Y-%m-%d",
+    "%Y-%m-%d %H:%M:%S",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%d-%b-%Y",
+    "%Y%m%d",
+)
+
+
+class DateCoercion(ChunkedTransformerMixin, BaseEstimator, TransformerMixin):
     """Cast date columns from objects/str to datetime.
 
+    `fit` learns the date format of every column, so `transform` parses with
+    a fixed format instead of inferring it row by row, and only the unique
+    values of each column are parsed.
+
     Attributes:
         - date_columns (list): list of columns wto be casted.
+        - sample_size (int): number of unique values per column used to
+        learn its format.
+        - output_dtype (str, optional): dtype of the casted columns, e.g.
+        "period[M]" for month dates. Defaults to datetime64[ns].
+        - inplace (bool): if True, `transform` assigns the casted columns into
+        the input DataFrame and returns it, without any new DataFrame. If
+        False, the input is never modified and only the casted columns are
+        new.
     """
 
-    def __init__(self, date_columns: List) -> None:
+    def __init__(
+        self,
+        date_columns: List,
+        sample_size: int = 1000,
+        output_dtype: Optional[str] = None,
+        inplace: bool = False,
+    ) -> None:
         self.date_columns = date_columns
+        self.sample_size = sample_size
+        self.output_dtype = output_dtype
+        self.inplace = inplace
+
+    def _learn_format(self, values: pd.Series) -> Optional[str]:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return None
+        sample = pd.Series(values.dropna().unique()[: self.sample_size])
+        if sample.empty:
+            return None
+
+        guessed_format = guess_datetime_format(str(sample.iloc[0]))
+        for date_format in (guessed_format, *CANDIDATE_FORMATS):
+            if date_format is None:
+                continue
+            try:
+                pd.to_datetime(sample, format=date_format)
+            except (ValueError, TypeError):
+                continue
+            return date_format
+        return None
+
+    def _to_datetime(
+        self, values: pd.Series, date_format: Optional[str]
+    ) -> pd.Series:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        codes, uniques = pd.factorize(values)
+        try:
+            parsed = pd.to_datetime(uniques, format=date_format)
+        except (ValueError, TypeError):
+            # values with another format than the learned one.
+            parsed = pd.to_datetime(uniques)
+        return pd.Series(
+            parsed.take(codes, allow_fill=True, fill_value=pd.NaT),
+            index=values.index,
+            name=values.name,
+        )
 
     def _caster(self, df: pd.DataFrame) -> pd.DataFrame:
+        casted_df = df if self.inplace else df.copy(deep=False)
         for column in self.date_columns:
-            df[column] = pd.to_datetime(df.loc[:, column])
-        return df
+            casted = self._to_datetime(
+                df[column], self.date_formats.get(column)
+            )
+            if self.output_dtype is not None:
+                casted = casted.astype(self.output_dtype)
+            casted_df[column] = casted
+        return casted_df
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the values to replace by using 'transform' method.
         Args:
             df (pd.DataFrame): input data
         """
         self.column_names = X.columns
+        self.date_formats: Dict[str, Optional[str]] = {
+            column: self._learn_format(X[column])
+            for column in self.date_columns
+        }
+        return self
+
+    @profiled
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Fits the transformer on a chunk of the input data. The date formats
+        are learned from the first chunk.
+        Args:
+            X (pd.DataFrame): chunk of input data
+        """
+        if not hasattr(self, "date_formats"):
+            return self.fit(X)
         return self
 
+    @profiled
     def transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
         """Executes the methods to transform each type of column.
         Args:
@@ -36,4 +133,4 @@ class DateCoercion(BaseEstimator, TransformerMixin):
             pd.DataFrame: Dataframe with imputed values.
         """
         df = self._caster(X)
-        return pd.DataFrame(df, columns=self.column_names)
+        return df.reindex(columns=self.column_names, copy=False)
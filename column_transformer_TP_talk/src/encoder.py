@@ -3,15 +3,33 @@ from typing import Optional, Union
 
 import numpy as np
 import pandas as pd
+from scipy import sparse as sp
 from sklearn.preprocessing import OneHotEncoder
 
+from src.profiling import profiled
+from src.schema import ColumnSchema
+from src.streaming import ChunkedTransformerMixin
 
-class OneHotDataFrameEncoder(OneHotEncoder):
+OUTPUT_FORMATS = ("dense", "sparse_frame", "csr")
+
+
+class OneHotDataFrameEncoder(ChunkedTransformerMixin, OneHotEncoder):
     """Encode categorical features as a one-hot numeric array.
 
     Check the scikit-learn official documentation for further information about
     the input parameters:
     https://scikit-learn.org/stable/modules/generated/sklearn.preprocessing.OneHotEncoder.html
+
+    Attributes:
+        - output_format (str): container returned by `transform`. "dense"
+        returns an int8 DataFrame, "sparse_frame" returns a DataFrame backed
+        by `pd.SparseDtype` columns and "csr" returns a scipy CSR matrix
+        (feature names are available through `get_feature_names_out`). The
+        sparse formats are built from the encoder output without any dense
+        copy.
+        - reorder_columns (bool): if True, `transform` selects the columns
+        seen at fit time by name, instead of failing when they come in another
+        order.
     """  # noqa
 
     def __init__(
@@ -23,9 +41,13 @@ class OneHotDataFrameEncoder(OneHotEncoder):
         handle_unknown: str = "error",
         min_frequency: Optional[Union[int, float]] = None,
         max_categories: Optional[Union[int, float]] = None,
+        output_format: str = "dense",
+        reorder_columns: bool = False,
     ) -> None:
         """Initializes the one hot encoder."""
         self.column_names = []
+        self.output_format = output_format
+        self.reorder_columns = reorder_columns
         super().__init__(
             categories=categories,
             drop=drop,
@@ -36,6 +58,7 @@ class OneHotDataFrameEncoder(OneHotEncoder):
             max_categories=max_categories,
         )
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the scaler based on X.
         Args:
@@ -44,28 +67,98 @@ class OneHotDataFrameEncoder(OneHotEncoder):
         Returns:
             StandardDataFrameScaler: instance fitted.
         """
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"output_format should be one of {OUTPUT_FORMATS}, "
+                f"got {self.output_format!r}."
+            )
         super().fit(X)
         self.column_names = X.columns
+        self.schema_ = ColumnSchema.from_frame(X)
         self.feature_names = super().get_feature_names_out()
+        self._seen_values = None
         return self
 
-    def transform(self, X: pd.DataFrame) -> pd.DataFrame:
+    @profiled
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Adds the categories found in a chunk of X to the encoder.
+        Args:
+            X (pd.DataFrame): chunk of input data.
+            y (, optional): Ignored. Defaults to None.
+        Returns:
+            OneHotDataFrameEncoder: instance fitted.
+        """
+        if self.min_frequency is not None or self.max_categories is not None:
+            raise ValueError(
+                "partial_fit does not support infrequent categories."
+            )
+
+        seen_values = getattr(self, "_seen_values", None)
+        chunk_values = [pd.unique(X[column]) for column in X.columns]
+        if seen_values is not None:
+            chunk_values = [
+                pd.unique(np.concatenate([seen, values]))
+                for seen, values in zip(seen_values, chunk_values)
+            ]
+
+        # the encoder only needs each value once: fitting on the unique values
+        # gives the same categories as fitting on every chunk seen so far.
+        n_rows = max(len(values) for values in chunk_values)
+        self.fit(
+            pd.DataFrame(
+                {
+                    column: np.resize(values, n_rows)
+                    for column, values in zip(X.columns, chunk_values)
+                },
+                columns=X.columns,
+            )
+        )
+        self._seen_values = chunk_values
+        return self
+
+    @profiled
+    def transform(self, X: pd.DataFrame) -> Union[pd.DataFrame, sp.csr_matrix]:
         """Scales X and adds column names.
         Args:
             X (pd.DataFrame): Input data.
         Returns:
-            pd.DataFrame: scaled data.
+            Union[pd.DataFrame, sp.csr_matrix]: encoded data in the container
+            selected by `output_format`.
         """
-        assert str(X.columns) == str(
-            self.column_names
-        ), "Columns don't have same order/elements. Valid "
-        f"order: {self.column_names}"
-
+        X = self.schema_.validate(X, reorder=self.reorder_columns)
         X_encoded = super().transform(X)
 
-        return pd.DataFrame(
-            X_encoded.toarray().astype("int8"), columns=self.feature_names
+        return _format_output(
+            X_encoded, self.feature_names, self.output_format
         )
 
     def get_feature_names_out(self, input_features=None):
         return self.feature_names
+
+    def _more_tags(self):
+        # every column is fitted on its own, so wide branches can be split.
+        return {"column_separable": True}
+
+
+def _format_output(
+    X_encoded, feature_names, output_format: str
+) -> Union[pd.DataFrame, sp.csr_matrix]:
+    """Wraps the one-hot codes into the requested container.
+
+    The codes are downcast to int8 while they are still sparse, so the dense
+    format allocates a single int8 matrix and the sparse formats never
+    allocate a dense one.
+    """
+    X_encoded = X_encoded.astype(np.int8)
+    if not sp.issparse(X_encoded):
+        if output_format == "dense":
+            return pd.DataFrame(X_encoded, columns=feature_names)
+        X_encoded = sp.csr_matrix(X_encoded)
+
+    if output_format == "csr":
+        return X_encoded.tocsr()
+    if output_format == "sparse_frame":
+        return pd.DataFrame.sparse.from_spmatrix(
+            X_encoded, columns=feature_names
+        )
+    return pd.DataFrame(X_encoded.toarray(), columns=feature_names)
@@ -1,8 +1,11 @@
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from src.column_profiler import ColumnProfiler
+from src.profiling import profiled
+
 
 class HighCardinalityDroppper(BaseEstimator, TransformerMixin):
     """Drops high cardinality columns.
@@ -12,16 +15,38 @@ class HighCardinalityDroppper(BaseEstimator, TransformerMixin):
         expressed as the fraction respect to the number of rows.
         - exclude (list): list of columns which won't pass through this
         estimator.
+        - profile (ColumnProfiler, optional): profile of the data. When
+        given, the approximated distinct counts are taken from it instead of
+        running `nunique` over X.
     """
 
-    def __init__(self, threshold: float = 0.9, exclude: List = []) -> None:
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        exclude: List = [],
+        profile: Optional[ColumnProfiler] = None,
+    ) -> None:
         self.threshold = threshold
         self.exclude = exclude
+        self.profile = profile
 
-    def _columns_dropper(self, df: pd.DataFrame) -> None:
-        nrows = df.shape[0]
+    def _columns_dropper(self, df: Optional[pd.DataFrame]) -> None:
+        if self.profile is not None:
+            nrows = self.profile.n_rows
+            distinct_counts = self.profile.distinct_counts[
+                self.profile.columns
+            ]
+            columns = self.profile.columns
+        else:
+            nrows = df.shape[0]
+            distinct_counts = df.nunique()
+            columns = df.columns
+        self._select_columns(nrows, distinct_counts, columns)
 
-        num_uniques = df.nunique().to_frame(name="num_uniques")
+    def _select_columns(
+        self, nrows: int, distinct_counts: pd.Series, columns: pd.Index
+    ) -> None:
+        num_uniques = distinct_counts.to_frame(name="num_uniques")
 
         missing_vals = num_uniques.assign(
             frac_uniques=num_uniques["num_uniques"] / nrows
@@ -35,7 +60,7 @@ class HighCardinalityDroppper(BaseEstimator, TransformerMixin):
             missing_vals["frac_uniques"] >= self.threshold
         ].index.values.tolist()
 
-        self.selected_columns = df.columns.difference(columns_to_drop)
+        self.selected_columns = columns.difference(columns_to_drop)
 
     def get_columns(self) -> List[str]:
         """Gets the list of remaining columns after the estimator is applied.
@@ -45,14 +70,16 @@ class HighCardinalityDroppper(BaseEstimator, TransformerMixin):
         """
         return self.selected_columns.tolist()
 
-    def fit(self, X: pd.DataFrame, y=None):
+    @profiled
+    def fit(self, X: Optional[pd.DataFrame], y=None):
         """Fits the values to replace by using 'transform' method.
         Args:
-            X (pd.DataFrame): input data
+            X (pd.DataFrame): input data, ignored when a profile is given.
         """
         self._columns_dropper(X)
         return self
 
+    @profiled
     def transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
         """Executes the methods to transform each type of column.
         Args:
@@ -4,13 +4,36 @@ import numpy as np
 import pandas as pd
 from sklearn.impute import SimpleImputer
 
+from src.profiling import profiled
+from src.schema import ColumnSchema
+from src.sketches import KLLSketch, MeanAccumulator, ValueCounter
+from src.streaming import ChunkedTransformerMixin
 
-class SimpleDataFrameImputer(SimpleImputer):
+FIT_MODES = ("exact", "sketch")
+
+
+class SimpleDataFrameImputer(ChunkedTransformerMixin, SimpleImputer):
     """Imputes null values in the input data.
 
     Check the scikit-learn official documentation for further information about
     the input parameters:
     https://scikit-learn.org/stable/modules/generated/sklearn.impute.SimpleImputer.html
+
+    `partial_fit` keeps a mergeable summary of every column, so the imputer
+    can be fitted by chunks, or by shards in parallel and combined with
+    `merge`.
+
+    Attributes:
+        - fit_mode (str): summary kept by `partial_fit`. "exact" keeps the
+        value counts of every column (or their sums for the mean strategy) and
+        gives the same statistics as `fit`. "sketch" approximates the medians
+        with KLL sketches, with bounded memory. Modes always use exact
+        counters.
+        - sketch_size (int): size of the KLL sketches. The median rank error is
+        close to 1.7 / sketch_size.
+        - reorder_columns (bool): if True, `transform` selects the columns
+        seen at fit time by name, instead of failing when they come in another
+        order.
     """  # noqa
 
     def __init__(
@@ -21,6 +44,9 @@ class SimpleDataFrameImputer(SimpleImputer):
         verbose="deprecated",
         copy=True,
         add_indicator=False,
+        fit_mode="exact",
+        sketch_size=200,
+        reorder_columns=False,
     ) -> None:
         """Initializes the columns by category.
         Args:
@@ -30,6 +56,9 @@ class SimpleDataFrameImputer(SimpleImputer):
         """
         if strategy == "mode":
             strategy = "most_frequent"
+        self.fit_mode = fit_mode
+        self.sketch_size = sketch_size
+        self.reorder_columns = reorder_columns
 
         super().__init__(
             missing_values=missing_values,
@@ -40,6 +69,7 @@ class SimpleDataFrameImputer(SimpleImputer):
             add_indicator=add_indicator,
         )
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the values to replace by using 'transform' method.
         Args:
@@ -47,8 +77,99 @@ class SimpleDataFrameImputer(SimpleImputer):
         """
         super().fit(X)
         self.column_names = X.columns
+        self.schema_ = ColumnSchema.from_frame(X)
+        self._summaries = None
+        return self
+
+    @profiled
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Updates the values to replace with a chunk of the input data.
+        Args:
+            X (pd.DataFrame): chunk of input data
+        """
+        if self.add_indicator:
+            raise ValueError("partial_fit does not support add_indicator.")
+        if self.fit_mode not in FIT_MODES:
+            raise ValueError(
+                f"fit_mode should be one of {FIT_MODES}, "
+                f"got {self.fit_mode!r}."
+            )
+
+        if getattr(self, "_summaries", None) is None:
+            self._validate_input(X, in_fit=True)
+            self.column_names = X.columns
+            self.schema_ = ColumnSchema.from_frame(X)
+            self._summaries = [self._new_summary() for _ in X.columns]
+        else:
+            X = self.schema_.validate(X, reorder=self.reorder_columns)
+
+        for summary, column in zip(self._summaries, X.columns):
+            values = X[column]
+            summary.update(values[~self._missing_mask(values)])
+
+        self.statistics_ = self._statistics_from_summaries()
         return self
 
+    def merge(self, other: "SimpleDataFrameImputer"):
+        """Merges the statistics of an imputer fitted on another shard of the
+        data, e.g. in another process. Both imputers must be fitted with
+        `partial_fit`.
+        Args:
+            other (SimpleDataFrameImputer): imputer fitted on another shard.
+        Returns:
+            SimpleDataFrameImputer: instance with merged statistics.
+        """
+        if (
+            getattr(self, "_summaries", None) is None
+            or getattr(other, "_summaries", None) is None
+        ):
+            raise ValueError("Only imputers fitted by partial_fit can merge.")
+        if other.schema_ != self.schema_:
+            raise ValueError(
+                "Columns don't have same order/elements. "
+                f"Valid order: {list(self.column_names)}"
+            )
+
+        for summary, other_summary in zip(self._summaries, other._summaries):
+            summary.merge(other_summary)
+        self.statistics_ = self._statistics_from_summaries()
+        return self
+
+    def _new_summary(self):
+        if self.strategy == "mean":
+            return MeanAccumulator()
+        if self.strategy == "median" and self.fit_mode == "sketch":
+            return KLLSketch(k=self.sketch_size)
+        return ValueCounter()
+
+    def _missing_mask(self, values: pd.Series) -> pd.Series:
+        if pd.isna(self.missing_values):
+            return values.isna()
+        return values == self.missing_values
+
+    def _statistics_from_summaries(self) -> np.ndarray:
+        if self.strategy == "constant":
+            fill_value = self.fill_value
+            if fill_value is None:
+                is_numeric = self._fit_dtype.kind in ("i", "u", "f")
+                fill_value = 0 if is_numeric else "missing_value"
+            return np.full(
+                len(self.column_names), fill_value, dtype=self._fit_dtype
+            )
+
+        statistic_methods = {
+            "mean": "mean",
+            "median": "median",
+            "most_frequent": "mode",
+        }
+        statistics = [
+            getattr(summary, statistic_methods[self.strategy])()
+            for summary in self._summaries
+        ]
+        dtype = object if self._fit_dtype.kind == "O" else float
+        return np.array(statistics, dtype=dtype)
+
+    @profiled
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Scales X and adds column names.
         Args:
@@ -56,11 +177,7 @@ class SimpleDataFrameImputer(SimpleImputer):
         Returns:
             pd.DataFrame: scaled data.
         """
-        assert str(X.columns) == str(self.column_names), (
-            f"Columns don't have same order/elements. "
-            f"Valid order: {self.column_names}"
-        )
-
+        X = self.schema_.validate(X, reorder=self.reorder_columns)
         X_scaled = super().transform(X)
         return pd.DataFrame(X_scaled, columns=self.column_names)
 
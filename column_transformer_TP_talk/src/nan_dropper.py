@@ -1,8 +1,11 @@
-from typing import List
+from typing import List, Optional
 
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from src.column_profiler import ColumnProfiler
+from src.profiling import profiled
+
 
 class NaNColumnsDropper(BaseEstimator, TransformerMixin):
     """Drops columns with amount of NaN values greater than a given threshold.
@@ -10,21 +13,38 @@ class NaNColumnsDropper(BaseEstimator, TransformerMixin):
     Attributes:
         - threshold (float): numbers NaN values allowed per column
         expressed as the fraction respect to the number of rows.
+        - profile (ColumnProfiler, optional): profile of the data. When
+        given, the null counts are taken from it instead of scanning X.
     """
 
-    def __init__(self, threshold: float = 0.4) -> None:
+    def __init__(
+        self, threshold: float = 0.4, profile: Optional[ColumnProfiler] = None
+    ) -> None:
         self.threshold = threshold
+        self.profile = profile
+
+    def _columns_dropper(self, df: Optional[pd.DataFrame]) -> None:
+        if self.profile is not None:
+            nrows = self.profile.n_rows
+            null_counts = self.profile.null_counts[self.profile.columns]
+            columns = self.profile.columns
+        else:
+            nrows = df.shape[0]
+            null_counts = df.isna().sum()
+            columns = df.columns
+        self._select_columns(nrows, null_counts, columns)
 
-    def _columns_dropper(self, df: pd.DataFrame) -> None:
-        nrows = df.shape[0]
-        missing_vals = df.isna().sum().to_frame(name="num_nans")
+    def _select_columns(
+        self, nrows: int, null_counts: pd.Series, columns: pd.Index
+    ) -> None:
+        missing_vals = null_counts.to_frame(name="num_nans")
         missing_vals = missing_vals.assign(
             frac_nans=missing_vals["num_nans"] / nrows
         )
         columns_to_drop = missing_vals[
             missing_vals["frac_nans"] >= self.threshold
         ].index.values.tolist()
-        self.selected_columns = df.columns.difference(columns_to_drop)
+        self.selected_columns = columns.difference(columns_to_drop)
 
     def get_columns(self) -> List[str]:
         """Gets the list of remaining columns after the estimator is applied.
@@ -34,14 +54,16 @@ class NaNColumnsDropper(BaseEstimator, TransformerMixin):
         """
         return self.selected_columns.tolist()
 
-    def fit(self, X: pd.DataFrame, y=None):
+    @profiled
+    def fit(self, X: Optional[pd.DataFrame], y=None):
         """Fits the values to replace by using 'transform' method.
         Args:
-            X (pd.DataFrame): input data
+            X (pd.DataFrame): input data, ignored when a profile is given.
         """
         self._columns_dropper(X)
         return self
 
+    @profiled
     def transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
         """Executes the methods to transform each type of column.
         Args:
@@ -0,0 +1,209 @@
+"""Module to run the branches of a ColumnDataFrameTransformer in parallel."""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse as sp
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+
+from src.profiling import active_profiler
+
+BACKENDS = ("auto", "threads", "processes")
+
+
+class ColumnGroups(BaseEstimator, TransformerMixin):
+    """Transformer fitted separately on groups of columns of a wide branch.
+
+    Only valid for column separable transformers, whose fit on a column does
+    not depend on the other columns, see `is_column_separable`. The outputs of
+    the groups are concatenated in order, so the branch returns the same
+    features as the transformer fitted on every column.
+
+    Attributes:
+        - transformer: column separable transformer, cloned for every group.
+        - groups (List[List]): column names of every group.
+    """
+
+    def __init__(self, transformer, groups: List[List]) -> None:
+        self.transformer = transformer
+        self.groups = groups
+
+    def fit(self, X: pd.DataFrame, y=None):
+        """Fits a clone of the transformer on every group of columns of X.
+        Args:
+            - X (pd.DataFrame): input data.
+            - y (, optional): ignored. Defaults to None.
+        Returns:
+            ColumnGroups: instance fitted.
+        """
+        self.transformers_ = [
+            clone(self.transformer).fit(X[columns], y)
+            for columns in self.groups
+        ]
+        return self
+
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Fits the transformer of every group incrementally with a chunk of
+        X.
+        Args:
+            - X (pd.DataFrame): chunk of the input data.
+            - y (, optional): ignored. Defaults to None.
+        Returns:
+            ColumnGroups: instance fitted.
+        """
+        if not hasattr(self, "transformers_"):
+            self.transformers_ = [
+                clone(self.transformer) for _ in self.groups
+            ]
+        for transformer, columns in zip(self.transformers_, self.groups):
+            transformer.partial_fit(X[columns], y)
+        return self
+
+    def transform(self, X: pd.DataFrame):
+        """Transforms every group of columns of X and concatenates the
+        outputs.
+        Args:
+            - X (pd.DataFrame): input data.
+        Returns:
+            outputs of the groups concatenated, see `hstack_groups`.
+        """
+        return hstack_groups(
+            [
+                transformer.transform(X[columns])
+                for transformer, columns in zip(
+                    self.transformers_, self.groups
+                )
+            ]
+        )
+
+    def get_feature_names_out(self, input_features=None):
+        return np.concatenate(
+            [
+                np.asarray(transformer.get_feature_names_out(), dtype=object)
+                for transformer in self.transformers_
+            ]
+        )
+
+
+def hstack_groups(Xs: List):
+    """Concatenates the outputs of the groups of a branch in their own
+    container.
+    Args:
+        - Xs (List): outputs of the groups, all of the same transformer.
+    Returns:
+        sparse matrix, DataFrame or ndarray, as the outputs.
+    """
+    if all(sp.issparse(X) for X in Xs):
+        return sp.hstack(Xs, format="csr")
+    if all(isinstance(X, pd.DataFrame) for X in Xs):
+        return pd.concat(Xs, axis=1, copy=False)
+    return np.hstack([np.asarray(X) for X in Xs])
+
+
+def join_groups(results: List, transformer, groups: List[List]):
+    """Joins the results of the groups of a branch into the result of the
+    branch.
+    Args:
+        - results (List): results of the function run on every group: fitted
+        transformers, transformed data, or tuples of both.
+        - transformer: transformer of the branch, or its fitted ColumnGroups.
+        - groups (List[List]): column names of every group.
+    Returns:
+        the result of the branch, with a fitted ColumnGroups as transformer.
+    """
+
+    def fitted_groups(transformers):
+        if isinstance(transformer, ColumnGroups):
+            joined = ColumnGroups(transformer.transformer, groups)
+        else:
+            joined = ColumnGroups(transformer, groups)
+        joined.transformers_ = list(transformers)
+        return joined
+
+    if isinstance(results[0], tuple):
+        Xs, transformers = zip(*results)
+        return hstack_groups(list(Xs)), fitted_groups(transformers)
+    if isinstance(results[0], BaseEstimator):
+        return fitted_groups(results)
+    return hstack_groups(results)
+
+
+def is_column_separable(transformer) -> bool:
+    """Whether a transformer is fitted column by column, so it can be split.
+    Transformers declare it with the "column_separable" estimator tag."""
+    get_tags = getattr(transformer, "_get_tags", None)
+    return bool(get_tags and get_tags().get("column_separable", False))
+
+
+def releases_gil(X) -> bool:
+    """Whether a branch input is numeric, so NumPy releases the GIL on it.
+    Object, string and categorical columns are processed by Python code
+    holding the GIL, so their branches gain nothing from threads."""
+    if isinstance(X, pd.DataFrame):
+        return all(
+            pd.api.types.is_numeric_dtype(dtype)
+            and not pd.api.types.is_bool_dtype(dtype)
+            for dtype in X.dtypes
+        )
+    return np.asarray(X).dtype.kind in "iuf"
+
+
+def split_columns(
+    columns: pd.Index, max_columns: Optional[int]
+) -> List[List]:
+    """Splits columns in groups of similar size with at most max_columns
+    each.
+    Args:
+        - columns (pd.Index): column names of a branch.
+        - max_columns (int, optional): largest group. If None, a single
+        group.
+    Returns:
+        List[List]: column names of every group.
+    """
+    columns = list(columns)
+    if not max_columns or len(columns) <= max_columns:
+        return [columns]
+    n_groups = -(-len(columns) // max_columns)
+    return [list(group) for group in np.array_split(columns, n_groups)]
+
+
+def run_jobs(jobs: List[Tuple[Callable, bool]], n_jobs: int) -> List:
+    """Runs jobs in threads, or in processes when flagged, keeping their
+    order.
+
+    Thread jobs run in a thread pool while the process jobs are sent to
+    joblib's loky workers. Workers receive their numeric column blocks
+    memory-mapped by joblib, instead of pickled, when they are larger than
+    1MB; object columns are still pickled. With an active profiler the jobs
+    run serially, as the profiler records one call at a time.
+    Args:
+        - jobs (List[Tuple[Callable, bool]]): functions without arguments,
+        and whether they run in a process.
+        - n_jobs (int): number of threads, and of processes.
+    Returns:
+        List: results of the jobs.
+    """
+    if n_jobs == 1 or len(jobs) == 1 or active_profiler() is not None:
+        return [call() for call, _ in jobs]
+
+    results = [None] * len(jobs)
+    process_jobs = [
+        i for i, (_, in_process) in enumerate(jobs) if in_process
+    ]
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        futures = {
+            i: executor.submit(call)
+            for i, (call, in_process) in enumerate(jobs)
+            if not in_process
+        }
+        if process_jobs:
+            process_results = Parallel(
+                n_jobs=min(n_jobs, len(process_jobs)), backend="loky"
+            )(delayed(jobs[i][0])() for i in process_jobs)
+            for i, result in zip(process_jobs, process_results):
+                results[i] = result
+        for i, future in futures.items():
+            results[i] = future.result()
+    return results
@@ -0,0 +1,264 @@
+"""Module to profile the fit and transform calls of the transformers."""
+import functools
+import json
+import re
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+_active_profilers: List["PipelineProfiler"] = []
+
+
+class PipelineProfiler:
+    """Records wall time, CPU time, shapes, peak memory and rows per second of
+    every `fit`/`transform` call of the transformers while it is active.
+
+    Profiling is opt-in: the transformers only record their calls inside a
+    `with PipelineProfiler() as profiler:` block. The branches of
+    `ColumnDataFrameTransformer` are recorded as
+    "<ColumnTransformer>[<name>]" when they run in the calling process, i.e.
+    with n_jobs=None.
+
+    Calls are nested, e.g. a Pipeline `fit` records the `fit_transform` of
+    the column transformer, its branches and the `fit` of each transformer,
+    so the times of a record include the times of its children (see
+    `depth`).
+
+    Attributes:
+        - trace_memory (bool): if True, the peak memory allocated by each call
+        is traced with tracemalloc, which slows down the calls.
+    """
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        self.trace_memory = trace_memory
+        self.records: List[Dict] = []
+        self._frames: List[Dict] = []
+        self._started_tracing = False
+
+    def __enter__(self) -> "PipelineProfiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _active_profilers.append(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _active_profilers.remove(self)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def record(self, step: str, method: str, call: Callable, X=None):
+        """Runs a call and records its metrics.
+        Args:
+            - step (str): name of the transformer.
+            - method (str): name of the method called.
+            - call (Callable): function without arguments running the call.
+            - X (optional): input of the call, used for its shape.
+        Returns:
+            result of the call.
+        """
+        frame = self._push_frame()
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        try:
+            result = call()
+        finally:
+            wall_seconds = time.perf_counter() - start_wall
+            cpu_seconds = time.process_time() - start_cpu
+            memory_delta = self._pop_frame(frame)
+
+        rows_in, columns_in = _shape(X)
+        rows_out, columns_out = _shape(result)
+        self.records.append(
+            {
+                "step": step,
+                "method": method,
+                "depth": len(self._frames),
+                "wall_seconds": wall_seconds,
+                "cpu_seconds": cpu_seconds,
+                "rows_in": rows_in,
+                "columns_in": columns_in,
+                "rows_out": rows_out,
+                "columns_out": columns_out,
+                "peak_memory_delta_mb": memory_delta,
+                "rows_per_second": (
+                    rows_in / wall_seconds
+                    if rows_in and wall_seconds
+                    else None
+                ),
+            }
+        )
+        return result
+
+    def summary(self) -> pd.DataFrame:
+        """Aggregates the records by step and method.
+        Returns:
+            pd.DataFrame: number of calls, total times and rows, and largest
+            peak memory delta per step and method, slowest first.
+        """
+        records = pd.DataFrame(self.records)
+        if records.empty:
+            return records
+        summary = records.groupby(["step", "method"], sort=False).agg(
+            calls=("wall_seconds", "size"),
+            wall_seconds=("wall_seconds", "sum"),
+            cpu_seconds=("cpu_seconds", "sum"),
+            rows_in=("rows_in", "sum"),
+            peak_memory_delta_mb=("peak_memory_delta_mb", "max"),
+        )
+        summary["rows_per_second"] = (
+            summary["rows_in"] / summary["wall_seconds"]
+        )
+        return summary.sort_values(
+            "wall_seconds", ascending=False
+        ).reset_index()
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Exports the records and their summary as JSON.
+        Args:
+            - path (str, optional): file to write the report to.
+        Returns:
+            str: JSON report.
+        """
+        report = json.dumps(
+            {
+                "records": self.records,
+                "summary": self.summary().to_dict(orient="records"),
+            },
+            indent=2,
+            default=float,
+        )
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as stream:
+                stream.write(report)
+        return report
+
+    def log_mlflow(self, prefix: str = "profile") -> None:
+        """Logs the summary as metrics, and the JSON report as an artifact, in
+        the active MLflow run.
+        Args:
+            - prefix (str): prefix of the metric names.
+        """
+        import mlflow
+
+        metrics = {}
+        for row in self.summary().to_dict(orient="records"):
+            for metric in (
+                "wall_seconds",
+                "cpu_seconds",
+                "peak_memory_delta_mb",
+            ):
+                if pd.notna(row[metric]):
+                    key = f"{prefix}.{row['step']}.{row['method']}.{metric}"
+                    metrics[_metric_key(key)] = float(row[metric])
+        mlflow.log_metrics(metrics)
+        mlflow.log_text(self.to_json(), f"{prefix}.json")
+
+    def _push_frame(self) -> Dict:
+        frame = {"start": 0, "peak": 0}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._frames:
+                self._frames[-1]["peak"] = max(self._frames[-1]["peak"], peak)
+            _reset_peak()
+            frame = {"start": current, "peak": current}
+        self._frames.append(frame)
+        return frame
+
+    def _pop_frame(self, frame: Dict) -> Optional[float]:
+        self._frames.pop()
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(frame["peak"], peak) if _can_reset_peak else current
+        if self._frames:
+            self._frames[-1]["peak"] = max(self._frames[-1]["peak"], peak)
+        _reset_peak()
+        return (peak - frame["start"]) / 2**20
+
+
+def active_profiler() -> Optional[PipelineProfiler]:
+    """Returns the innermost active profiler, or None."""
+    return _active_profilers[-1] if _active_profilers else None
+
+
+def profiled(method: Callable) -> Callable:
+    """Decorates a `fit`/`transform` method so its calls are recorded by the
+    active profiler. Without an active profiler the method is called
+    directly."""
+
+    @functools.wraps(method)
+    def wrapper(self, X, *args, **kwargs):
+        profiler = active_profiler()
+        if profiler is None:
+            return method(self, X, *args, **kwargs)
+        return profiler.record(
+            type(self).__name__,
+            method.__name__,
+            lambda: method(self, X, *args, **kwargs),
+            X,
+        )
+
+    return wrapper
+
+
+def profiled_branch(func: Callable, step: str) -> Callable:
+    """Wraps the function used by a ColumnTransformer to fit or transform each
+    branch, so every branch is recorded by the active profiler.
+
+    The branch name is passed by `_log_message` as the message, see
+    `BranchMessage`.
+    """
+
+    @functools.wraps(func)
+    def wrapper(transformer, X, y, weight, message_clsname="", message=None):
+        branch = message if isinstance(message, BranchMessage) else None
+        call = functools.partial(
+            func,
+            transformer,
+            X,
+            y,
+            weight,
+            message_clsname=message_clsname,
+            message=branch.message if branch else message,
+        )
+        profiler = active_profiler()
+        if branch is None or profiler is None:
+            return call()
+        method = func.__name__.strip("_").replace("_one", "")
+        return profiler.record(f"{step}[{branch.name}]", method, call, X)
+
+    return wrapper
+
+
+class BranchMessage:
+    """Branch name and verbose message of a ColumnTransformer branch."""
+
+    def __init__(self, name: str, message: Optional[str]) -> None:
+        self.name = name
+        self.message = message
+
+
+def _shape(X):
+    shape = getattr(X, "shape", None)
+    if shape is None:
+        return None, None
+    return int(shape[0]), int(shape[1]) if len(shape) > 1 else 1
+
+
+def _metric_key(key: str) -> str:
+    # MLflow metric names only allow alphanumerics, "_", "-", ".", " " and
+    # "/".
+    return re.sub(r"[^\w\-. /]", "_", key)
+
+
+# tracemalloc.reset_peak needs Python >= 3.9, without it the net memory
+# difference of each call is reported instead of its peak.
+_can_reset_peak = hasattr(tracemalloc, "reset_peak")
+
+
+def _reset_peak() -> None:
+    if _can_reset_peak:
+        tracemalloc.reset_peak()
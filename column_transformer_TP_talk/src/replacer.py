@@ -1,34 +1,84 @@
-from typing import Dict
+from typing import Dict, Tuple
 
+import numpy as np
 import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from src.profiling import profiled
+from src.streaming import ChunkedTransformerMixin
 
-class Replacer(BaseEstimator, TransformerMixin):
+
+class Replacer(ChunkedTransformerMixin, BaseEstimator, TransformerMixin):
     """Replace values per column.
 
     Attributes:
         - mapper (Dict): a dict of dictionaries whose keys are the column
         names. The values are dictionaries whose keys are the original values
         to be replaced and the values are the new assigned ones.
+        - inplace (bool): if True, `transform` assigns the replaced columns
+        into the input DataFrame and returns it, without any new DataFrame. If
+        False, the input is never modified and only the replaced columns are
+        new.
+
+    `fit` compiles every mapping into a hash index of the original values and
+    an array of the new ones, so `transform` replaces each column with one
+    vectorized lookup and a `take`, without modifying the input DataFrame.
+    Categorical columns keep their dtype: only their categories are looked up.
     """
 
-    def __init__(self, mapper: Dict) -> None:
+    def __init__(self, mapper: Dict, inplace: bool = False) -> None:
         self.mapper = mapper
+        self.inplace = inplace
+
+    def _compile_mapper(self) -> Dict[str, Tuple[pd.Index, np.ndarray]]:
+        return {
+            column: (
+                pd.Index(list(mapping_dict.keys())),
+                pd.Series(list(mapping_dict.values())).to_numpy(),
+            )
+            for column, mapping_dict in self.mapper.items()
+        }
 
     def _replace_values(self, df: pd.DataFrame) -> pd.DataFrame:
-        for column, mapping_dict in self.mapper.items():
-            df.loc[:, column] = df.loc[:, column].replace(mapping_dict)
-        return df
+        replaced_df = df if self.inplace else df.copy(deep=False)
+        for column, (keys, values) in self._lookup_tables.items():
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                replaced = _replace_categories(df[column], keys, values)
+                if replaced is not None:
+                    replaced_df[column] = replaced
+                continue
+            positions = keys.get_indexer(df[column])
+            is_replaced = positions >= 0
+            if not is_replaced.any():
+                continue
+            replaced = np.where(
+                is_replaced, values.take(positions), df[column].to_numpy()
+            )
+            replaced_df[column] = pd.Series(
+                replaced, index=df.index, name=column
+            ).infer_objects()
+        return replaced_df
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the values to replace by using 'transform' method.
         Args:
             df (pd.DataFrame): input data
         """
         self.column_names = X.columns
+        self._lookup_tables = self._compile_mapper()
         return self
 
+    @profiled
+    def partial_fit(self, X: pd.DataFrame, y=None):
+        """Fits the transformer on a chunk of the input data. Nothing is
+        learned from the values, so it is equivalent to `fit`.
+        Args:
+            X (pd.DataFrame): chunk of input data
+        """
+        return self.fit(X)
+
+    @profiled
     def transform(self, X: pd.DataFrame, y=None) -> pd.DataFrame:
         """Executes the methods to transform each type of column.
         Args:
@@ -37,4 +87,30 @@ class Replacer(BaseEstimator, TransformerMixin):
             pd.DataFrame: Dataframe with imputed values.
         """
         df = self._replace_values(X)
-        return pd.DataFrame(df, columns=self.column_names)
+        return df.reindex(columns=self.column_names, copy=False)
+
+
+def _replace_categories(
+    column: pd.Series, keys: pd.Index, values: np.ndarray
+) -> pd.Series:
+    """Replaces the categories of a categorical column, which keeps its dtype
+    as with `Series.replace`, or returns None if no category is replaced.
+    Categories replaced by the same value are merged, and categories replaced
+    by NaN become missing values."""
+    categories = column.cat.categories
+    positions = keys.get_indexer(categories)
+    is_replaced = positions >= 0
+    if not is_replaced.any():
+        return None
+    new_categories = np.where(
+        is_replaced, values.take(positions), categories.to_numpy()
+    )
+    # -1 for NaN, which is not a category.
+    category_codes, unique_categories = pd.factorize(new_categories)
+    codes = column.cat.codes.to_numpy()
+    replaced = pd.Categorical.from_codes(
+        np.where(codes >= 0, category_codes[codes], -1),
+        categories=pd.Index(unique_categories),
+        ordered=column.cat.ordered,
+    )
+    return pd.Series(replaced, index=column.index, name=column.name)
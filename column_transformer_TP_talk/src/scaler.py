@@ -1,25 +1,56 @@
 """Modules to scale data."""
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
 from sklearn.preprocessing import StandardScaler
+from sklearn.preprocessing._data import (
+    _handle_zeros_in_scale,
+    _is_constant_feature,
+)
+
+from src.profiling import profiled
+from src.schema import ColumnSchema
+from src.sketches import Moments
+from src.streaming import ChunkedTransformerMixin
 
 
-class StandardDataFrameScaler(StandardScaler):
+class StandardDataFrameScaler(ChunkedTransformerMixin, StandardScaler):
     """Scales and keeps column names from input DataFrame using StandardScaler.
 
     Check the scikit-learn official documentation for further information about
     the input parameters:
     https://scikit-learn.org/stable/modules/generated/sklearn.preprocessing.StandardScaler.html
+
+    Attributes:
+        - n_jobs (int): number of processes used by `fit` and `fit_shards`.
+        With more than one job, the rows are split in shards whose count,
+        mean and M2 are computed in parallel and merged. None means 1.
+        - reorder_columns (bool): if True, `transform` selects the columns
+        seen at fit time by name, instead of failing when they come in another
+        order.
     """  # noqa
 
-    def __init__(self, copy=True, with_mean=True, with_std=True) -> None:
+    def __init__(
+        self,
+        copy=True,
+        with_mean=True,
+        with_std=True,
+        n_jobs: Optional[int] = None,
+        reorder_columns: bool = False,
+    ) -> None:
         """Initializes the standard scaler."""
         self.column_names = []
+        self.n_jobs = n_jobs
+        self.reorder_columns = reorder_columns
         super().__init__(
             copy=copy,
             with_mean=with_mean,
             with_std=with_std,
         )
 
+    @profiled
     def fit(self, X: pd.DataFrame, y=None):
         """Fits the scaler based on X.
         Args:
@@ -28,10 +59,71 @@ class StandardDataFrameScaler(StandardScaler):
         Returns:
             StandardDataFrameScaler: instance fitted.
         """
+        n_shards = effective_n_jobs(self.n_jobs)
+        if n_shards > 1 and X.shape[0] >= n_shards:
+            bounds = np.linspace(0, X.shape[0], n_shards + 1).astype(int)
+            return self.fit_shards(
+                X.iloc[start:stop] for start, stop in zip(bounds, bounds[1:])
+            )
+
         super().fit(X)
         self.column_names = X.columns
+        self.schema_ = ColumnSchema.from_frame(X)
+        return self
+
+    def fit_shards(
+        self,
+        shards: Iterable[Union[pd.DataFrame, str]],
+        columns: Optional[List[str]] = None,
+    ):
+        """Fits the scaler on shards of the data, computed in parallel.
+        Args:
+            shards (Iterable[Union[pd.DataFrame, str]]): DataFrames, or paths
+            to CSV/Parquet files, with the same columns.
+            columns (List[str], optional): columns to scale. Defaults to all
+            the columns of the shards.
+        Returns:
+            StandardDataFrameScaler: instance fitted.
+        """
+        results = Parallel(n_jobs=self.n_jobs)(
+            delayed(_shard_moments)(shard, columns) for shard in shards
+        )
+        return self._fit_shard_moments(results)
+
+    def _fit_shard_moments(self, results: List[Tuple[pd.Index, Moments]]):
+        """Sets the fitted state from the (columns, moments) of every shard."""
+        column_names, moments = results[0]
+        schema = ColumnSchema(column_names)
+        for shard_column_names, shard_moments in results[1:]:
+            if ColumnSchema(shard_column_names) != schema:
+                raise ValueError(
+                    "Columns don't have same order/elements. "
+                    f"Valid order: {list(column_names)}"
+                )
+            moments.merge(shard_moments)
+
+        _set_state_from_moments(self, column_names, moments)
+        self.column_names = column_names
+        self.schema_ = schema
+        return self
+
+    @profiled
+    def partial_fit(self, X: pd.DataFrame, y=None, sample_weight=None):
+        """Updates the mean and variance of the scaler with a chunk of X.
+        Args:
+            X (pd.DataFrame): chunk of input data.
+            y (, optional): Ignored. Defaults to None.
+            sample_weight (array-like, optional): Individual weights for each
+            sample. Defaults to None.
+        Returns:
+            StandardDataFrameScaler: instance fitted.
+        """
+        super().partial_fit(X, sample_weight=sample_weight)
+        self.column_names = X.columns
+        self.schema_ = ColumnSchema.from_frame(X)
         return self
 
+    @profiled
     def transform(self, X: pd.DataFrame) -> pd.DataFrame:
         """Scales X and adds column names.
         Args:
@@ -39,13 +131,55 @@ class StandardDataFrameScaler(StandardScaler):
         Returns:
             pd.DataFrame: scaled data.
         """
-        assert str(X.columns) == str(self.column_names), (
-            f"Columns don't have same order/elements. "
-            f"Valid order: {self.column_names}"
-        )
-
+        X = self.schema_.validate(X, reorder=self.reorder_columns)
         X_scaled = super().transform(X)
         return pd.DataFrame(X_scaled, columns=self.column_names)
 
     def get_feature_names_out(self, input_features=None):
         return self.column_names
+
+    def _more_tags(self):
+        # every column is fitted on its own, so wide branches can be split.
+        return {"column_separable": True}
+
+
+def _set_state_from_moments(
+    scaler: StandardScaler, column_names: pd.Index, moments: Moments
+) -> None:
+    """Sets the fitted attributes of a StandardScaler as `fit` does."""
+    scaler._reset()
+    scaler.n_features_in_ = len(column_names)
+    scaler.feature_names_in_ = np.asarray(column_names, dtype=object)
+
+    n_samples_seen = moments.n_values
+    if np.all(n_samples_seen == n_samples_seen[0]):
+        n_samples_seen = int(n_samples_seen[0])
+    scaler.n_samples_seen_ = n_samples_seen
+
+    if not scaler.with_mean and not scaler.with_std:
+        scaler.mean_ = None
+        scaler.var_ = None
+    else:
+        scaler.mean_ = moments.mean
+        scaler.var_ = moments.var
+    if scaler.with_std:
+        constant_mask = _is_constant_feature(
+            scaler.var_, scaler.mean_, moments.n_values
+        )
+        scaler.scale_ = _handle_zeros_in_scale(
+            np.sqrt(scaler.var_), copy=False, constant_mask=constant_mask
+        )
+    else:
+        scaler.var_ = None
+        scaler.scale_ = None
+
+
+def _shard_moments(shard: Union[pd.DataFrame, str], columns: Optional[List]):
+    if isinstance(shard, str):
+        if shard.endswith(".parquet"):
+            shard = pd.read_parquet(shard, columns=columns)
+        else:
+            shard = pd.read_csv(shard, usecols=columns)
+    if columns is not None:
+        shard = shard[columns]
+    return shard.columns, Moments.from_frame(shard)
@@ -0,0 +1,320 @@
+"""Module with mergeable summaries of a column, used to fit by chunks."""
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+class ValueCounter:
+    """Exact hash counter of the values of a column.
+
+    Memory grows with the number of distinct values. Counters fitted on
+    separate shards can be merged.
+    """
+
+    def __init__(self) -> None:
+        self.counts = pd.Series(dtype=float)
+
+    def update(self, values: pd.Series) -> "ValueCounter":
+        """Counts the non-null values of a chunk.
+        Args:
+            - values (pd.Series): values of a column.
+        Returns:
+            ValueCounter: updated counter.
+        """
+        self.counts = self.counts.add(values.value_counts(), fill_value=0)
+        return self
+
+    def merge(self, other: "ValueCounter") -> "ValueCounter":
+        """Adds the counts of another counter.
+        Args:
+            - other (ValueCounter): counter fitted on another shard.
+        Returns:
+            ValueCounter: merged counter.
+        """
+        self.counts = self.counts.add(other.counts, fill_value=0)
+        return self
+
+    def mode(self):
+        """Most frequent value, the smallest one in case of ties."""
+        if self.counts.empty:
+            return np.nan
+        return self.counts.index[self.counts == self.counts.max()].min()
+
+    def median(self) -> float:
+        """Exact median of the values counted."""
+        if self.counts.empty:
+            return np.nan
+        counts = self.counts.sort_index()
+        cumulative_counts = counts.to_numpy().cumsum()
+        n_values = cumulative_counts[-1]
+        positions = np.array([(n_values - 1) // 2, n_values // 2])
+        lower, upper = counts.index[
+            np.searchsorted(cumulative_counts, positions + 1)
+        ]
+        return (lower + upper) / 2
+
+
+class MeanAccumulator:
+    """Sum and count of the values of a column."""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.n_values = 0
+
+    def update(self, values: pd.Series) -> "MeanAccumulator":
+        """Adds the non-null values of a chunk.
+        Args:
+            - values (pd.Series): values of a column.
+        Returns:
+            MeanAccumulator: updated accumulator.
+        """
+        self.total += values.sum()
+        self.n_values += values.count()
+        return self
+
+    def merge(self, other: "MeanAccumulator") -> "MeanAccumulator":
+        """Adds the sum and count of another accumulator.
+        Args:
+            - other (MeanAccumulator): accumulator fitted on another shard.
+        Returns:
+            MeanAccumulator: merged accumulator.
+        """
+        self.total += other.total
+        self.n_values += other.n_values
+        return self
+
+    def mean(self) -> float:
+        """Mean of the values added."""
+        if self.n_values == 0:
+            return np.nan
+        return self.total / self.n_values
+
+
+class Moments:
+    """Count, mean and sum of squared deviations (M2) of numerical columns.
+
+    Moments computed on separate shards are combined with the parallel
+    algorithm of Chan et al., the same one used by `StandardScaler`.
+    """
+
+    def __init__(self, n_values, mean, m2) -> None:
+        self.n_values = np.asarray(n_values, dtype=np.int64)
+        self.mean = np.asarray(mean, dtype=float)
+        self.m2 = np.asarray(m2, dtype=float)
+
+    @classmethod
+    def from_frame(cls, X: pd.DataFrame) -> "Moments":
+        """Computes the moments of every column of X, ignoring nulls.
+        Args:
+            - X (pd.DataFrame): numerical data.
+        Returns:
+            Moments: moments per column.
+        """
+        values = X.to_numpy(dtype=float)
+        is_valid = ~np.isnan(values)
+        n_values = is_valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(is_valid, values, 0).sum(axis=0) / n_values
+        mean[n_values == 0] = 0.0
+        deviations = np.where(is_valid, values - mean, 0)
+        return cls(n_values, mean, (deviations**2).sum(axis=0))
+
+    def merge(self, other: "Moments") -> "Moments":
+        """Adds the moments of another shard.
+        Args:
+            - other (Moments): moments of the same columns on another shard.
+        Returns:
+            Moments: merged moments.
+        """
+        n_values = self.n_values + other.n_values
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(n_values > 0, other.n_values / n_values, 0.0)
+        self.mean = self.mean + delta * weight
+        self.m2 = self.m2 + other.m2 + delta**2 * self.n_values * weight
+        self.n_values = n_values
+        return self
+
+    @property
+    def var(self) -> np.ndarray:
+        """Population variance of every column."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.n_values > 0, self.m2 / self.n_values, np.nan)
+
+
+class KLLSketch:
+    """KLL quantile sketch of a numerical column.
+
+    Keeps O(k log(n / k)) values, with a rank error close to 1.7 / k for
+    quantile queries. Sketches fitted on separate shards can be merged.
+
+    Attributes:
+        - k (int): size of the largest compactor, it sets the accuracy.
+        - seed (int): seed of the random offsets used in the compactions.
+    """
+
+    _capacity_decay = 2 / 3
+
+    def __init__(self, k: int = 200, seed: int = 0) -> None:
+        self.k = k
+        self.seed = seed
+        self.n_values = 0
+        self._compactors: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> "KLLSketch":
+        """Adds the non-null values of a chunk to the sketch.
+        Args:
+            - values (array-like): values of a column.
+        Returns:
+            KLLSketch: updated sketch.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        self._compactors[0] = np.concatenate([self._compactors[0], values])
+        self.n_values += values.shape[0]
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Adds the values summarized by another sketch.
+        Args:
+            - other (KLLSketch): sketch fitted on another shard.
+        Returns:
+            KLLSketch: merged sketch.
+        """
+        for level, items in enumerate(other._compactors):
+            if level == len(self._compactors):
+                self._compactors.append(np.empty(0))
+            self._compactors[level] = np.concatenate(
+                [self._compactors[level], items]
+            )
+        self.n_values += other.n_values
+        self._compress()
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Approximated quantile of the values added to the sketch.
+        Args:
+            - q (float): quantile to compute, between 0 and 1.
+        Returns:
+            float: value whose rank is approximately q * n_values.
+        """
+        if self.n_values == 0:
+            return np.nan
+        items = np.concatenate(self._compactors)
+        weights = np.concatenate(
+            [
+                np.full(len(level_items), 2**level)
+                for level, level_items in enumerate(self._compactors)
+            ]
+        )
+        order = np.argsort(items, kind="stable")
+        cumulative_weights = weights[order].cumsum()
+        rank = q * cumulative_weights[-1]
+        position = np.searchsorted(cumulative_weights, rank)
+        return items[order][min(position, len(items) - 1)]
+
+    def median(self) -> float:
+        """Approximated median of the values added to the sketch."""
+        return self.quantile(0.5)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._compactors) - level - 1
+        return max(2, int(np.ceil(self.k * self._capacity_decay**depth)))
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self._compactors):
+            items = self._compactors[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self._compactors):
+                    self._compactors.append(np.empty(0))
+                items = np.sort(items)
+                # an odd item out stays in this level.
+                n_compacted = len(items) - len(items) % 2
+                offset = self._rng.integers(2)
+                promoted = items[:n_compacted][offset::2]
+                self._compactors[level + 1] = np.concatenate(
+                    [self._compactors[level + 1], promoted]
+                )
+                self._compactors[level] = items[n_compacted:]
+            level += 1
+
+
+class HyperLogLog:
+    """HyperLogLog sketch of the number of distinct values of a column.
+
+    Uses 2 ** precision one-byte registers, with a relative error close to
+    1.04 / sqrt(2 ** precision). Sketches fitted on separate shards can be
+    merged.
+
+    Attributes:
+        - precision (int): number of bits of the hash used to pick a register.
+    """
+
+    def __init__(self, precision: int = 14) -> None:
+        self.precision = precision
+        self.registers = np.zeros(2**precision, dtype=np.uint8)
+
+    def update(self, values: pd.Series) -> "HyperLogLog":
+        """Adds the non-null values of a chunk to the sketch.
+        Args:
+            - values (pd.Series): values of a column.
+        Returns:
+            HyperLogLog: updated sketch.
+        """
+        values = values.dropna()
+        if pd.api.types.is_numeric_dtype(
+            values
+        ) and not pd.api.types.is_bool_dtype(values):
+            # hashes depend on the dtype, and an integer column is int64 in
+            # chunks without nulls but float64 in the others, so numbers are
+            # hashed as float64, with -0.0 as 0.0, as `nunique` counts them.
+            values = values.astype(np.float64) + 0.0
+        hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+        n_index_bits = np.uint64(64 - self.precision)
+        register_index = (hashes >> n_index_bits).astype(np.intp)
+        remaining_bits = hashes << np.uint64(self.precision)
+        rank = np.minimum(
+            64 - _bit_length(remaining_bits) + 1, 64 - self.precision + 1
+        ).astype(np.uint8)
+        np.maximum.at(self.registers, register_index, rank)
+        return self
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Adds the values summarized by another sketch.
+        Args:
+            - other (HyperLogLog): sketch fitted on another shard.
+        Returns:
+            HyperLogLog: merged sketch.
+        """
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> float:
+        """Approximated number of distinct values added to the sketch."""
+        n_registers = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / n_registers)
+        estimate = (
+            alpha
+            * n_registers**2
+            / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        )
+        n_empty_registers = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * n_registers and n_empty_registers > 0:
+            # linear counting is more accurate for small cardinalities.
+            return n_registers * np.log(n_registers / n_empty_registers)
+        return estimate
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """Number of bits needed to represent each unsigned 64 bits integer."""
+    values = values.copy()
+    bit_length = np.zeros(values.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        is_wider = values >= np.uint64(1 << shift)
+        bit_length[is_wider] += shift
+        values[is_wider] >>= np.uint64(shift)
+    return bit_length + (values > 0)
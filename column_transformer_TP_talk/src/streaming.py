@@ -0,0 +1,79 @@
+"""Module to fit and transform data chunk by chunk."""
+from typing import Callable, Iterable, Iterator
+
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+
+class ChunkedTransformerMixin:
+    """Adds chunked fitting and transforming to the DataFrame transformers.
+
+    The transformer must implement `partial_fit`, e.g. to be used with
+    `pd.read_csv(..., chunksize=N)`.
+    """
+
+    def fit_iter(self, chunks: Iterable[pd.DataFrame]):
+        """Fits the transformer incrementally, calling `partial_fit` per chunk.
+        Args:
+            - chunks (Iterable[pd.DataFrame]): input data split by rows.
+        Returns:
+            self: instance fitted.
+        """
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def transform_iter(
+        self, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[pd.DataFrame]:
+        """Transforms the chunks lazily.
+        Args:
+            - chunks (Iterable[pd.DataFrame]): input data split by rows.
+        Returns:
+            Iterator[pd.DataFrame]: transformed chunks.
+        """
+        for chunk in chunks:
+            yield self.transform(chunk)
+
+
+def pipeline_fit_iter(
+    pipeline: Pipeline, make_chunks: Callable[[], Iterable[pd.DataFrame]]
+) -> Pipeline:
+    """Fits a pipeline of transformers chunk by chunk.
+
+    Each step is fitted with one pass over the chunks, which are transformed by
+    the already fitted previous steps, so the result matches fitting the
+    pipeline on the concatenated chunks.
+    Args:
+        - pipeline (Pipeline): unfitted pipeline whose steps implement
+        `partial_fit`.
+        - make_chunks (Callable[[], Iterable[pd.DataFrame]]): function
+        returning a new iterable over the chunks every time it is called,
+        e.g. `lambda: pd.read_csv(path, chunksize=100_000)`.
+    Returns:
+        Pipeline: pipeline fitted.
+    """
+    fitted_steps = []
+    for _, step in pipeline.steps:
+        if step is None or step == "passthrough":
+            continue
+        for chunk in make_chunks():
+            for fitted_step in fitted_steps:
+                chunk = fitted_step.transform(chunk)
+            step.partial_fit(chunk)
+        fitted_steps.append(step)
+    return pipeline
+
+
+def pipeline_transform_iter(
+    pipeline: Pipeline, chunks: Iterable[pd.DataFrame]
+) -> Iterator[pd.DataFrame]:
+    """Transforms the chunks lazily with a fitted pipeline.
+    Args:
+        - pipeline (Pipeline): fitted pipeline.
+        - chunks (Iterable[pd.DataFrame]): input data split by rows.
+    Returns:
+        Iterator[pd.DataFrame]: transformed chunks.
+    """
+    for chunk in chunks:
+        yield pipeline.transform(chunk)